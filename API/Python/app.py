@@ -1,25 +1,88 @@
 # file: app.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from db import *
 from ejercicios_python.EJ04.EJ4 import *
+from cuentas import *
 from flask_cors import CORS
+from werkzeug.exceptions import BadRequest
+from cache import CacheLRU
+from metricas import instalar_metricas
+from registro import configurar_registro
+from serializacion import ProveedorJSON, a_bytes
 import json
 import logging
 import os
 
 aplicacion = Flask(__name__)
+aplicacion.json = ProveedorJSON(aplicacion)  # orjson si está instalado, ver serializacion.py.
 CORS(aplicacion)
-# Configuración del registro (logging)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
+instalar_metricas(aplicacion)  # GET /metrics (Prometheus)
+# Configuración del registro (logging): asíncrona, ver registro.py.
+configurar_registro()
+
+# Número máximo de cuentas aceptadas en una petición a /cuentas/lote.
+MAX_CUENTAS_LOTE = int(os.environ.get("MAX_CUENTAS_LOTE", 10000))
+# Número máximo de IDs aceptados en una petición a POST /cuentas/verificar.
+MAX_CUENTAS_VERIFICAR = int(os.environ.get("MAX_CUENTAS_VERIFICAR", 1000))
+# Tamaño de página por defecto y máximo de GET /cuentas.
+LIMITE_PAGINA_CUENTAS = 50
+MAX_LIMITE_PAGINA_CUENTAS = 500
+# Columnas por las que se puede ordenar el listado de cuentas.
+COLUMNAS_ORDEN_CUENTAS = ('id', 'cantidad', 'titular')
+
+# Caché de cuentas reconstruidas (por worker). Solo la invalidan las escrituras del propio
+# worker: tras un gasto atendido por otro, las lecturas pueden servir el saldo anterior durante
+# CACHE_CUENTAS_TTL segundos. Los GET de cuentas aceptan ?consistente=1 para leer de la BD,
+# y CACHE_CUENTAS_ACTIVA=0 la desactiva del todo.
+CACHE_CUENTAS_ACTIVA = os.environ.get("CACHE_CUENTAS_ACTIVA", "1") == "1"
+cache_cuentas = CacheLRU(
+    capacidad=int(os.environ.get("CACHE_CUENTAS_TAMANO", 10000)),
+    ttl=float(os.environ.get("CACHE_CUENTAS_TTL", 5)),
+)
+
+
+def invalidar_cache_cuentas(nombre_tabla, id_columna, id_valor):
+    """Observador de escritura de db.py: invalida la cuenta modificada en la caché."""
+    if nombre_tabla == 'CuentasAlmacenadas' and id_columna == 'id':
+        cache_cuentas.invalidar(int(id_valor))
+
+registrar_observador_escritura(invalidar_cache_cuentas)
+
+
+def completar_filas_sin_migrar(filas):
+    """
+    Vuelve a leer, con una sola consulta y con 'datos_objeto', las filas antiguas de una
+    lista leída con COLUMNAS_CUENTA (ver cuentas.FilaSinMigrar). Las filas ya convertidas
+    a columnas, que tras la migración son todas, no cuestan ninguna consulta más.
 
-def obtener_instancia_cuenta(id_cuenta: int):
+    Returns:
+        La misma lista, con las filas antiguas completadas en su sitio.
+        Lanza ErrorBaseDeDatos si hay un problema con la BD.
     """
-    Recupera los datos de una cuenta almacenada por su ID, deserializa el JSON
-    y reconstruye la instancia del objeto Cuenta o CuentaJoven correspondiente.
+    ids_antiguas = [fila['id'] for fila in filas if es_fila_sin_migrar(fila)]
+    if ids_antiguas:
+        completas = {fila['id']: fila for fila in obtener_todos_los_elementos(
+            'CuentasAlmacenadas', filtro={'id': ids_antiguas}, columnas=COLUMNAS_CUENTA_ANTIGUA)}
+        for fila in filas:
+            if fila['id'] in completas:
+                # Toda la fila: si migrar_cuentas.py la ha convertido entretanto, trae las columnas.
+                fila.update(completas[fila['id']])
+    return filas
+
+
+def obtener_instancia_cuenta(id_cuenta: int, consistente: bool = False):
+    """
+    Recupera los datos de una cuenta almacenada por su ID y reconstruye
+    la instancia del objeto Cuenta o CuentaJoven correspondiente.
+
+    Las instancias se guardan en la caché de cuentas (cache_cuentas), que se invalida
+    al actualizar la cuenta desde este worker. La instancia devuelta puede estar compartida:
+    no se debe modificar. Una lectura que decide una escritura debe pasar consistente=True
+    (o, como los gastos, leer la fila bloqueada con actualizar_elemento_atomico).
 
     Args:
         id_cuenta: El ID (clave primaria) de la fila en la tabla CuentasAlmacenadas.
+        consistente: Si es True, ignora la caché y lee siempre de la BD.
 
     Returns:
         Una instancia de Cuenta o CuentaJoven si se encuentra y reconstruye con éxito.
@@ -27,103 +90,277 @@ def obtener_instancia_cuenta(id_cuenta: int):
         Lanza ValueError si los datos están corruptos o el tipo es desconocido.
         Lanza ErrorBaseDeDatos si hay un problema con la BD.
     """
+    usar_cache = CACHE_CUENTAS_ACTIVA and not consistente
+    if usar_cache:
+        instancia = cache_cuentas.obtener(id_cuenta)
+        if instancia is not None:
+            return instancia
+
     try:
         # Obtener los datos de la BD usando la función genérica.
         resultados = obtener_todos_los_elementos(
             'CuentasAlmacenadas',
             filtro={'id': id_cuenta},
-            limite=1 # Solo esperamos un resultado
+            limite=1, # Solo esperamos un resultado
+            columnas=COLUMNAS_CUENTA
         )
 
         # Comprobar si se encontró la cuenta.
         if not resultados:
-            logging.info(f"No se encontró cuenta almacenada con id={id_cuenta}")
+            logging.info("No se encontró cuenta almacenada con id=%s", id_cuenta)
             return None # Indica que no existe
 
         # Tomamos el primer elemento ya que usamos limite=1 y filtramos por PK.
-        datos_db = resultados[0]
-        tipo_cuenta = datos_db.get('tipo_cuenta')
-        datos_objeto_str = datos_db.get('datos_objeto')
-
-        # Verificación extra (aunque la BD debería tener NOT NULL).
-        if not tipo_cuenta or not datos_objeto_str:
-             logging.error(f"Datos incompletos recuperados para id={id_cuenta} desde la BD.")
-             raise ValueError("Datos recuperados de la base de datos están incompletos.")
-        # Deserializar = Traducir JSON a un objeto Python
-        # Deserializar el JSON a un diccionario Python.
-        try:
-            atributos_dict = json.loads(datos_objeto_str)
-        except json.JSONDecodeError as e:
-            logging.error(f"Error al decodificar JSON para id={id_cuenta}. Datos: '{datos_objeto_str}'. Error: {e}")
-            raise ValueError(f"Los datos almacenados para la cuenta {id_cuenta} están corruptos (JSON inválido).") from e
-
-        # Reconstruir (instanciar) el objeto correcto basado en 'tipo_cuenta'.
-        if tipo_cuenta == 'Cuenta':
-            # Usamos **kwargs para pasar el diccionario como argumentos nombrados al constructor.
-            instancia = Cuenta(**atributos_dict)
-            logging.debug(f"Instancia de Cuenta reconstruida para id={id_cuenta}")
-            return instancia
-        elif tipo_cuenta == 'CuentaJoven':
-            instancia = CuentaJoven(**atributos_dict)
-            logging.debug(f"Instancia de CuentaJoven reconstruida para id={id_cuenta}")
-            return instancia
-        else:
-            # Tipo desconocido encontrado en la base de datos.
-            logging.error(f"Tipo de cuenta desconocido '{tipo_cuenta}' encontrado en la BD para id={id_cuenta}")
-            raise ValueError(f"Tipo de cuenta no soportado encontrado en la base de datos: {tipo_cuenta}")
+        instancia = construir_instancia_cuenta(id_cuenta, completar_filas_sin_migrar(resultados)[0])
+        if usar_cache:
+            cache_cuentas.guardar(id_cuenta, instancia)
+        return instancia
 
     except ErrorBaseDeDatos as db_err:
         # Si 'obtener_todos_los_elementos' falla.
-        logging.error(f"Error de base de datos al intentar obtener cuenta id={id_cuenta}: {db_err}")
+        logging.error("Error de base de datos al intentar obtener cuenta id=%s: %s", id_cuenta, db_err)
         raise # Re-lanzamos la excepción para que el endpoint la maneje
 
     # No necesitamos un 'except Exception' general aquí,
     # dejamos que ErrorBaseDeDatos y ValueError (lanzadas explícitamente) suban.
+
+
+def obtener_instancias_cuentas(ids_cuentas, consistente: bool = False):
+    """
+    Versión por lotes de obtener_instancia_cuenta: las cuentas que no están en la caché
+    se leen con una sola consulta (WHERE id IN (...)).
+
+    Args:
+        ids_cuentas: IDs de las cuentas (sin repetir).
+        consistente: Si es True, ignora la caché y lee siempre de la BD.
+
+    Returns:
+        Tupla (instancias, errores): diccionarios id -> instancia e id -> mensaje para las
+        cuentas con datos corruptos o de tipo desconocido. Los IDs que no existen no
+        aparecen en ninguno de los dos.
+        Lanza ErrorBaseDeDatos si hay un problema con la BD.
+    """
+    usar_cache = CACHE_CUENTAS_ACTIVA and not consistente
+    instancias = {}
+    errores = {}
+    pendientes = []
+    for id_cuenta in ids_cuentas:
+        instancia = cache_cuentas.obtener(id_cuenta) if usar_cache else None
+        if instancia is not None:
+            instancias[id_cuenta] = instancia
+        else:
+            pendientes.append(id_cuenta)
+
+    if pendientes:
+        try:
+            resultados = completar_filas_sin_migrar(obtener_todos_los_elementos(
+                'CuentasAlmacenadas', filtro={'id': pendientes}, columnas=COLUMNAS_CUENTA))
+        except ErrorBaseDeDatos as db_err:
+            logging.error("Error de base de datos al intentar obtener %s cuentas: %s", len(pendientes), db_err)
+            raise
+        for fila in resultados:
+            id_cuenta = fila['id']
+            try:
+                instancia = construir_instancia_cuenta(id_cuenta, fila)
+            except ValueError as e:
+                errores[id_cuenta] = str(e)
+                continue
+            instancias[id_cuenta] = instancia
+            if usar_cache:
+                cache_cuentas.guardar(id_cuenta, instancia)
+    return instancias, errores
 @aplicacion.route('/')
 def indice():
     return "Estas llamando al Servidor Python de API, ingresa la ruta correcta y respondere!"
 
+@aplicacion.route('/estadisticas', methods=['GET'])
+def estadisticas():
+    """Devuelve las estadísticas del pool de conexiones y de la caché de cuentas de este worker."""
+    return jsonify({
+        'pid': os.getpid(),
+        'pool': estadisticas_pool(),
+        'sql': estadisticas_sql(),
+        'cache_cuentas': dict(cache_cuentas.estadisticas(), activa=CACHE_CUENTAS_ACTIVA),
+    }), 200
+
 @aplicacion.route('/cuentas/<int:cuenta_id>/verificar', methods=['GET'])
 def verificar_objeto_cuenta(cuenta_id):
-    """Endpoint de ejemplo para probar obtener_instancia_cuenta."""
+    """
+    Endpoint de ejemplo para probar obtener_instancia_cuenta.
+
+    Con la caché de cuentas activa, el saldo puede tener hasta CACHE_CUENTAS_TTL segundos
+    de antigüedad si el último gasto lo atendió otro worker. Con ?consistente=1 se lee de la BD.
+    """
     try:
-        cuenta_temporal = obtener_instancia_cuenta(cuenta_id)
+        cuenta_temporal = obtener_instancia_cuenta(cuenta_id, consistente=request.args.get('consistente') == '1')
 
         if cuenta_temporal is None:
             return jsonify({'error': f'Cuenta con id {cuenta_id} no encontrada'}), 404
 
-        # Ahora puedes usar los métodos del objeto.
-        saldo = cuenta_temporal.consultar_saldo()
-        titular = cuenta_temporal.consultar_titular()
-        tipo = cuenta_temporal.__class__.__name__ # Obtiene 'Cuenta' o 'CuentaJoven'
-
-        info = {
-            'id_db': cuenta_id,
-            'tipo_objeto': tipo,
-            'titular': titular,
-            'saldo_actual': saldo,
-        }
-        # Si es CuentaJoven, podríamos añadir más info.
-        if isinstance(cuenta_temporal, CuentaJoven):
-             info['bonificacion'] = cuenta_temporal.get_bonificacion()
-             info['edad'] = cuenta_temporal.get_edad()
-             info['es_valido'] = cuenta_temporal.TitularValido()
-
-        return jsonify(info), 200
+        return jsonify(describir_cuenta(cuenta_id, cuenta_temporal)), 200
 
     except (ErrorBaseDeDatos, ValueError) as e: # Capturamos errores específicos.
-        logging.error(f"Error al verificar cuenta {cuenta_id}: {e}")
+        logging.error("Error al verificar cuenta %s: %s", cuenta_id, e)
         # Devolvemos 500 para errores de BD o datos corruptos/invalidos.
         return jsonify({'error': f'Error al procesar la cuenta {cuenta_id}: {str(e)}'}), 500
     except Exception as e:
-        logging.exception(f"Error inesperado al verificar cuenta {cuenta_id}: {e}")
+        logging.exception("Error inesperado al verificar cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': 'Error interno inesperado'}), 500
+
+@aplicacion.route('/cuentas/verificar', methods=['POST'])
+def verificar_objetos_cuentas():
+    """
+    Versión por lotes de GET /cuentas/<id>/verificar: una sola petición y una sola
+    consulta a la BD para muchas cuentas.
+
+    Espera un JSON con una lista de IDs de cuenta (e.g., [3, 8, 15]). Como en
+    GET /cuentas/<id>/verificar, los saldos pueden venir de la caché de cuentas con hasta
+    CACHE_CUENTAS_TTL segundos de antigüedad; ?consistente=1 los lee todos de la BD.
+
+    Devuelve:
+    - JSON con 'cuentas': un elemento por ID pedido y en el mismo orden, con el mismo
+      formato que GET /cuentas/<id>/verificar, o {'id_db': id, 'error': ...} si la cuenta
+      no existe o sus datos están corruptos; 'encontradas' y 'no_encontradas' cuentan ambos casos.
+    """
+    try:
+        ids_cuentas = request.get_json()
+        if not isinstance(ids_cuentas, list) or not ids_cuentas:
+            return jsonify({'error': 'Se esperaba una lista no vacía de IDs de cuenta'}), 400
+        if len(ids_cuentas) > MAX_CUENTAS_VERIFICAR:
+            return jsonify({'error': f'No se pueden verificar más de {MAX_CUENTAS_VERIFICAR} cuentas a la vez'}), 400
+        if not all(isinstance(id_cuenta, int) and not isinstance(id_cuenta, bool) for id_cuenta in ids_cuentas):
+            return jsonify({'error': 'Los IDs de cuenta deben ser números enteros'}), 400
+
+        # dict.fromkeys quita los repetidos manteniendo el orden.
+        instancias, errores = obtener_instancias_cuentas(
+            list(dict.fromkeys(ids_cuentas)), consistente=request.args.get('consistente') == '1')
+
+        cuentas = []
+        no_encontradas = 0
+        for id_cuenta in ids_cuentas:
+            instancia = instancias.get(id_cuenta)
+            if instancia is not None:
+                cuentas.append(describir_cuenta(id_cuenta, instancia))
+            elif id_cuenta in errores:
+                cuentas.append({'id_db': id_cuenta, 'error': f'Error al procesar la cuenta {id_cuenta}: {errores[id_cuenta]}'})
+            else:
+                no_encontradas += 1
+                cuentas.append({'id_db': id_cuenta, 'error': f'Cuenta con id {id_cuenta} no encontrada'})
+
+        return jsonify({
+            'cuentas': cuentas,
+            'encontradas': len(ids_cuentas) - no_encontradas,
+            'no_encontradas': no_encontradas
+        }), 200
+
+    except ErrorBaseDeDatos as e:
+        logging.error("Error al verificar un lote de cuentas: %s", e)
+        return jsonify({'error': f'Error al procesar las cuentas: {str(e)}'}), 500
+    except BadRequest:
+        logging.error("Error al decodificar el JSON de entrada de la verificación de cuentas.")
+        return jsonify({'error': 'JSON de entrada inválido'}), 400
+    except Exception as e:
+        logging.exception("Error inesperado al verificar un lote de cuentas: %s", e)
+        return jsonify({'error': 'Error interno inesperado'}), 500
+
+@aplicacion.route('/cuentas', methods=['GET'])
+def listar_cuentas():
+    """
+    Lista las cuentas paginando por clave (keyset), con coste constante por página
+    aunque la tabla tenga millones de filas.
+
+    Parámetros de la URL (todos opcionales):
+    - limite: Cuentas por página (por defecto 50, máximo 500).
+    - orden: Columna de orden: 'id' (por defecto), 'cantidad' o 'titular'. Las filas antiguas que
+      migrar_cuentas.py aún no ha convertido tienen esas columnas a NULL: salen al principio
+      (o al final con desc=1), ordenadas por id.
+    - desc: 1 para ordenar de mayor a menor.
+    - tipo: 'Cuenta' o 'CuentaJoven' para filtrar por tipo.
+    - token: El valor 'siguiente' de la respuesta anterior.
+
+    Devuelve:
+    - JSON con 'cuentas' (mismo formato que /cuentas/<id>/verificar) y 'siguiente'
+      (token de la página siguiente, o null si es la última).
+    """
+    try:
+        try:
+            limite = int(request.args.get('limite', LIMITE_PAGINA_CUENTAS))
+        except ValueError:
+            return jsonify({'error': 'El límite debe ser un número entero'}), 400
+        if not 1 <= limite <= MAX_LIMITE_PAGINA_CUENTAS:
+            return jsonify({'error': f'El límite debe estar entre 1 y {MAX_LIMITE_PAGINA_CUENTAS}'}), 400
+        columna_orden = request.args.get('orden', 'id')
+        if columna_orden not in COLUMNAS_ORDEN_CUENTAS:
+            return jsonify({'error': f'Orden no soportado: {columna_orden}'}), 400
+        tipo = request.args.get('tipo')
+        if tipo is not None and tipo not in ('Cuenta', 'CuentaJoven'):
+            return jsonify({'error': f'Tipo de cuenta no soportado: {tipo}'}), 400
+
+        try:
+            filas, siguiente = obtener_pagina(
+                'CuentasAlmacenadas',
+                columna_orden=columna_orden,
+                limite=limite,
+                token=request.args.get('token'),
+                filtro={'tipo_cuenta': tipo} if tipo else None,
+                descendente=request.args.get('desc') == '1',
+                columnas=COLUMNAS_CUENTA,
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        cuentas = [describir_cuenta(fila['id'], construir_instancia_cuenta(fila['id'], fila))
+                   for fila in completar_filas_sin_migrar(filas)]
+        return jsonify({'cuentas': cuentas, 'siguiente': siguiente}), 200
+
+    except (ErrorBaseDeDatos, ValueError) as e:
+        logging.error("Error al listar cuentas: %s", e)
+        return jsonify({'error': f'Error al listar las cuentas: {str(e)}'}), 500
+    except Exception as e:
+        logging.exception("Error inesperado al listar cuentas: %s", e)
         return jsonify({'error': 'Error interno inesperado'}), 500
 
+@aplicacion.route('/cuentas/exportar', methods=['GET'])
+def exportar_cuentas():
+    """
+    Exporta todas las cuentas en NDJSON (un objeto JSON por línea, mismo formato que
+    /cuentas/<id>/verificar), en streaming: las filas se leen de la BD y se envían
+    por bloques, sin cargar la tabla entera en memoria.
+
+    Parámetros de la URL (opcional):
+    - tipo: 'Cuenta' o 'CuentaJoven' para exportar solo ese tipo.
+    """
+    tipo = request.args.get('tipo')
+    if tipo is not None and tipo not in ('Cuenta', 'CuentaJoven'):
+        return jsonify({'error': f'Tipo de cuenta no soportado: {tipo}'}), 400
+
+    def generar():
+        # Un trozo de respuesta por bloque de filas, no una escritura por fila.
+        bloques = iterar_elementos(
+            'CuentasAlmacenadas',
+            filtro={'tipo_cuenta': tipo} if tipo else None,
+            orden=[('id', 'ASC')],
+            por_bloques=True,
+            columnas=COLUMNAS_CUENTA,
+        )
+        try:
+            for bloque in bloques:
+                yield b''.join(
+                    a_bytes(describir_cuenta(fila['id'], construir_instancia_cuenta(fila['id'], fila))) + b'\n'
+                    for fila in completar_filas_sin_migrar(bloque))
+        except (ErrorBaseDeDatos, ValueError) as e:
+            # La respuesta ya ha empezado: solo podemos registrar el error y cortar.
+            logging.error("Exportación de cuentas interrumpida: %s", e)
+        finally:
+            bloques.close()  # Libera la conexión aunque el cliente se desconecte.
+
+    return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+
 @aplicacion.route('/cuentas', methods=['POST'])
 def crear_objeto_cuenta():
     """
     Crea una nueva entrada para una Cuenta en la tabla 'CuentasAlmacenadas'.
-    Almacena el estado inicial del objeto como una cadena JSON.
+    Almacena el estado inicial del objeto en sus columnas (titular, cantidad).
 
     Espera un JSON con los parámetros del constructor de la clase Cuenta:
     - titular: Nombre del titular (obligatorio).
@@ -136,163 +373,105 @@ def crear_objeto_cuenta():
     try:
 
         datos_iniciales = request.get_json()
-        if not datos_iniciales or 'titular' not in datos_iniciales:
-            return jsonify({'error': 'Falta el campo "titular"'}), 400
-
-        titular = datos_iniciales['titular']
-
-        cantidad = datos_iniciales.get('cantidad', 0.00)
-        if not isinstance(titular, str) or not titular.strip():
-            return jsonify({'error': 'El titular debe ser una cadena no vacía'}), 400
-        if not isinstance(cantidad, (int, float)):
-            return jsonify({'error': 'La cantidad debe ser un número'}), 400
-        if cantidad < 0:
-             return jsonify({'error': 'La cantidad inicial no puede ser negativa'}), 400
+        estado_objeto, error = validar_datos_cuenta(datos_iniciales)
+        if error:
+            return jsonify({'error': error}), 400
 
         tipo = 'Cuenta'
 
-        estado_objeto = {
-            'titular': titular,
-            'cantidad': cantidad
-        }
-        datos_json_str = json.dumps(estado_objeto)
-        datos_db = {
-            'tipo_cuenta': tipo,
-            'datos_objeto': datos_json_str
-        }
+        datos_db = fila_cuenta(tipo, estado_objeto)
         cuenta_db_id = insertar_elemento('CuentasAlmacenadas', datos_db)
-        logging.info(f"Creada entrada para Cuenta con ID: {cuenta_db_id}")
+        logging.info("Creada entrada para Cuenta con ID: %s", cuenta_db_id)
         return jsonify({
             'message': 'Entrada de Cuenta creada exitosamente en BD',
             'id': cuenta_db_id
         }), 201
 
     except ErrorBaseDeDatos as e:
-        logging.error(f"Error de BD al crear entrada de cuenta: {e}")
+        logging.error("Error de BD al crear entrada de cuenta: %s", e)
         return jsonify({'error': str(e)}), 500
     except json.JSONDecodeError:
          logging.error("Error con el JSON de entrada.")
          return jsonify({'error': 'JSON de entrada inválido'}), 400
     except Exception as e:
-        logging.exception(f"Error inesperado al crear entrada de cuenta: {e}")
+        logging.exception("Error inesperado al crear entrada de cuenta: %s", e)
         return jsonify({'error': 'Error inesperado en el servidor'}), 500
 
 @aplicacion.route('/cuentas/<int:cuenta_id>/gasto', methods=['POST'])
 def realizar_gasto_objeto(cuenta_id):
     """
-    Realiza un gasto en una cuenta recuperando el objeto, usando su método,
-    y guardando el estado actualizado.
+    Realiza un gasto en una cuenta de forma atómica: la fila se lee y bloquea
+    (SELECT ... FOR UPDATE), se reconstruye el objeto, se usa su método realizar_gasto
+    y se guarda el estado actualizado en la misma transacción. Así dos gastos
+    concurrentes sobre la misma cuenta no se pisan.
 
     Espera un JSON con:
     - cantidad: El monto a gastar (obligatorio, positivo).
+    - version: Versión de la cuenta que conoce el cliente (opcional). Si se indica
+      y no coincide con la almacenada, se devuelve 409.
 
     Devuelve:
-    - JSON con mensaje de éxito y nuevo saldo, o
+    - JSON con mensaje de éxito, nuevo saldo y nueva versión, o
     - JSON con error si falla.
     """
     try:
         # Obtener la cantidad del gasto desde el JSON de la solicitud.
-        datos_gasto = request.get_json()
-        if not datos_gasto or 'cantidad' not in datos_gasto:
-            return jsonify({'error': 'Falta el campo "cantidad" en el cuerpo JSON'}), 400
-
-        cantidad = datos_gasto['cantidad']
+        cantidad, version_esperada, error = validar_gasto(request.get_json())
+        if error:
+            return jsonify({'error': error}), 400
 
-        # Validar cantidad.
-        if not isinstance(cantidad, (int, float)):
-            return jsonify({'error': 'La cantidad debe ser un número'}), 400
-        if cantidad <= 0:
-            return jsonify({'error': 'La cantidad del gasto debe ser positiva'}), 400
+        estado_nuevo = {} # Lo rellena aplicar_gasto con el estado guardado.
 
-        # Obtener la instancia del objeto Cuenta/CuentaJoven.
-        cuenta_obj = obtener_instancia_cuenta(cuenta_id)
-
-        # Verificar si la cuenta existe.
-        if cuenta_obj is None:
-            return jsonify({'error': f'Cuenta con id {cuenta_id} no encontrada'}), 404
+        def aplicar_gasto(fila):
+            """Aplica el gasto sobre la fila bloqueada y devuelve las columnas a guardar."""
+            datos_db, estado = aplicar_gasto_fila(cuenta_id, fila, cantidad)
+            estado_nuevo.update(estado)
+            return datos_db
 
-        # Guardamos el saldo antes por si el método realizar_gasto solo imprime
-        # y no modifica en caso de error (como en la clase Cuenta base).
-        saldo_anterior = cuenta_obj.consultar_saldo()
-
-        # Intentar realizar el gasto usando el método del objeto.
-        try:
-            # NOTA: La clase Cuenta original solo imprime "Saldo insuficiente".
-            # La clase CuentaJoven lanza ValueError si el titular no es válido.
-            cuenta_obj.realizar_gasto(cantidad)
-        except ValueError as e:
-            # Capturamos el error específico de CuentaJoven si el titular no es válido.
-            logging.warning(f"Intento de gasto rechazado para cuenta joven {cuenta_id}: {e}")
-            return jsonify({'error': f"Gasto no permitido: {e}"}), 403 # Forbidden o 400 Bad Request
-
-        # Verificar si el saldo cambió (importante para la clase Cuenta base).
-        saldo_despues = cuenta_obj.consultar_saldo()
-        if saldo_anterior == saldo_despues and isinstance(cuenta_obj, Cuenta) and not isinstance(cuenta_obj, CuentaJoven):
-             # Si el saldo no cambió y es una Cuenta normal, asumimos saldo insuficiente
-             # (basado en el comportamiento de la clase original que solo imprime).
-             logging.warning(f"Gasto no realizado en cuenta {cuenta_id} (probablemente saldo insuficiente).")
-             return jsonify({'error': 'Saldo insuficiente para realizar el gasto'}), 400 # Bad Request
-
-        # Preparar el estado actualizado para guardar en la BD.
-        tipo_cuenta = cuenta_obj.__class__.__name__ # 'Cuenta' o 'CuentaJoven'
-
-        # Reconstruir el diccionario de atributos desde el objeto MODIFICADO.
-        if isinstance(cuenta_obj, CuentaJoven):
-            estado_actualizado = {
-                'titular': cuenta_obj.consultar_titular(), # Usamos getters si existen/preferimos.
-                'cantidad': cuenta_obj.consultar_saldo(),
-                'bonificacion': cuenta_obj.get_bonificacion(),
-                'edad': cuenta_obj.get_edad()
-            }
-        elif isinstance(cuenta_obj, Cuenta):
-             estado_actualizado = {
-                'titular': cuenta_obj.consultar_titular(),
-                'cantidad': cuenta_obj.consultar_saldo()
-             }
-        else:
-             # Esto no debería pasar si obtener_instancia_cuenta funciona bien.
-             logging.error(f"Tipo de objeto inesperado {tipo_cuenta} después de obtener instancia {cuenta_id}")
-             raise TypeError("Tipo de objeto inesperado.")
-
-        datos_json_actualizado = json.dumps(estado_actualizado)
-
-        # Datos para la función actualizar_elemento.
-        datos_db_actualizar = {
-            'datos_objeto': datos_json_actualizado
-        }
-
-        # Actualizar la entrada en la base de datos.
+        # Leer, aplicar y guardar en una sola transacción.
         # Usamos 'id' como columna identificadora para la tabla CuentasAlmacenadas.
-        actualizado = actualizar_elemento('CuentasAlmacenadas', 'id', cuenta_id, datos_db_actualizar)
-
-        if actualizado:
-            logging.info(f"Gasto de {cantidad} procesado y guardado para cuenta id={cuenta_id}. Nuevo saldo: {saldo_despues}")
-            return jsonify({
-                'message': 'Gasto realizado y estado actualizado exitosamente',
-                'id': cuenta_id,
-                'nuevo_saldo': saldo_despues
-            }), 200
-        else:
-            # Si la actualización falla por alguna razón inesperada.
-            logging.error(f"Se procesó el gasto para id={cuenta_id}, pero falló la actualización en BD.")
-            # Podríamos intentar revertir el cambio en memoria aquí, pero es complejo.
-            # Devolver un error 500 es lo más seguro.
-            return jsonify({'error': 'El gasto se procesó pero no se pudo guardar el nuevo estado'}), 500
+        try:
+            fila_actualizada = actualizar_elemento_atomico(
+                'CuentasAlmacenadas', 'id', cuenta_id, aplicar_gasto, version_esperada=version_esperada,
+                columnas=COLUMNAS_CUENTA)
+        except FilaSinMigrar:
+            # Fila antigua: se deshizo sin cambios, se repite leyendo también 'datos_objeto'.
+            fila_actualizada = actualizar_elemento_atomico(
+                'CuentasAlmacenadas', 'id', cuenta_id, aplicar_gasto, version_esperada=version_esperada,
+                columnas=COLUMNAS_CUENTA_ANTIGUA)
+
+        if fila_actualizada is None:
+            return jsonify({'error': f'Cuenta con id {cuenta_id} no encontrada'}), 404
 
+        nuevo_saldo = estado_nuevo['cantidad']
+        logging.info("Gasto de %s procesado y guardado para cuenta id=%s. Nuevo saldo: %s", cantidad, cuenta_id, nuevo_saldo)
+        return jsonify({
+            'message': 'Gasto realizado y estado actualizado exitosamente',
+            'id': cuenta_id,
+            'nuevo_saldo': nuevo_saldo,
+            'version': fila_actualizada['version']
+        }), 200
+
+    except GastoRechazado as e:
+        logging.warning("Intento de gasto rechazado para cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': str(e)}), e.codigo_http
+    except ErrorConflictoVersion as e:
+        logging.warning("Conflicto de versión en el gasto de la cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': f'La cuenta ha sido modificada: {str(e)}'}), 409 # Conflict
     except (ErrorBaseDeDatos, ValueError, TypeError) as e: # Capturamos errores de BD, datos inválidos, o tipos.
-        logging.error(f"Error procesando gasto para cuenta {cuenta_id}: {e}")
+        logging.error("Error procesando gasto para cuenta %s: %s", cuenta_id, e)
         # Devolvemos 500 para DB errors, 400 podría ser para ValueError/TypeError dependiendo del contexto
-        # pero 500 es seguro si el error viene de obtener_instancia_cuenta o errores internos.
+        # pero 500 es seguro si el error viene de construir_instancia_cuenta o errores internos.
         return jsonify({'error': f'Error al procesar el gasto: {str(e)}'}), 500
     except Exception as e:
-        logging.exception(f"Error inesperado procesando gasto para cuenta {cuenta_id}: {e}")
+        logging.exception("Error inesperado procesando gasto para cuenta %s: %s", cuenta_id, e)
         return jsonify({'error': 'Error interno inesperado'}), 500
 
 @aplicacion.route('/Cuenta_joven', methods=['POST'])
 def crear_objeto_cuenta_joven():
     """
     Crea una nueva entrada para una CuentaJoven en la tabla 'CuentasAlmacenadas'.
-    Almacena el estado inicial del objeto (incluyendo bonificación y edad) como JSON.
+    Almacena el estado inicial del objeto (incluyendo bonificación y edad) en sus columnas.
 
     Espera un JSON con:
     - titular: Nombre del titular (obligatorio).
@@ -309,66 +488,116 @@ def crear_objeto_cuenta_joven():
         datos_iniciales = request.get_json()
 
         # Validación de la entrada (parámetros para el constructor de CuentaJoven).
-        campos_requeridos = ['titular', 'bonificacion', 'edad']
-        if not datos_iniciales or any(campo not in datos_iniciales for campo in campos_requeridos):
-            campos_faltantes = [campo for campo in campos_requeridos if not datos_iniciales or campo not in datos_iniciales]
-            return jsonify({'error': f'Faltan campos obligatorios: {", ".join(campos_faltantes)}'}), 400
-
-        titular = datos_iniciales['titular']
-        cantidad = datos_iniciales.get('cantidad', 0.00) # Opcional, default 0.00.
-        bonificacion = datos_iniciales['bonificacion']
-        edad = datos_iniciales['edad']
-
-        # Validaciones adicionales de tipo y valor.
-        if not isinstance(titular, str) or not titular.strip():
-            return jsonify({'error': 'El titular debe ser una cadena no vacía'}), 400
-        if not isinstance(cantidad, (int, float)) or cantidad < 0:
-            return jsonify({'error': 'La cantidad debe ser un número no negativo'}), 400
-        if not isinstance(bonificacion, (int, float)) or bonificacion < 0: # Podríamos validar un rango 0-100.
-            return jsonify({'error': 'La bonificación debe ser un número no negativo'}), 400
-        if not isinstance(edad, int) or edad <= 0: # La edad debería ser un entero positivo.
-             return jsonify({'error': 'La edad debe ser un número entero positivo'}), 400
-        # Nota: NO estamos validando aquí si es TitularValido (18 <= edad < 25),
-        # solo que los datos sean correctos. Esa lógica pertenece al objeto.
+        estado_objeto, error = validar_datos_cuenta_joven(datos_iniciales)
+        if error:
+            return jsonify({'error': error}), 400
 
         # Preparar los datos para almacenar en la BD.
         tipo = 'CuentaJoven' # Especificamos el tipo correcto.
 
-        # Creamos el diccionario que representa el estado del objeto CuentaJoven.
-        estado_objeto = {
-            'titular': titular,
-            'cantidad': cantidad,
-            'bonificacion': bonificacion,
-            'edad': edad
-        }
-
-        # Convertimos a cadena JSON.
-        datos_json_str = json.dumps(estado_objeto)
-
-        # Datos a insertar en la tabla 'CuentasAlmacenadas'.
-        datos_db = {
-            'tipo_cuenta': tipo,
-            'datos_objeto': datos_json_str
-        }
+        # Datos a insertar en las columnas de la tabla 'CuentasAlmacenadas'.
+        datos_db = fila_cuenta(tipo, estado_objeto)
 
         # Insertar en la base de datos.
         cuenta_db_id = insertar_elemento('CuentasAlmacenadas', datos_db)
 
         # Devolver una respuesta de éxito.
-        logging.info(f"Creada entrada para CuentaJoven con ID: {cuenta_db_id}")
+        logging.info("Creada entrada para CuentaJoven con ID: %s", cuenta_db_id)
         return jsonify({
             'message': 'Entrada de CuentaJoven creada exitosamente en BD',
             'id': cuenta_db_id
         }), 201 # Created
 
     except ErrorBaseDeDatos as e:
-        logging.error(f"Error de BD al crear entrada de cuenta joven: {e}")
+        logging.error("Error de BD al crear entrada de cuenta joven: %s", e)
         return jsonify({'error': str(e)}), 500
     except json.JSONDecodeError:
          logging.error("Error al decodificar el JSON de entrada para cuenta joven.")
          return jsonify({'error': 'JSON de entrada inválido'}), 400
     except Exception as e:
-        logging.exception(f"Error inesperado al crear entrada de cuenta joven: {e}")
+        logging.exception("Error inesperado al crear entrada de cuenta joven: %s", e)
+        return jsonify({'error': 'Error inesperado en el servidor'}), 500
+
+@aplicacion.route('/cuentas/lote', methods=['POST'])
+def crear_cuentas_lote():
+    """
+    Crea muchas cuentas (Cuenta y CuentaJoven mezcladas) en una sola petición.
+    Cada elemento se valida con las mismas reglas que POST /cuentas y POST /Cuenta_joven,
+    y los válidos se insertan con INSERT de varias filas en una sola transacción.
+    Los elementos no válidos se informan sin abortar el resto del lote; si falla la BD
+    no se crea ninguna cuenta (se puede repetir la petición sin duplicar cuentas).
+
+    Espera un JSON con una lista de objetos. Cada objeto puede indicar
+    'tipo_cuenta' ('Cuenta' o 'CuentaJoven'); si no lo indica, se considera
+    CuentaJoven cuando trae 'bonificacion' o 'edad'.
+
+    Devuelve:
+    - JSON con 'resultados' (uno por elemento y en el mismo orden, con 'id' o 'error'),
+      201 si se crearon todas, 207 si solo algunas, 400 si ninguna o si el JSON no es válido.
+    - 500 si falla la BD (ninguna cuenta creada).
+    """
+    try:
+        lote = request.get_json()
+        if not isinstance(lote, list) or not lote:
+            return jsonify({'error': 'Se esperaba una lista no vacía de cuentas'}), 400
+        if len(lote) > MAX_CUENTAS_LOTE:
+            return jsonify({'error': f'El lote no puede tener más de {MAX_CUENTAS_LOTE} cuentas'}), 400
+
+        resultados = [None] * len(lote)
+        indices_validos = []
+        filas_db = []
+        for indice, datos_iniciales in enumerate(lote):
+            if not isinstance(datos_iniciales, dict):
+                resultados[indice] = {'indice': indice, 'error': 'Cada elemento debe ser un objeto JSON'}
+                continue
+
+            tipo = datos_iniciales.get('tipo_cuenta')
+            if tipo is None:
+                tipo = 'CuentaJoven' if ('bonificacion' in datos_iniciales or 'edad' in datos_iniciales) else 'Cuenta'
+
+            if tipo == 'Cuenta':
+                estado_objeto, error = validar_datos_cuenta(datos_iniciales)
+            elif tipo == 'CuentaJoven':
+                estado_objeto, error = validar_datos_cuenta_joven(datos_iniciales)
+            else:
+                estado_objeto, error = None, f'Tipo de cuenta no soportado: {tipo}'
+
+            if error:
+                resultados[indice] = {'indice': indice, 'error': error}
+                continue
+
+            indices_validos.append(indice)
+            filas_db.append(fila_cuenta(tipo, estado_objeto))
+
+        # Insertar todas las filas válidas (los IDs vuelven en el mismo orden).
+        ids = insertar_elementos('CuentasAlmacenadas', filas_db) if filas_db else []
+        for indice, cuenta_db_id in zip(indices_validos, ids):
+            resultados[indice] = {'indice': indice, 'id': cuenta_db_id}
+
+        creadas = len(ids)
+        errores = len(lote) - creadas
+        logging.info("Lote de cuentas procesado: %s creadas, %s con errores.", creadas, errores)
+        if errores == 0:
+            codigo = 201 # Created
+        elif creadas:
+            codigo = 207 # Multi-Status
+        else:
+            codigo = 400
+        return jsonify({
+            'message': f'{creadas} cuentas creadas, {errores} con errores',
+            'creadas': creadas,
+            'errores': errores,
+            'resultados': resultados
+        }), codigo
+
+    except ErrorBaseDeDatos as e:
+        logging.error("Error de BD al crear lote de cuentas: %s", e)
+        return jsonify({'error': f'No se ha creado ninguna cuenta del lote: {str(e)}'}), 500
+    except BadRequest:
+        logging.error("Error al decodificar el JSON de entrada del lote de cuentas.")
+        return jsonify({'error': 'JSON de entrada inválido'}), 400
+    except Exception as e:
+        logging.exception("Error inesperado al crear lote de cuentas: %s", e)
         return jsonify({'error': 'Error inesperado en el servidor'}), 500
 
 @aplicacion.route('/apiregistro', methods=['POST'])
@@ -382,43 +611,16 @@ def api_registro_usuario():
         datos_registro = request.get_json()
 
         # Validar la entrada: campos obligatorios y tipos.
-        campos_requeridos = ['dni_usuario', 'contraseña', 'id_cuenta']
-        if not datos_registro or any(campo not in datos_registro for campo in campos_requeridos):
-            campos_faltantes = [campo for campo in campos_requeridos if not datos_registro or campo not in datos_registro]
-            return jsonify({'error': f'Faltan campos obligatorios: {", ".join(campos_faltantes)}'}), 400
-
-        dni_usuario = datos_registro['dni_usuario']
-        contraseña = datos_registro['contraseña']
-        id_cuenta_str = datos_registro['id_cuenta']
-
-        # Validar tipos y formatos.
-        if not isinstance(dni_usuario, str) or not dni_usuario.strip():
-            return jsonify({'error': 'El DNI de usuario debe ser una cadena no vacía'}), 400
-        if not isinstance(contraseña, str) or not contraseña.strip(): # Aunque ya hasheada, debe ser string no vacía.
-            return jsonify({'error': 'La contraseña debe ser una cadena no vacía'}), 400
-        if not isinstance(id_cuenta_str, (str, int)): # Aceptamos str o int inicialmente, luego convertimos a int.
-            return jsonify({'error': 'El ID de cuenta debe ser un número entero'}), 400
-
-        try:
-            id_cuenta = int(id_cuenta_str) # Intentar convertir a entero.
-            if id_cuenta <= 0:
-                raise ValueError # Lanzar error si no es positivo.
-        except ValueError:
-            return jsonify({'error': 'El ID de cuenta debe ser un número entero positivo válido'}), 400
-
-        # Verifico que tal id existe.
-        cuenta = obtener_todos_los_elementos('CuentasAlmacenadas', filtro={'id': id_cuenta})
-        if not cuenta:
+        datos_usuario_db, error = validar_registro(datos_registro)
+        if error:
+            return jsonify({'error': error}), 400
+        dni_usuario = datos_usuario_db['dni_usuario']
+        id_cuenta = datos_usuario_db['fk_id_cuenta']
+
+        # Verifico que tal id existe (sin leer la fila).
+        if not existe_elemento('CuentasAlmacenadas', {'id': id_cuenta}):
             return jsonify({'error': 'Cuenta no encontrada'}), 404
 
-
-        # Preparar datos para la inserción en la tabla Usuarios.
-        datos_usuario_db = {
-            'dni_usuario': dni_usuario,
-            'contraseña': contraseña,
-            'fk_id_cuenta': id_cuenta # Usamos el ID de cuenta convertido a entero.
-        }
-
         # Insertar el nuevo usuario en la base de datos.
         try:
             usuario_id = insertar_elemento('Usuarios', datos_usuario_db)
@@ -431,7 +633,7 @@ def api_registro_usuario():
 
 
         # Devolver respuesta de éxito.
-        logging.info(f"Usuario registrado con DNI: {dni_usuario} y vinculado a cuenta ID: {id_cuenta}")
+        logging.info("Usuario registrado con DNI: %s y vinculado a cuenta ID: %s", dni_usuario, id_cuenta)
         return jsonify({
             'message': 'Usuario registrado exitosamente y vinculado a la cuenta',
             'dni_usuario': dni_usuario,
@@ -439,13 +641,13 @@ def api_registro_usuario():
         }), 201 # Created
 
     except ErrorBaseDeDatos as e:
-        logging.error(f"Error de BD al registrar usuario: {e}")
+        logging.error("Error de BD al registrar usuario: %s", e)
         return jsonify({'error': f'Error de base de datos al registrar usuario: {str(e)}'}), 500
     except json.JSONDecodeError:
         logging.error("Error al decodificar JSON de entrada para registro de usuario.")
         return jsonify({'error': 'JSON de entrada inválido'}), 400
     except Exception as e:
-        logging.exception(f"Error inesperado al registrar usuario: {e}")
+        logging.exception("Error inesperado al registrar usuario: %s", e)
         return jsonify({'error': 'Error interno inesperado'}), 500
 
 
@@ -0,0 +1,208 @@
+# file: app_async.py
+# Versión ASGI (Quart + aiomysql) de los endpoints de cuentas de app.py, con el mismo
+# contrato de peticiones/respuestas para poder compararlas (A/B) detrás de Nginx.
+# Un worker atiende muchas peticiones a la vez mientras esperan a la BD.
+#
+# hypercorn --bind 0.0.0.0:8000 app_async:aplicacion
+from quart import Quart, request, jsonify
+from quart_cors import cors
+from db_async import *
+from cuentas import *
+from registro import configurar_registro
+import logging
+
+aplicacion = cors(Quart(__name__))
+# Configuración del registro (logging): asíncrona, ver registro.py.
+configurar_registro()
+
+
+@aplicacion.after_serving
+async def cerrar_conexiones():
+    await cerrar_pool()
+
+
+async def obtener_instancia_cuenta(id_cuenta: int):
+    """
+    Versión asíncrona de app.obtener_instancia_cuenta (sin caché).
+
+    Returns:
+        Una instancia de Cuenta o CuentaJoven, o None si no existe.
+        Lanza ValueError si los datos están corruptos o el tipo es desconocido.
+        Lanza ErrorBaseDeDatos si hay un problema con la BD.
+    """
+    try:
+        resultados = await obtener_todos_los_elementos(
+            'CuentasAlmacenadas',
+            filtro={'id': id_cuenta},
+            limite=1, # Solo esperamos un resultado
+            columnas=COLUMNAS_CUENTA
+        )
+        if resultados and es_fila_sin_migrar(resultados[0]):
+            # Fila antigua: su estado sigue en 'datos_objeto' (ver app.completar_filas_sin_migrar).
+            resultados = await obtener_todos_los_elementos(
+                'CuentasAlmacenadas', filtro={'id': id_cuenta}, limite=1, columnas=COLUMNAS_CUENTA_ANTIGUA)
+        if not resultados:
+            logging.info("No se encontró cuenta almacenada con id=%s", id_cuenta)
+            return None # Indica que no existe
+        return construir_instancia_cuenta(id_cuenta, resultados[0])
+
+    except ErrorBaseDeDatos as db_err:
+        logging.error("Error de base de datos al intentar obtener cuenta id=%s: %s", id_cuenta, db_err)
+        raise # Re-lanzamos la excepción para que el endpoint la maneje
+
+@aplicacion.route('/')
+async def indice():
+    return "Estas llamando al Servidor Python de API, ingresa la ruta correcta y respondere!"
+
+@aplicacion.route('/cuentas/<int:cuenta_id>/verificar', methods=['GET'])
+async def verificar_objeto_cuenta(cuenta_id):
+    """Igual que GET /cuentas/<id>/verificar de app.py."""
+    try:
+        cuenta_temporal = await obtener_instancia_cuenta(cuenta_id)
+
+        if cuenta_temporal is None:
+            return jsonify({'error': f'Cuenta con id {cuenta_id} no encontrada'}), 404
+
+        return jsonify(describir_cuenta(cuenta_id, cuenta_temporal)), 200
+
+    except (ErrorBaseDeDatos, ValueError) as e: # Capturamos errores específicos.
+        logging.error("Error al verificar cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': f'Error al procesar la cuenta {cuenta_id}: {str(e)}'}), 500
+    except Exception as e:
+        logging.exception("Error inesperado al verificar cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': 'Error interno inesperado'}), 500
+
+@aplicacion.route('/cuentas', methods=['POST'])
+async def crear_objeto_cuenta():
+    """Igual que POST /cuentas de app.py."""
+    try:
+        estado_objeto, error = validar_datos_cuenta(await request.get_json())
+        if error:
+            return jsonify({'error': error}), 400
+
+        cuenta_db_id = await insertar_elemento('CuentasAlmacenadas', fila_cuenta('Cuenta', estado_objeto))
+        logging.info("Creada entrada para Cuenta con ID: %s", cuenta_db_id)
+        return jsonify({
+            'message': 'Entrada de Cuenta creada exitosamente en BD',
+            'id': cuenta_db_id
+        }), 201
+
+    except ErrorBaseDeDatos as e:
+        logging.error("Error de BD al crear entrada de cuenta: %s", e)
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
+        logging.exception("Error inesperado al crear entrada de cuenta: %s", e)
+        return jsonify({'error': 'Error inesperado en el servidor'}), 500
+
+@aplicacion.route('/cuentas/<int:cuenta_id>/gasto', methods=['POST'])
+async def realizar_gasto_objeto(cuenta_id):
+    """Igual que POST /cuentas/<id>/gasto de app.py (transacción con SELECT ... FOR UPDATE)."""
+    try:
+        cantidad, version_esperada, error = validar_gasto(await request.get_json())
+        if error:
+            return jsonify({'error': error}), 400
+
+        estado_nuevo = {} # Lo rellena aplicar_gasto con el estado guardado.
+
+        def aplicar_gasto(fila):
+            datos_db, estado = aplicar_gasto_fila(cuenta_id, fila, cantidad)
+            estado_nuevo.update(estado)
+            return datos_db
+
+        try:
+            fila_actualizada = await actualizar_elemento_atomico(
+                'CuentasAlmacenadas', 'id', cuenta_id, aplicar_gasto, version_esperada=version_esperada,
+                columnas=COLUMNAS_CUENTA)
+        except FilaSinMigrar:
+            # Fila antigua: se deshizo sin cambios, se repite leyendo también 'datos_objeto'.
+            fila_actualizada = await actualizar_elemento_atomico(
+                'CuentasAlmacenadas', 'id', cuenta_id, aplicar_gasto, version_esperada=version_esperada,
+                columnas=COLUMNAS_CUENTA_ANTIGUA)
+
+        if fila_actualizada is None:
+            return jsonify({'error': f'Cuenta con id {cuenta_id} no encontrada'}), 404
+
+        nuevo_saldo = estado_nuevo['cantidad']
+        logging.info("Gasto de %s procesado y guardado para cuenta id=%s. Nuevo saldo: %s", cantidad, cuenta_id, nuevo_saldo)
+        return jsonify({
+            'message': 'Gasto realizado y estado actualizado exitosamente',
+            'id': cuenta_id,
+            'nuevo_saldo': nuevo_saldo,
+            'version': fila_actualizada['version']
+        }), 200
+
+    except GastoRechazado as e:
+        logging.warning("Intento de gasto rechazado para cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': str(e)}), e.codigo_http
+    except ErrorConflictoVersion as e:
+        logging.warning("Conflicto de versión en el gasto de la cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': f'La cuenta ha sido modificada: {str(e)}'}), 409 # Conflict
+    except (ErrorBaseDeDatos, ValueError, TypeError) as e:
+        logging.error("Error procesando gasto para cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': f'Error al procesar el gasto: {str(e)}'}), 500
+    except Exception as e:
+        logging.exception("Error inesperado procesando gasto para cuenta %s: %s", cuenta_id, e)
+        return jsonify({'error': 'Error interno inesperado'}), 500
+
+@aplicacion.route('/Cuenta_joven', methods=['POST'])
+async def crear_objeto_cuenta_joven():
+    """Igual que POST /Cuenta_joven de app.py."""
+    try:
+        estado_objeto, error = validar_datos_cuenta_joven(await request.get_json())
+        if error:
+            return jsonify({'error': error}), 400
+
+        cuenta_db_id = await insertar_elemento('CuentasAlmacenadas', fila_cuenta('CuentaJoven', estado_objeto))
+        logging.info("Creada entrada para CuentaJoven con ID: %s", cuenta_db_id)
+        return jsonify({
+            'message': 'Entrada de CuentaJoven creada exitosamente en BD',
+            'id': cuenta_db_id
+        }), 201 # Created
+
+    except ErrorBaseDeDatos as e:
+        logging.error("Error de BD al crear entrada de cuenta joven: %s", e)
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
+        logging.exception("Error inesperado al crear entrada de cuenta joven: %s", e)
+        return jsonify({'error': 'Error inesperado en el servidor'}), 500
+
+@aplicacion.route('/apiregistro', methods=['POST'])
+async def api_registro_usuario():
+    """Igual que POST /apiregistro de app.py."""
+    try:
+        datos_usuario_db, error = validar_registro(await request.get_json())
+        if error:
+            return jsonify({'error': error}), 400
+        dni_usuario = datos_usuario_db['dni_usuario']
+        id_cuenta = datos_usuario_db['fk_id_cuenta']
+
+        # Verifico que tal id existe (sin leer la fila).
+        if not await existe_elemento('CuentasAlmacenadas', {'id': id_cuenta}):
+            return jsonify({'error': 'Cuenta no encontrada'}), 404
+
+        try:
+            await insertar_elemento('Usuarios', datos_usuario_db)
+        except ErrorBaseDeDatos as e:
+            # Manejar el caso de DNI duplicado al registrar usuario.
+            if "Duplicate entry" in str(e) and dni_usuario in str(e):
+              return jsonify({'error': f'Ya existe un usuario con este DNI'}), 400
+            else:
+               return jsonify({'error': f'Error de base de datos al registrar usuario: {str(e)}'}), 500
+
+        logging.info("Usuario registrado con DNI: %s y vinculado a cuenta ID: %s", dni_usuario, id_cuenta)
+        return jsonify({
+            'message': 'Usuario registrado exitosamente y vinculado a la cuenta',
+            'dni_usuario': dni_usuario,
+            'cuenta_id': id_cuenta
+        }), 201 # Created
+
+    except ErrorBaseDeDatos as e:
+        logging.error("Error de BD al registrar usuario: %s", e)
+        return jsonify({'error': f'Error de base de datos al registrar usuario: {str(e)}'}), 500
+    except Exception as e:
+        logging.exception("Error inesperado al registrar usuario: %s", e)
+        return jsonify({'error': 'Error interno inesperado'}), 500
+
+
+if __name__ == '__main__':
+    aplicacion.run(debug=True)
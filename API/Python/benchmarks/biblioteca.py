@@ -0,0 +1,129 @@
+# file: benchmarks/biblioteca.py
+# Biblioteca de ejercicios_python/EJ05 (índices por título y por autor) frente a la versión
+# con lista: carga del catálogo, préstamos, devoluciones, consultas por autor, bajas y
+# totalCopias.
+#
+#   python benchmarks/biblioteca.py --libros 1000000
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+from ejercicios_python.EJ05.EJ5 import Biblioteca, Libro  # noqa: E402
+
+
+class BibliotecaLista:
+    """Biblioteca con los libros en una lista, como la versión original."""
+    def __init__(self):
+        self.biblioteca = []
+
+    def agregarLibro(self, libro):
+        if not self.libro_existe(libro.titulo):
+            self.biblioteca.append(libro)
+            return True
+        return False
+
+    def libro_existe(self, titulo):
+        for libro_actual in self.biblioteca:
+            if libro_actual.titulo == titulo:
+                return True
+        return False
+
+    def eliminarLibro(self, titulo):
+        for libro_actual in self.biblioteca:
+            if libro_actual.titulo == titulo:
+                self.biblioteca.remove(libro_actual)
+                return
+        raise ValueError(f"No se encontró el libro con el título {titulo} en la biblioteca.")
+
+    def consultar(self, autor=None):
+        libros_a_mostrar = [l for l in self.biblioteca if l.autor == autor] if autor else self.biblioteca
+        for libro_actual in libros_a_mostrar:
+            print(f"Título: {libro_actual.titulo}, Autor: {libro_actual.autor}, Fecha de Publicación: {libro_actual.fech_pub.strftime('%d-%m-%Y')}, Número de Copias: {libro_actual.num_cop}")
+
+    def prestarLibro(self, titulo):
+        for libro_actual in self.biblioteca:
+            if libro_actual.titulo == titulo:
+                if libro_actual.num_cop > 0:
+                    libro_actual.num_cop -= 1
+                    return True
+                return False
+        return False
+
+    def devolverLibro(self, titulo):
+        for libro_actual in self.biblioteca:
+            if libro_actual.titulo == titulo:
+                libro_actual.num_cop += 1
+                return True
+        return False
+
+    def totalCopias(self):
+        return sum(libro_actual.num_cop for libro_actual in self.biblioteca)
+
+
+def medir(nombre, funcion, operaciones=None):
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # consultar imprime cada libro.
+        funcion()
+    duracion = time.perf_counter() - inicio
+    por_operacion = f"  ({duracion / operaciones * 1e6:10.2f} µs/op)" if operaciones else ""
+    print(f"  {nombre:<38} {duracion:10.4f} s{por_operacion}")
+
+
+def crear_libros(n, autores):
+    # Libro.__init__ parsea la fecha con strptime: se copia una plantilla para no medir eso.
+    plantilla = Libro("plantilla", "autor", "01-01-2000", 1)
+    libros = []
+    for i in range(n):
+        libro = Libro.__new__(Libro)
+        libro.__dict__.update(plantilla.__dict__)
+        libro.titulo = f"Título {i:07d}"
+        libro.autor = f"Autor {i % autores:05d}"
+        libro.num_cop = 1 + i % 5
+        libros.append(libro)
+    return libros
+
+
+def ejecutar(clase, libros, operaciones):
+    biblioteca = clase()
+    print(f"{clase.__name__}:")
+    if clase is BibliotecaLista:
+        # agregarLibro comprueba duplicados recorriendo la lista: cargarla así sería cuadrático.
+        medir(f"cargar {len(libros)} libros (sin comprobar)", lambda: biblioteca.biblioteca.extend(libros))
+    else:
+        medir(f"cargar {len(libros)} libros", lambda: [biblioteca.agregarLibro(l) for l in libros])
+    paso = max(1, len(libros) // operaciones)
+    titulos = [l.titulo for l in libros[::paso][:operaciones]]
+    medir(f"{len(titulos)} préstamos", lambda: [biblioteca.prestarLibro(t) for t in titulos], len(titulos))
+    medir(f"{len(titulos)} devoluciones", lambda: [biblioteca.devolverLibro(t) for t in titulos], len(titulos))
+    consultas = min(len(titulos), 100)
+    medir(f"{consultas} consultas por autor",
+          lambda: [biblioteca.consultar(f"Autor {i:05d}") for i in range(consultas)], consultas)
+    medir(f"{len(titulos)} bajas", lambda: [biblioteca.eliminarLibro(t) for t in titulos], len(titulos))
+    medir(f"{len(titulos)} totalCopias", lambda: [biblioteca.totalCopias() for _ in titulos], len(titulos))
+    return biblioteca.totalCopias()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Biblioteca indexada frente a biblioteca con lista.")
+    parser.add_argument('--libros', type=int, default=100000)
+    parser.add_argument('--operaciones', type=int, default=1000, help="Préstamos, devoluciones y bajas que se miden.")
+    parser.add_argument('--autores', type=int, default=20000)
+    parser.add_argument('--sin-lista', action='store_true', help="No medir la versión con lista (lenta con muchos libros).")
+    args = parser.parse_args()
+
+    totales = []
+    clases = (Biblioteca,) if args.sin_lista else (BibliotecaLista, Biblioteca)
+    for clase in clases:
+        # Libros nuevos para cada versión: los préstamos cambian num_cop.
+        totales.append(ejecutar(clase, crear_libros(args.libros, args.autores), args.operaciones))
+    print(f"Mismo total de copias final: {'sí' if len(set(totales)) == 1 else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# file: benchmarks/biblioteca_carga.py
+# Carga masiva de libros de ejercicios_python/EJ05: Libro con datetime.strptime (como la
+# versión original, que además importaba datetime en cada construcción) frente a Libro con
+# parsear_fecha, y Biblioteca.importarCatalogo desde un CSV.
+#
+#   python benchmarks/biblioteca_carga.py --libros 1000000
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+from ejercicios_python.EJ05 import EJ5  # noqa: E402
+from ejercicios_python.EJ05.EJ5 import Biblioteca, Libro, parsear_fecha  # noqa: E402
+
+
+class LibroOriginal:
+    """Libro.__init__ como era: import y strptime en cada construcción."""
+    def __init__(self, titulo, autor, fech_pub, num_cop):
+        from datetime import datetime
+        self.titulo = titulo
+        self.autor = autor
+        try:
+            self.fech_pub = datetime.strptime(fech_pub, "%d-%m-%Y")
+        except ValueError:
+            raise ValueError("El formato de fecha debe ser DD-MM-YYYY")
+        self.num_cop = num_cop
+
+
+def crear_filas(n, fechas_distintas, semilla):
+    azar = random.Random(semilla)
+    fechas = [f"{azar.randint(1, 28):02d}-{azar.randint(1, 12):02d}-{azar.randint(1500, 2024)}"
+              for _ in range(fechas_distintas)]
+    return [(f"Título {i:07d}", f"Autor {i % 20000:05d}", azar.choice(fechas), 1 + i % 5) for i in range(n)]
+
+
+def medir(nombre, funcion, n):
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"  {nombre:<40} {duracion:8.3f} s  ({n / duracion:12,.0f} libros/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga masiva de libros.")
+    parser.add_argument('--libros', type=int, default=200000)
+    parser.add_argument('--fechas-distintas', type=int, default=20000)
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args()
+
+    filas = crear_filas(args.libros, args.fechas_distintas, args.semilla)
+    n = len(filas)
+    print(f"{n} libros, {args.fechas_distintas} fechas distintas:")
+    EJ5._parsear_fecha_texto.cache_clear()
+    medir("LibroOriginal (strptime)", lambda: [LibroOriginal(*f) for f in filas], n)
+    medir("Libro (parsear_fecha, caché vacía)", lambda: [Libro(*f) for f in filas], n)
+    medir("Libro (parsear_fecha, caché llena)", lambda: [Libro(*f) for f in filas], n)
+    EJ5._parsear_fecha_texto.cache_clear()
+    medir("solo fechas: parsear_fecha sin caché",
+          lambda: [EJ5._parsear_fecha_texto.__wrapped__(f[2]) for f in filas], n)
+
+    iguales = all(LibroOriginal(*f).fech_pub == parsear_fecha(f[2]) for f in filas[:10000])
+    print(f"  Mismas fechas que strptime: {'sí' if iguales else 'NO'}")
+
+    with tempfile.NamedTemporaryFile('w+', encoding='utf-8', newline='') as archivo:
+        escritor = csv.writer(archivo, lineterminator='\n')
+        escritor.writerow(EJ5.COLUMNAS_CATALOGO)
+        escritor.writerows(filas)
+        archivo.flush()
+        archivo.seek(0)
+        EJ5._parsear_fecha_texto.cache_clear()
+        biblioteca = Biblioteca()
+        medir("Biblioteca.importarCatalogo (CSV)", lambda: biblioteca.importarCatalogo(archivo), n)
+        print(f"  Libros cargados: {len(biblioteca)}, copias: {biblioteca.totalCopias()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# file: benchmarks/biblioteca_exportacion.py
+# Listado del catálogo de ejercicios_python/EJ05: consultar con un print y un strftime por
+# libro (como la versión original) frente a consultar por bloques con la fecha formateada
+# en caché, y exportarCatalogo a CSV y NDJSON, con el pico de memoria de cada uno.
+#
+#   python benchmarks/biblioteca_exportacion.py --libros 1000000
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+from ejercicios_python.EJ05.EJ5 import Biblioteca, Libro  # noqa: E402
+
+
+def consultar_original(biblioteca):
+    """consultar() como era: un print y un strftime por libro."""
+    for libro_actual in biblioteca.biblioteca:
+        print(f"Título: {libro_actual.titulo}, Autor: {libro_actual.autor}, Fecha de Publicación: {libro_actual.fech_pub.strftime('%d-%m-%Y')}, Número de Copias: {libro_actual.num_cop}")
+
+
+def crear_biblioteca(n):
+    biblioteca = Biblioteca()
+    plantillas = [Libro("plantilla", "autor", f"{1 + d % 28:02d}-{1 + d % 12:02d}-{1900 + d % 120}", 1)
+                  for d in range(365)]
+    for i in range(n):
+        libro = Libro.__new__(Libro)
+        libro.__dict__.update(plantillas[i % len(plantillas)].__dict__)
+        libro.titulo = f"Título {i:07d}"
+        libro.autor = f"Autor {i % 20000:05d}"
+        libro.num_cop = 1 + i % 5
+        biblioteca.agregarLibro(libro)
+    return biblioteca
+
+
+def medir(nombre, funcion, archivo):
+    """Tiempo de una ejecución y pico de memoria de otra (tracemalloc ralentiza mucho)."""
+    resultados = []
+    for con_tracemalloc in (False, True):
+        archivo.seek(0)
+        archivo.truncate()
+        if con_tracemalloc:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(archivo):
+            funcion()
+        archivo.flush()
+        resultados.append(time.perf_counter() - inicio)
+        if con_tracemalloc:
+            resultados.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    duracion, _, pico = resultados
+    print(f"  {nombre:<42} {duracion:8.3f} s   pico {pico / 2**20:8.2f} MiB   "
+          f"{os.path.getsize(archivo.name) / 2**20:6.1f} MiB escritos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listado y exportación del catálogo de la biblioteca.")
+    parser.add_argument('--libros', type=int, default=200000)
+    args = parser.parse_args()
+
+    biblioteca = crear_biblioteca(args.libros)
+    print(f"{args.libros} libros:")
+    with tempfile.NamedTemporaryFile('w+', encoding='utf-8') as archivo:
+        medir("consultar original (print por libro)", lambda: consultar_original(biblioteca), archivo)
+        # La primera pasada formatea y guarda la fecha de cada libro; las siguientes la reutilizan.
+        medir("consultar, primera vez (formatea fechas)", biblioteca.consultar, archivo)
+        medir("consultar (por bloques, fecha en caché)", biblioteca.consultar, archivo)
+        medir("exportarCatalogo CSV", lambda: biblioteca.exportarCatalogo(archivo, 'csv'), archivo)
+        medir("exportarCatalogo NDJSON", lambda: biblioteca.exportarCatalogo(archivo, 'ndjson'), archivo)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+# file: benchmarks/carga.py
+# Prueba de carga de la API de cuentas: lanza una mezcla configurable de peticiones
+# (crear, gastar, verificar, registrar) con varios niveles de concurrencia y mide
+# rendimiento y latencias p50/p95/p99 por endpoint. Los resultados se guardan en JSON
+# para comparar commits entre sí.
+#
+# Contra un servidor en marcha (MariaDB real):
+#   python benchmarks/carga.py --url http://localhost:5000 --concurrencia 1,8,32
+# Sin servidor, con app.py en proceso y SQLite como BD:
+#   python benchmarks/carga.py --sqlite --duracion 5
+# Comparar con una ejecución anterior:
+#   python benchmarks/carga.py --sqlite --comparar benchmarks/resultados/anterior.json
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+MEZCLA_POR_DEFECTO = "crear=10,gasto=45,verificar=40,registro=5"
+
+
+class ClienteHTTP:
+    """Envía las peticiones a un servidor real."""
+    def __init__(self, url_base):
+        self.url_base = url_base.rstrip('/')
+
+    def peticion(self, metodo, ruta, cuerpo=None):
+        datos = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else None
+        peticion = urllib.request.Request(
+            self.url_base + ruta, data=datos, method=metodo,
+            headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(peticion, timeout=30) as respuesta:
+                return respuesta.status, json.loads(respuesta.read() or b'null')
+        except urllib.error.HTTPError as err:
+            return err.code, None
+
+
+class ClienteLocal:
+    """Llama a app.py en el mismo proceso con el cliente de pruebas de Flask."""
+    def __init__(self, aplicacion):
+        self._aplicacion = aplicacion
+        self._locales = threading.local()
+
+    def peticion(self, metodo, ruta, cuerpo=None):
+        cliente = getattr(self._locales, 'cliente', None)
+        if cliente is None:
+            cliente = self._locales.cliente = self._aplicacion.test_client()
+        respuesta = cliente.open(ruta, method=metodo, json=cuerpo)
+        return respuesta.status_code, respuesta.get_json(silent=True)
+
+
+def leer_mezcla(texto):
+    """Convierte 'crear=10,gasto=45,...' en un diccionario de pesos."""
+    mezcla = {}
+    for parte in texto.split(','):
+        nombre, peso = parte.split('=')
+        if nombre not in OPERACIONES:
+            raise ValueError(f"Operación desconocida en la mezcla: {nombre}")
+        mezcla[nombre] = float(peso)
+    return mezcla
+
+
+class SelectorCuentas:
+    """
+    Elige IDs de cuenta con sesgo tipo Zipf: con sesgo=0 todas son igual de probables;
+    con sesgo=1 o más, unas pocas cuentas "calientes" reciben casi todo el tráfico.
+    """
+    def __init__(self, ids, sesgo):
+        self.ids = list(ids)
+        pesos = [1.0 / (rango ** sesgo) for rango in range(1, len(self.ids) + 1)]
+        self._acumulados = list(itertools.accumulate(pesos))
+
+    def elegir(self, aleatorio):
+        posicion = aleatorio.random() * self._acumulados[-1]
+        return self.ids[min(bisect.bisect_left(self._acumulados, posicion), len(self.ids) - 1)]
+
+
+_contador_dni = itertools.count()
+
+def op_crear(cliente, selector, aleatorio):
+    if aleatorio.random() < 0.5:
+        return cliente.peticion('POST', '/cuentas', {'titular': 'Bench', 'cantidad': 1000.0})
+    return cliente.peticion('POST', '/Cuenta_joven',
+                            {'titular': 'Bench', 'cantidad': 1000.0, 'bonificacion': 5, 'edad': 20})
+
+def op_gasto(cliente, selector, aleatorio):
+    return cliente.peticion('POST', f'/cuentas/{selector.elegir(aleatorio)}/gasto',
+                            {'cantidad': round(aleatorio.uniform(0.01, 1.0), 2)})
+
+def op_verificar(cliente, selector, aleatorio):
+    return cliente.peticion('GET', f'/cuentas/{selector.elegir(aleatorio)}/verificar')
+
+def op_registro(cliente, selector, aleatorio):
+    dni = f"bench-{os.getpid()}-{time.time_ns()}-{next(_contador_dni)}"
+    return cliente.peticion('POST', '/apiregistro',
+                            {'dni_usuario': dni, 'contraseña': 'x', 'id_cuenta': selector.elegir(aleatorio)})
+
+OPERACIONES = {
+    'crear': op_crear,
+    'gasto': op_gasto,
+    'verificar': op_verificar,
+    'registro': op_registro,
+}
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano (valores ya ordenados)."""
+    if not valores_ordenados:
+        return None
+    indice = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados) + 0.5) - 1))
+    return valores_ordenados[indice]
+
+
+def preparar_cuentas(cliente, numero):
+    """Crea `numero` cuentas con /cuentas/lote y devuelve sus IDs."""
+    ids = []
+    for inicio in range(0, numero, 1000):
+        lote = []
+        for i in range(inicio, min(numero, inicio + 1000)):
+            if i % 2:
+                lote.append({'titular': f'Cuenta {i}', 'cantidad': 1e9})
+            else:
+                lote.append({'titular': f'Joven {i}', 'cantidad': 1e9, 'bonificacion': 5, 'edad': 20})
+        codigo, respuesta = cliente.peticion('POST', '/cuentas/lote', lote)
+        if codigo != 201:
+            raise RuntimeError(f"No se pudieron crear las cuentas de prueba (HTTP {codigo}): {respuesta}")
+        ids.extend(r['id'] for r in respuesta['resultados'])
+    return ids
+
+
+def ejecutar_nivel(cliente, mezcla, selector, concurrencia, duracion, semilla):
+    """Ejecuta la mezcla durante `duracion` segundos con `concurrencia` hilos."""
+    nombres = list(mezcla)
+    pesos = [mezcla[n] for n in nombres]
+    fin = time.perf_counter() + duracion
+
+    def trabajador(numero):
+        aleatorio = random.Random(semilla + numero)
+        latencias = defaultdict(list)
+        codigos = defaultdict(lambda: defaultdict(int))
+        while time.perf_counter() < fin:
+            nombre = aleatorio.choices(nombres, pesos)[0]
+            inicio = time.perf_counter()
+            try:
+                codigo, _ = OPERACIONES[nombre](cliente, selector, aleatorio)
+            except Exception:
+                codigo = 'excepcion'
+            latencias[nombre].append(time.perf_counter() - inicio)
+            codigos[nombre][str(codigo)] += 1
+        return latencias, codigos
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        parciales = list(ejecutor.map(trabajador, range(concurrencia)))
+    transcurrido = time.perf_counter() - inicio
+
+    resultado = {'concurrencia': concurrencia, 'segundos': transcurrido, 'endpoints': {}}
+    total = 0
+    for nombre in nombres:
+        latencias = sorted(itertools.chain.from_iterable(p[0][nombre] for p in parciales))
+        codigos = defaultdict(int)
+        for _, parcial in parciales:
+            for codigo, veces in parcial[nombre].items():
+                codigos[codigo] += veces
+        total += len(latencias)
+        resultado['endpoints'][nombre] = {
+            'peticiones': len(latencias),
+            'por_segundo': len(latencias) / transcurrido,
+            'p50_ms': _ms(percentil(latencias, 50)),
+            'p95_ms': _ms(percentil(latencias, 95)),
+            'p99_ms': _ms(percentil(latencias, 99)),
+            'codigos': dict(codigos),
+        }
+    resultado['por_segundo'] = total / transcurrido
+    return resultado
+
+def _ms(segundos):
+    return None if segundos is None else round(segundos * 1000, 3)
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRECTORIO_API,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir_nivel(nivel, anterior=None):
+    print(f"\nConcurrencia {nivel['concurrencia']}: {nivel['por_segundo']:.1f} pet/s")
+    print(f"  {'endpoint':<10} {'pet/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  códigos")
+    for nombre, datos in nivel['endpoints'].items():
+        linea = (f"  {nombre:<10} {datos['por_segundo']:>9.1f} {datos['p50_ms'] or 0:>9.2f} "
+                 f"{datos['p95_ms'] or 0:>9.2f} {datos['p99_ms'] or 0:>9.2f}  {datos['codigos']}")
+        previo = anterior['endpoints'].get(nombre) if anterior else None
+        if previo and previo['p99_ms'] and datos['p99_ms']:
+            linea += f"  (p99 {100 * (datos['p99_ms'] / previo['p99_ms'] - 1):+.1f}%)"
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de cuentas.")
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument('--url', help="URL base de un servidor en marcha (e.g., http://localhost:5000).")
+    destino.add_argument('--sqlite', action='store_true', help="Ejecutar app.py en proceso con SQLite.")
+    parser.add_argument('--mezcla', default=MEZCLA_POR_DEFECTO, help="Pesos por operación.")
+    parser.add_argument('--concurrencia', default="1,8,32", help="Niveles de concurrencia separados por comas.")
+    parser.add_argument('--duracion', type=float, default=10.0, help="Segundos por nivel de concurrencia.")
+    parser.add_argument('--cuentas', type=int, default=1000, help="Cuentas que se crean antes de medir.")
+    parser.add_argument('--sesgo', type=float, default=1.0, help="Sesgo Zipf de los IDs de cuenta (0 = uniforme).")
+    parser.add_argument('--semilla', type=int, default=1234)
+    parser.add_argument('--salida', help="Fichero JSON de resultados (por defecto benchmarks/resultados/<fecha>_<commit>.json).")
+    parser.add_argument('--comparar', help="JSON de una ejecución anterior con el que comparar.")
+    argumentos = parser.parse_args()
+
+    mezcla = leer_mezcla(argumentos.mezcla)
+    if argumentos.sqlite:
+        from benchmarks.sqlite_bd import instalar_sqlite
+        niveles = [int(c) for c in argumentos.concurrencia.split(',')]
+        instalar_sqlite(tamano_pool=max(niveles))
+        import app
+        cliente = ClienteLocal(app.aplicacion)
+    else:
+        cliente = ClienteHTTP(argumentos.url)
+
+    ids = preparar_cuentas(cliente, argumentos.cuentas)
+    selector = SelectorCuentas(ids, argumentos.sesgo)
+
+    anterior = None
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as f:
+            anterior = {n['concurrencia']: n for n in json.load(f)['niveles']}
+
+    resultados = {
+        'commit': commit_actual(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'destino': 'sqlite' if argumentos.sqlite else argumentos.url,
+        'configuracion': {
+            'mezcla': mezcla,
+            'duracion': argumentos.duracion,
+            'cuentas': argumentos.cuentas,
+            'sesgo': argumentos.sesgo,
+            'semilla': argumentos.semilla,
+        },
+        'niveles': [],
+    }
+    for concurrencia in [int(c) for c in argumentos.concurrencia.split(',')]:
+        nivel = ejecutar_nivel(cliente, mezcla, selector, concurrencia, argumentos.duracion, argumentos.semilla)
+        resultados['niveles'].append(nivel)
+        imprimir_nivel(nivel, anterior.get(concurrencia) if anterior else None)
+
+    salida = argumentos.salida or os.path.join(
+        DIRECTORIO_API, 'benchmarks', 'resultados',
+        f"{time.strftime('%Y%m%d_%H%M%S')}_{resultados['commit'] or 'sin_commit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# file: benchmarks/cuentas_memoria.py
+# Memoria por instancia y velocidad de construcción de Cuenta/CuentaJoven (con __slots__)
+# frente a las mismas clases con __dict__ por instancia (como eran antes).
+#
+#   python benchmarks/cuentas_memoria.py --instancias 1000000
+import argparse
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+from ejercicios_python.EJ04.EJ4 import Cuenta, CuentaJoven  # noqa: E402
+
+
+class CuentaConDict:
+    """Cuenta sin __slots__, como la clase original."""
+    def __init__(self, titular, cantidad):
+        self.titular = titular
+        self.cantidad = cantidad
+
+
+class CuentaJovenConDict(CuentaConDict):
+    """CuentaJoven sin __slots__, como la clase original."""
+    def __init__(self, titular, cantidad, bonificacion, edad):
+        super().__init__(titular, cantidad)
+        self.bonificacion = bonificacion
+        self.edad = edad
+
+
+# Una fila de CuentasAlmacenadas, como la devuelve db.py.
+FILA = {'id': 1, 'tipo_cuenta': 'CuentaJoven', 'titular': 'María Pérez', 'cantidad': 1500.0,
+        'bonificacion': 10.0, 'edad': 21, 'datos_objeto': None}
+ESTADO = {'titular': 'María Pérez', 'cantidad': 1500.0, 'bonificacion': 10.0, 'edad': 21}
+
+
+def bytes_por_instancia(fabrica, instancias):
+    """Memoria reservada por instancia al crear `instancias` objetos con `fabrica`."""
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = [fabrica(i) for i in range(instancias)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Se descuenta la lista que guarda los objetos (un puntero por elemento).
+    resultado = (despues - antes - sys.getsizeof(objetos)) / instancias
+    del objetos
+    return resultado
+
+
+def por_segundo(funcion, repeticiones):
+    return repeticiones / min(timeit.repeat(funcion, number=repeticiones, repeat=5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria y construcción de Cuenta/CuentaJoven.")
+    parser.add_argument('--instancias', type=int, default=200000, help="Objetos creados para medir la memoria.")
+    parser.add_argument('--repeticiones', type=int, default=200000, help="Repeticiones de las medidas de velocidad.")
+    args = parser.parse_args()
+
+    # El titular y los números se comparten entre instancias: solo se mide el objeto.
+    titular = ESTADO['titular']
+    print(f"Memoria por instancia ({args.instancias} instancias):")
+    for nombre, fabrica in (
+        ('Cuenta (__slots__)', lambda i: Cuenta(titular, 1500.0)),
+        ('Cuenta (__dict__)', lambda i: CuentaConDict(titular, 1500.0)),
+        ('CuentaJoven (__slots__)', lambda i: CuentaJoven(titular, 1500.0, 10.0, 21)),
+        ('CuentaJoven (__dict__)', lambda i: CuentaJovenConDict(titular, 1500.0, 10.0, 21)),
+    ):
+        print(f"  {nombre:<26} {bytes_por_instancia(fabrica, args.instancias):8.1f} bytes")
+
+    n = args.repeticiones
+    print(f"\nConstrucción y estado (operaciones/s, {n} repeticiones):")
+    cuenta = CuentaJoven.from_state(ESTADO)
+    for nombre, funcion in (
+        ('CuentaJoven(**estado) con __dict__', lambda: CuentaJovenConDict(**ESTADO)),
+        ('CuentaJoven(**estado)', lambda: CuentaJoven(**ESTADO)),
+        ('CuentaJoven.from_state(fila)', lambda: CuentaJoven.from_state(FILA)),
+        ('dict construido a mano', lambda: {'titular': cuenta.consultar_titular(),
+                                            'cantidad': cuenta.consultar_saldo(),
+                                            'bonificacion': cuenta.get_bonificacion(),
+                                            'edad': cuenta.get_edad()}),
+        ('cuenta.to_state()', cuenta.to_state),
+    ):
+        print(f"  {nombre:<36} {por_segundo(funcion, n):14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# file: benchmarks/inventario.py
+# Inventario de ejercicios_python/EJ01 (indexado por nombre) frente a la versión con lista:
+# carga de un catálogo, búsquedas, bajas y cálculo del valor total; y revalorización en
+# bloque con Inventario e InventarioColumnar (columnas de NumPy).
+#
+#   python benchmarks/inventario.py --productos 100000
+import argparse
+import math
+import os
+import sys
+import time
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+from ejercicios_python.EJ01.EJ1 import Inventario, InventarioColumnar, Producto  # noqa: E402
+
+
+class InventarioLista:
+    """Inventario con los productos en una lista, como la versión original."""
+    def __init__(self):
+        self.productos = []
+
+    def agregar_producto(self, producto):
+        if not isinstance(producto, Producto):
+            raise TypeError("Solo se pueden agregar productos.")
+        for i in self.productos:
+            if i.nombre == producto.nombre:
+                raise ValueError(f"Ya existe un producto con el nombre {i.nombre}")
+        self.productos.append(producto)
+
+    def obtener_producto(self, nombre):
+        for producto in self.productos:
+            if producto.nombre == nombre:
+                return producto
+        return None
+
+    def eliminar_producto(self, nombre):
+        if not isinstance(nombre, str):
+            raise TypeError("El nombre debe ser una cadena de texto")
+        for i, producto in enumerate(self.productos):
+            if producto.nombre == nombre:
+                del self.productos[i]
+                return True
+        return False
+
+    def calcular_valor_total(self):
+        valor_total = 0
+        for producto in self.productos:
+            valor_total += producto.precio * producto.cantidad
+        return valor_total
+
+
+def medir(nombre, funcion):
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"  {nombre:<34} {duracion:10.4f} s")
+    return duracion
+
+
+def ejecutar(clase, productos, operaciones, por_lotes):
+    inventario = clase()
+    nombres = [p.nombre for p in productos]
+    print(f"{clase.__name__}{' (operaciones por lotes)' if por_lotes else ''}:")
+    if por_lotes:
+        medir(f"cargar {len(productos)} productos", lambda: inventario.agregar_productos(productos))
+    else:
+        medir(f"cargar {len(productos)} productos",
+              lambda: [inventario.agregar_producto(p) for p in productos])
+    paso = max(1, len(nombres) // operaciones)
+    muestra = nombres[::paso][:operaciones]
+    medir(f"{len(muestra)} búsquedas", lambda: [inventario.obtener_producto(n) for n in muestra])
+    medir("calcular_valor_total", inventario.calcular_valor_total)
+    if por_lotes:
+        medir(f"{len(muestra)} bajas", lambda: inventario.eliminar_productos(muestra))
+    else:
+        medir(f"{len(muestra)} bajas", lambda: [inventario.eliminar_producto(n) for n in muestra])
+    return inventario.calcular_valor_total()
+
+
+def ejecutar_revalorizacion(clase, productos, cambios):
+    """Cambios de precio sueltos y revalorizaciones en bloque, con el total consultado tras cada una."""
+    inventario = clase()
+    inventario.agregar_productos(Producto(p.nombre, p.precio, p.cantidad) for p in productos)
+    nombres = [p.nombre for p in productos]
+    print(f"{clase.__name__}:")
+
+    def cambios_sueltos():
+        for i in range(cambios):
+            producto = inventario.obtener_producto(nombres[i * 7919 % len(nombres)])
+            producto.precio = producto.precio + 0.5
+            inventario.calcular_valor_total()
+
+    medir(f"{cambios} cambios de precio + total", cambios_sueltos)
+    medir("revalorizar todo un 3 %", lambda: inventario.revalorizar(1.03))
+    mitad = nombres[::2]
+    medir(f"revalorizar {len(mitad)} productos", lambda: inventario.revalorizar(0.98, mitad))
+    medir("actualizar_precios de 1000", lambda: inventario.actualizar_precios({n: 9.99 for n in nombres[:1000]}))
+    inventario.verificar = True  # Comprueba el total mantenido contra el recalculado.
+    return inventario.calcular_valor_total()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventario indexado frente a inventario con lista.")
+    parser.add_argument('--productos', type=int, default=20000)
+    parser.add_argument('--operaciones', type=int, default=2000, help="Búsquedas y bajas que se miden.")
+    args = parser.parse_args()
+
+    productos = [Producto(f"SKU-{i:07d}", 1.0 + i % 100, i % 50) for i in range(args.productos)]
+    totales = [
+        ejecutar(InventarioLista, productos, args.operaciones, por_lotes=False),
+        ejecutar(Inventario, productos, args.operaciones, por_lotes=False),
+        ejecutar(Inventario, productos, args.operaciones, por_lotes=True),
+    ]
+    iguales = all(math.isclose(total, totales[0]) for total in totales)
+    print(f"Mismo valor total final: {'sí' if iguales else 'NO'}\n")
+
+    cambios = min(args.operaciones, args.productos)
+    totales = [ejecutar_revalorizacion(clase, productos, cambios) for clase in (Inventario, InventarioColumnar)]
+    print(f"Mismo valor total tras revalorizar: {'sí' if math.isclose(*totales) else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
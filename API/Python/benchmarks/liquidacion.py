@@ -0,0 +1,93 @@
+# file: benchmarks/liquidacion.py
+# Liquidación de un lote de gastos: libro_cuentas.LibroCuentas (vectorizado con NumPy)
+# frente a llamar a realizar_gasto objeto a objeto. Comprueba además que ambos
+# rechazan los mismos gastos y dejan los mismos saldos.
+#
+#   python benchmarks/liquidacion.py --cuentas 100000 --gastos 1000000
+import argparse
+import os
+import random
+import sys
+import time
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+import numpy as np  # noqa: E402
+
+from ejercicios_python.EJ04.EJ4 import Cuenta, CuentaJoven, SaldoInsuficiente, TitularNoValido  # noqa: E402
+from libro_cuentas import (ACEPTADO, CUENTA_INEXISTENTE, SALDO_INSUFICIENTE,  # noqa: E402
+                           TITULAR_NO_VALIDO, LibroCuentas)
+
+
+def crear_cuentas(n, generador):
+    """Mitad Cuenta y mitad CuentaJoven (con titulares válidos y no válidos)."""
+    cuentas = {}
+    for id_cuenta in range(1, n + 1):
+        saldo = round(generador.uniform(0, 2000), 2)
+        if id_cuenta % 2:
+            cuentas[id_cuenta] = Cuenta(f"Titular {id_cuenta}", saldo)
+        else:
+            cuentas[id_cuenta] = CuentaJoven(f"Titular {id_cuenta}", saldo,
+                                             generador.choice([0, 5, 10, 15]), generador.randint(16, 28))
+    return cuentas
+
+
+def liquidar_objeto_a_objeto(cuentas, ids, cantidades):
+    """Lo que haría un bucle sobre los objetos de EJ4.py."""
+    motivos = []
+    for id_cuenta, cantidad in zip(ids, cantidades):
+        cuenta = cuentas.get(id_cuenta)
+        if cuenta is None:
+            motivos.append(CUENTA_INEXISTENTE)
+            continue
+        try:
+            cuenta.realizar_gasto(cantidad)
+        except TitularNoValido:
+            motivos.append(TITULAR_NO_VALIDO)
+        except SaldoInsuficiente:
+            motivos.append(SALDO_INSUFICIENTE)
+        else:
+            motivos.append(ACEPTADO)
+    return motivos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Liquidación vectorizada frente a objeto a objeto.")
+    parser.add_argument('--cuentas', type=int, default=20000)
+    parser.add_argument('--gastos', type=int, default=200000)
+    parser.add_argument('--importe-medio', type=float, default=40.0,
+                        help="Gasto medio; cuanto menor, menos cuentas se quedan sin saldo.")
+    parser.add_argument('--semilla', type=int, default=1234)
+    args = parser.parse_args()
+
+    generador = random.Random(args.semilla)
+    cuentas = crear_cuentas(args.cuentas, generador)
+    # Algunos IDs inexistentes y cantidades (positivas, como en la API) que agotan parte de los saldos.
+    ids = [generador.randint(1, args.cuentas + args.cuentas // 100) for _ in range(args.gastos)]
+    cantidades = [round(generador.expovariate(1 / args.importe_medio), 2) + 0.01 for _ in range(args.gastos)]
+    libro = LibroCuentas.desde_cuentas(cuentas)
+
+    inicio = time.perf_counter()
+    motivos_objetos = liquidar_objeto_a_objeto(cuentas, ids, cantidades)
+    tiempo_objetos = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultado = libro.aplicar_gastos(ids, cantidades)
+    tiempo_libro = time.perf_counter() - inicio
+
+    iguales = np.array_equal(resultado.motivos, np.array(motivos_objetos, dtype=np.int8))
+    saldos_objetos = np.array([cuentas[i].consultar_saldo() for i in libro.ids.tolist()])
+    diferencia = float(np.max(np.abs(saldos_objetos - libro.saldos))) if len(saldos_objetos) else 0.0
+    rechazos = len(resultado.rechazos())
+
+    print(f"{args.gastos} gastos sobre {args.cuentas} cuentas ({rechazos} rechazados)")
+    print(f"  objeto a objeto: {tiempo_objetos:8.3f} s  ({args.gastos / tiempo_objetos:,.0f} gastos/s)")
+    print(f"  LibroCuentas:    {tiempo_libro:8.3f} s  ({args.gastos / tiempo_libro:,.0f} gastos/s)")
+    print(f"  mismos rechazos: {'sí' if iguales else 'NO'}; diferencia máxima de saldo: {diferencia:.2e}")
+    if not iguales:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# file: benchmarks/prestamos_concurrentes.py
+# Prueba de carga de MotorPrestamos (ejercicios_python/EJ05): varios hilos prestan y devuelven
+# libros por lotes y al final se comprueba que no se ha creado ni perdido ninguna copia:
+#
+#   copias iniciales == biblioteca.totalCopias() + copias prestadas sin devolver
+#
+# que ningún libro ha quedado con num_cop negativo y que los totales que mantiene la
+# biblioteca coinciden con un recuento. Mide también las operaciones por segundo
+# con 1, 2, 4... hilos. Con --sin-lotes llama a Biblioteca.prestarLibro/devolverLibro solicitud
+# a solicitud (un cerrojo por llamada) en vez de MotorPrestamos.procesar.
+#
+#   python benchmarks/prestamos_concurrentes.py --hilos 8 --lotes 200
+#
+# Con el GIL de CPython los hilos no ejecutan Python en paralelo: el reparto por cerrojos evita
+# que se esperen entre sí, pero la escala real solo se ve en un intérprete sin GIL (3.13t).
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+from ejercicios_python.EJ05.EJ5 import Biblioteca, Libro, MotorPrestamos  # noqa: E402
+
+
+def crear_biblioteca(libros, copias, franjas):
+    biblioteca = Biblioteca(franjas=franjas)
+    plantilla = Libro("plantilla", "autor", "01-01-2000", 1)
+    for i in range(libros):
+        libro = Libro.__new__(Libro)
+        libro.__dict__.update(plantilla.__dict__)
+        libro.titulo = f"Título {i:07d}"
+        libro.autor = f"Autor {i % 1000:04d}"
+        libro.num_cop = copias
+        biblioteca.agregarLibro(libro)
+    return biblioteca
+
+
+class ClienteSinLotes:
+    """Mismo interfaz que MotorPrestamos.procesar, llamando a la Biblioteca solicitud a solicitud."""
+    def __init__(self, biblioteca):
+        self.biblioteca = biblioteca
+
+    def procesar(self, solicitudes):
+        resultados = []
+        for operacion, titulo in solicitudes:
+            if operacion == MotorPrestamos.PRESTAR:
+                ok = self.biblioteca.prestarLibro(titulo)
+            else:
+                ok = self.biblioteca.devolverLibro(titulo)
+            resultados.append({'operacion': operacion, 'titulo': titulo, 'ok': ok})
+        return resultados
+
+
+def trabajador(motor, titulos, lotes, tamano_lote, semilla, prestados, barrera):
+    """Presta y devuelve al azar; solo devuelve libros que este hilo tiene prestados."""
+    azar = random.Random(semilla)
+    en_mano = []
+    barrera.wait()
+    for _ in range(lotes):
+        solicitudes = []
+        devoluciones = 0
+        for _ in range(tamano_lote):
+            if en_mano and devoluciones < len(en_mano) and azar.random() < 0.45:
+                solicitudes.append((MotorPrestamos.DEVOLVER, en_mano[-1 - devoluciones]))
+                devoluciones += 1
+            else:
+                solicitudes.append((MotorPrestamos.PRESTAR, azar.choice(titulos)))
+        if devoluciones:
+            del en_mano[-devoluciones:]
+        for resultado in motor.procesar(solicitudes):
+            if resultado['operacion'] == MotorPrestamos.PRESTAR and resultado['ok']:
+                en_mano.append(resultado['titulo'])
+    prestados.extend(en_mano)
+
+
+def ejecutar(args, hilos, sin_lotes):
+    biblioteca = crear_biblioteca(args.libros, args.copias, args.franjas)
+    copias_iniciales = biblioteca.totalCopias()
+    motor = ClienteSinLotes(biblioteca) if sin_lotes else MotorPrestamos(biblioteca)
+    todos = [libro.titulo for libro in biblioteca.biblioteca]
+    populares = todos[:args.populares]
+    prestados = []
+    barrera = threading.Barrier(hilos + 1)
+    trabajadores = []
+    for h in range(hilos):
+        # Cada hilo tiene su parte del catálogo, y todos comparten los títulos populares.
+        propios = todos[h::hilos]
+        titulos = propios + populares * max(1, len(propios) * args.contencion // max(1, len(populares)) // 100)
+        trabajadores.append(threading.Thread(
+            target=trabajador,
+            args=(motor, titulos, args.lotes, args.tamano_lote, args.semilla + h, prestados, barrera)))
+    for t in trabajadores:
+        t.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.join()
+    duracion = time.perf_counter() - inicio
+
+    operaciones = hilos * args.lotes * args.tamano_lote
+    negativos = sum(1 for libro in biblioteca.biblioteca if libro.num_cop < 0)
+    conservado = copias_iniciales == biblioteca.totalCopias() + len(prestados) and not negativos
+    # Los totales mantenidos (general y por autor) deben coincidir con un recuento.
+    biblioteca.verificar = True
+    try:
+        biblioteca.copiasPorAutor()
+        biblioteca.totalCopias()
+    except RuntimeError as e:
+        print(f"  {e}")
+        conservado = False
+    print(f"  {hilos:>3} hilos: {operaciones / duracion:12,.0f} op/s   "
+          f"copias iniciales {copias_iniciales}, en la biblioteca {biblioteca.totalCopias()}, "
+          f"prestadas {len(prestados)}, negativos {negativos} -> {'conservado' if conservado else 'NO CONSERVADO'}")
+    return conservado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de MotorPrestamos.")
+    parser.add_argument('--libros', type=int, default=20000)
+    parser.add_argument('--copias', type=int, default=2, help="Copias iniciales de cada libro.")
+    parser.add_argument('--hilos', type=int, default=8, help="Máximo de hilos (se prueba 1, 2, 4... hasta este).")
+    parser.add_argument('--lotes', type=int, default=200, help="Lotes por hilo.")
+    parser.add_argument('--tamano-lote', type=int, default=100)
+    parser.add_argument('--franjas', type=int, default=256, help="Franjas (cerrojos) de la biblioteca.")
+    parser.add_argument('--populares', type=int, default=20, help="Títulos que piden todos los hilos.")
+    parser.add_argument('--contencion', type=int, default=10,
+                        help="Porcentaje aproximado de solicitudes a títulos populares.")
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--sin-lotes', action='store_true', help="Llamar a Biblioteca solicitud a solicitud.")
+    args = parser.parse_args()
+
+    # Cambios de hilo muy frecuentes para que las carreras, si las hay, aparezcan.
+    sys.setswitchinterval(1e-6)
+    print(f"{'Biblioteca, solicitud a solicitud' if args.sin_lotes else 'MotorPrestamos'} ({args.franjas} franjas):")
+    conservado = True
+    hilos = 1
+    while hilos <= args.hilos:
+        conservado &= ejecutar(args, hilos, args.sin_lotes)
+        hilos *= 2
+    if not conservado:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# file: benchmarks/serializacion.py
+# Micro-benchmark de la capa de serialización (serializacion.py): CPU por petición de
+# POST /cuentas/<id>/gasto y GET /cuentas/<id>/verificar con cada motor JSON disponible.
+#
+#   python benchmarks/serializacion.py --peticiones 5000
+#
+# Mide dos cosas:
+#   - solo JSON: el trabajo de (de)serialización que hace cada petición, aislado;
+#   - petición: CPU (time.process_time) de la petición completa con app.py en proceso
+#     y SQLite como BD, así que incluye Flask y la BD además del JSON.
+import argparse
+import os
+import sys
+import time
+import timeit
+
+DIRECTORIO_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_API)
+
+import serializacion  # noqa: E402
+
+# Lo que cada endpoint (de)serializa: cuerpo de la petición y de la respuesta.
+CUERPO_GASTO = b'{"cantidad": 1.5}'
+RESPUESTA_GASTO = {
+    'message': 'Gasto realizado y estado actualizado exitosamente',
+    'id': 123, 'nuevo_saldo': 4321.75, 'version': 17,
+}
+RESPUESTA_VERIFICAR = {
+    'id_db': 123, 'tipo_objeto': 'CuentaJoven', 'titular': 'María Pérez',
+    'saldo_actual': 4321.75, 'bonificacion': 12.5, 'edad': 21, 'es_valido': True,
+}
+# Estado en el formato JSON antiguo (datos_objeto), aún leído para filas sin migrar.
+ESTADO_ANTIGUO = b'{"titular": "Mar\\u00eda P\\u00e9rez", "cantidad": 4321.75, "bonificacion": 12.5, "edad": 21}'
+
+
+def motores_disponibles():
+    return ['json'] + (['orjson'] if serializacion.orjson is not None else [])
+
+
+def medir_solo_json(motor, repeticiones):
+    """Microsegundos por petición del trabajo JSON de cada endpoint."""
+    s = serializacion.Serializador(motor)
+
+    def gasto():
+        s.desde_json(CUERPO_GASTO)
+        s.a_bytes(RESPUESTA_GASTO)
+
+    def verificar():
+        s.desde_json(ESTADO_ANTIGUO)
+        s.a_bytes(RESPUESTA_VERIFICAR)
+
+    return {
+        'gasto': min(timeit.repeat(gasto, number=repeticiones, repeat=5)) / repeticiones * 1e6,
+        'verificar': min(timeit.repeat(verificar, number=repeticiones, repeat=5)) / repeticiones * 1e6,
+    }
+
+
+def medir_peticiones(cliente, motor, ids, peticiones):
+    """Microsegundos de CPU por petición completa, con el motor indicado."""
+    serializacion.usar_motor(motor)
+    resultados = {}
+    operaciones = {
+        'gasto': lambda i: cliente.post(f'/cuentas/{i}/gasto', json={'cantidad': 0.01}),
+        'verificar': lambda i: cliente.get(f'/cuentas/{i}/verificar'),
+    }
+    for nombre, operacion in operaciones.items():
+        for i in ids[:50]:  # Calentamiento.
+            operacion(i)
+        inicio = time.process_time()
+        for n in range(peticiones):
+            respuesta = operacion(ids[n % len(ids)])
+            if respuesta.status_code != 200:
+                raise RuntimeError(f"{nombre}: respuesta {respuesta.status_code} {respuesta.get_data(as_text=True)}")
+        resultados[nombre] = (time.process_time() - inicio) / peticiones * 1e6
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de los motores JSON de la API.")
+    parser.add_argument('--peticiones', type=int, default=3000, help="Peticiones por endpoint y motor.")
+    parser.add_argument('--repeticiones', type=int, default=20000, help="Repeticiones de la medida solo JSON.")
+    parser.add_argument('--cuentas', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_NIVEL", "WARNING")  # Sin un registro por petición.
+    from benchmarks.sqlite_bd import instalar_sqlite
+    instalar_sqlite()
+    import app
+    cliente = app.aplicacion.test_client()
+    respuesta = cliente.post('/cuentas/lote', json=[
+        {'tipo_cuenta': 'CuentaJoven' if i % 2 else 'Cuenta', 'titular': f'Titular {i}',
+         'cantidad': 1e6, 'bonificacion': 10, 'edad': 20}
+        for i in range(args.cuentas)])
+    ids = [r['id'] for r in respuesta.get_json()['resultados']]
+
+    motores = motores_disponibles()
+    tabla = {}
+    for motor in motores:
+        tabla[motor] = {
+            'solo_json': medir_solo_json(motor, args.repeticiones),
+            'peticion': medir_peticiones(cliente, motor, ids, args.peticiones),
+        }
+
+    print(f"{'motor':<8} {'medida':<10} {'gasto (µs)':>12} {'verificar (µs)':>15}")
+    for motor in motores:
+        for medida in ('solo_json', 'peticion'):
+            fila = tabla[motor][medida]
+            print(f"{motor:<8} {medida:<10} {fila['gasto']:>12.2f} {fila['verificar']:>15.2f}")
+    if 'orjson' in tabla:
+        for endpoint in ('gasto', 'verificar'):
+            ahorro = tabla['json']['peticion'][endpoint] - tabla['orjson']['peticion'][endpoint]
+            print(f"CPU ahorrada por petición en {endpoint}: {ahorro:.2f} µs "
+                  f"({ahorro / tabla['json']['peticion'][endpoint]:.1%})")
+    else:
+        print("orjson no está instalado: solo se ha medido la librería estándar.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+# file: benchmarks/sqlite_bd.py
+# Sustituto de MariaDB con SQLite para las pruebas de carga: imita lo que db.py usa de
+# una conexión de mysql.connector (cursores diccionario/preparados, commit, rollback...),
+# de forma que app.py se ejecuta sin cambios y sin servidor de BD.
+# Los números NO son comparables con MariaDB; sirven para comparar commits entre sí.
+import atexit
+import glob
+import os
+import sqlite3
+import tempfile
+
+import mysql.connector
+
+import db
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS CuentasAlmacenadas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo_cuenta TEXT NOT NULL,
+    datos_objeto TEXT NULL,
+    titular TEXT NULL,
+    cantidad REAL NULL,
+    bonificacion REAL NULL,
+    edad INTEGER NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_cuentas_cantidad ON CuentasAlmacenadas (cantidad);
+CREATE INDEX IF NOT EXISTS idx_cuentas_titular ON CuentasAlmacenadas (titular);
+CREATE TABLE IF NOT EXISTS Usuarios (
+    dni_usuario TEXT PRIMARY KEY,
+    `contraseña` TEXT NOT NULL,
+    fk_id_cuenta INTEGER NOT NULL REFERENCES CuentasAlmacenadas (id)
+);
+"""
+
+
+def _traducir_sql(sql):
+    """Adapta el SQL de MariaDB que genera db.py al dialecto de SQLite."""
+    if sql == db._SQL_AUTOINCREMENTO:
+        return "SELECT 1, 1"  # Incremento 1, IDs consecutivos como con innodb_autoinc_lock_mode=1.
+    # SQLite bloquea la BD entera al escribir (BEGIN IMMEDIATE en start_transaction).
+    return sql.replace(" FOR UPDATE", "").replace("%s", "?")
+
+
+class CursorSQLite:
+    """Cursor con la interfaz de los cursores de mysql.connector que usa db.py."""
+    def __init__(self, conexion, diccionario):
+        self._cursor = conexion.cursor()
+        self._diccionario = diccionario
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def execute(self, sql, parametros=()):
+        try:
+            self._cursor.execute(_traducir_sql(sql), tuple(parametros))
+        except sqlite3.Error as err:
+            raise mysql.connector.errors.DatabaseError(msg=str(err)) from err
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid
+        if sql.startswith("INSERT") and self.rowcount > 1:
+            # MariaDB devuelve el ID de la PRIMERA fila de un INSERT múltiple; SQLite el de la última.
+            self.lastrowid -= self.rowcount - 1
+
+    def executemany(self, sql, lista_parametros):
+        for parametros in lista_parametros:
+            self.execute(sql, parametros)
+
+    def _fila(self, fila):
+        if fila is None or not self._diccionario:
+            return fila
+        return dict(zip([d[0] for d in self._cursor.description], fila))
+
+    def fetchone(self):
+        return self._fila(self._cursor.fetchone())
+
+    def fetchmany(self, tamano):
+        return [self._fila(f) for f in self._cursor.fetchmany(tamano)]
+
+    def fetchall(self):
+        return [self._fila(f) for f in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexionSQLite:
+    """Conexión con la interfaz de mysql.connector que usan db.py y PoolConexiones."""
+    def __init__(self, ruta):
+        self._conexion = sqlite3.connect(ruta, timeout=30, check_same_thread=False)
+
+    @property
+    def in_transaction(self):
+        return self._conexion.in_transaction
+
+    def cursor(self, dictionary=False, buffered=False, prepared=False):
+        return CursorSQLite(self._conexion, dictionary)
+
+    def start_transaction(self):
+        self._conexion.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._conexion.commit()
+
+    def rollback(self):
+        self._conexion.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._conexion.close()
+
+
+def _borrar_bd(ruta):
+    for fichero in glob.glob(ruta + '*'):  # Incluye los ficheros -wal y -shm.
+        os.remove(fichero)
+
+
+def instalar_sqlite(ruta=None, tamano_pool=8):
+    """
+    Crea la BD SQLite (en un fichero temporal si no se indica `ruta`) y sustituye el pool
+    de db.py por uno que abre conexiones SQLite. Devuelve la ruta de la BD.
+    """
+    if ruta is None:
+        descriptor, ruta = tempfile.mkstemp(prefix="bench_", suffix=".sqlite3")
+        os.close(descriptor)
+        atexit.register(_borrar_bd, ruta)
+    inicial = sqlite3.connect(ruta)
+    inicial.execute("PRAGMA journal_mode=WAL")
+    inicial.executescript(ESQUEMA)
+    inicial.close()
+
+    db._pool = db.PoolConexiones(tamano=tamano_pool, fabrica=lambda: ConexionSQLite(ruta))
+    db._pool_pid = os.getpid()
+    return ruta
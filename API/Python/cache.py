@@ -0,0 +1,86 @@
+# file: cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Caché en memoria, acotada (LRU) y con caducidad (TTL), segura entre hilos.
+
+    Cada worker de Gunicorn tiene la suya: una invalidación en un worker no llega
+    a los demás, por eso el TTL acota cuánto tiempo puede servirse un dato antiguo.
+
+    Args:
+        capacidad: Número máximo de entradas; al superarlo se expulsa la menos usada.
+        ttl: Segundos que vive una entrada desde que se guarda.
+    """
+    def __init__(self, capacidad=10000, ttl=5.0):
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1.")
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> (valor, instante_caducidad)
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._fallos = 0
+        self._expulsiones = 0
+        self._caducadas = 0
+        self._invalidaciones = 0
+
+    def obtener(self, clave):
+        """
+        Devuelve el valor guardado para `clave`, o None si no está o ha caducado.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return None
+            valor, caducidad = entrada
+            if time.monotonic() >= caducidad:
+                del self._entradas[clave]
+                self._caducadas += 1
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self._aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor):
+        """Guarda (o reemplaza) un valor, expulsando el menos usado si no cabe."""
+        with self._lock:
+            self._entradas[clave] = (valor, time.monotonic() + self.ttl)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self._expulsiones += 1
+
+    def invalidar(self, clave):
+        """Elimina la entrada de `clave` si existe."""
+        with self._lock:
+            if self._entradas.pop(clave, None) is not None:
+                self._invalidaciones += 1
+
+    def vaciar(self):
+        """Elimina todas las entradas (los contadores se mantienen)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        """
+        Devuelve un diccionario con el tamaño y los contadores de la caché.
+        """
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                'capacidad': self.capacidad,
+                'ttl': self.ttl,
+                'entradas': len(self._entradas),
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'expulsiones': self._expulsiones,
+                'caducadas': self._caducadas,
+                'invalidaciones': self._invalidaciones,
+                'tasa_aciertos': self._aciertos / consultas if consultas else 0.0,
+            }
@@ -0,0 +1,18 @@
+# file: conftest.py
+# test_db.py es una aplicación Flask de prueba de conexión (necesita DB_USER, DB_HOST...),
+# no una batería de tests: pytest no la recoge.
+import pytest
+
+import db
+from benchmarks.sqlite_bd import instalar_sqlite
+
+collect_ignore = ["test_db.py"]
+
+
+@pytest.fixture
+def bd_sqlite(tmp_path):
+    """BD SQLite vacía (benchmarks/sqlite_bd.py) en lugar de MariaDB para los helpers de db.py."""
+    ruta = instalar_sqlite(str(tmp_path / "bd.sqlite3"))
+    yield ruta
+    db._pool.cerrar()
+    db._pool = None
@@ -0,0 +1,299 @@
+# file: cuentas.py
+# Reglas de las cuentas compartidas por la API síncrona (app.py) y la asíncrona (app_async.py):
+# validación de las peticiones, conversión entre filas de la BD y objetos Cuenta/CuentaJoven,
+# y aplicación de un gasto sobre una fila.
+from ejercicios_python.EJ04.EJ4 import Cuenta, CuentaJoven, SaldoInsuficiente, TitularNoValido
+from serializacion import ErrorJSON, desde_json
+import logging
+
+# Clase de cada valor de la columna 'tipo_cuenta'.
+CLASES_CUENTA = {'Cuenta': Cuenta, 'CuentaJoven': CuentaJoven}
+
+# Columnas de CuentasAlmacenadas necesarias para reconstruir una cuenta (en lugar de SELECT *).
+# No incluyen 'datos_objeto', que puede ser un JSON grande: solo se lee (COLUMNAS_CUENTA_ANTIGUA)
+# para las filas antiguas, con titular NULL, que migrar_cuentas.py aún no ha convertido.
+COLUMNAS_CUENTA = ('id', 'tipo_cuenta', 'titular', 'cantidad', 'bonificacion', 'edad')
+COLUMNAS_CUENTA_ANTIGUA = COLUMNAS_CUENTA + ('datos_objeto',)
+
+
+class FilaSinMigrar(Exception):
+    """
+    La fila es antigua (estado en el JSON de 'datos_objeto') y se leyó sin esa columna:
+    hay que volver a leerla con COLUMNAS_CUENTA_ANTIGUA.
+    """
+
+
+def es_fila_sin_migrar(fila):
+    """True si la fila es antigua y se leyó sin 'datos_objeto' (ver FilaSinMigrar)."""
+    return fila.get('titular') is None and 'datos_objeto' not in fila
+
+
+class GastoRechazado(Exception):
+    """El gasto no se puede realizar por las reglas de la cuenta (saldo o titular)."""
+    def __init__(self, mensaje, codigo_http):
+        super().__init__(mensaje)
+        self.codigo_http = codigo_http
+
+
+def construir_instancia_cuenta(id_cuenta: int, datos_db: dict):
+    """
+    Reconstruye la instancia del objeto Cuenta o CuentaJoven a partir de una fila
+    de CuentasAlmacenadas. Lee las columnas tipadas (titular, cantidad, bonificacion, edad);
+    las filas antiguas que aún no ha convertido migrar_cuentas.py se leen del JSON de 'datos_objeto'.
+
+    Args:
+        id_cuenta: El ID de la fila (solo para los mensajes de log/error).
+        datos_db: Diccionario con la fila de la BD.
+
+    Returns:
+        Una instancia de Cuenta o CuentaJoven.
+        Lanza ValueError si los datos están corruptos o el tipo es desconocido.
+        Lanza FilaSinMigrar si la fila es antigua y no trae 'datos_objeto'.
+    """
+    tipo_cuenta = datos_db.get('tipo_cuenta')
+    if not tipo_cuenta:
+         logging.error("Datos incompletos recuperados para id=%s desde la BD.", id_cuenta)
+         raise ValueError("Datos recuperados de la base de datos están incompletos.")
+
+    clase = CLASES_CUENTA.get(tipo_cuenta)
+    if clase is None:
+        # Tipo desconocido encontrado en la base de datos.
+        logging.error("Tipo de cuenta desconocido '%s' encontrado en la BD para id=%s", tipo_cuenta, id_cuenta)
+        raise ValueError(f"Tipo de cuenta no soportado encontrado en la base de datos: {tipo_cuenta}")
+
+    if datos_db.get('titular') is not None:
+        # Fila con columnas tipadas: from_state lee directamente las columnas de la fila.
+        estado = datos_db
+    else:
+        # Fila antigua: el estado sigue en el JSON de 'datos_objeto'.
+        if 'datos_objeto' not in datos_db:
+            raise FilaSinMigrar(f"La cuenta {id_cuenta} aún no está convertida a columnas.")
+        estado = atributos_desde_json(id_cuenta, datos_db.get('datos_objeto'))
+
+    try:
+        instancia = clase.from_state(estado)
+    except KeyError as e:
+        logging.error("Falta el atributo %s en los datos de la cuenta id=%s", e, id_cuenta)
+        raise ValueError(f"Los datos almacenados para la cuenta {id_cuenta} están incompletos (falta {e}).") from e
+    logging.debug("Instancia de %s reconstruida para id=%s", tipo_cuenta, id_cuenta)
+    return instancia
+
+
+def atributos_desde_json(id_cuenta: int, datos_objeto_str):
+    """
+    Deserializa el JSON de 'datos_objeto' (formato anterior a las columnas tipadas).
+    Lanza ValueError si falta o está corrupto.
+    """
+    # Verificación extra (aunque la BD debería tener NOT NULL).
+    if not datos_objeto_str:
+         logging.error("Datos incompletos recuperados para id=%s desde la BD.", id_cuenta)
+         raise ValueError("Datos recuperados de la base de datos están incompletos.")
+    # Deserializar = Traducir JSON a un objeto Python
+    # Deserializar el JSON a un diccionario Python.
+    try:
+        return desde_json(datos_objeto_str)
+    except ErrorJSON as e:
+        # Solo el principio de los datos: pueden ser muy grandes.
+        logging.error("Error al decodificar JSON para id=%s. Datos: %.200r. Error: %s", id_cuenta, datos_objeto_str, e)
+        raise ValueError(f"Los datos almacenados para la cuenta {id_cuenta} están corruptos (JSON inválido).") from e
+
+
+def estado_cuenta(cuenta_obj):
+    """
+    Construye el diccionario con el estado de un objeto Cuenta/CuentaJoven
+    (los parámetros de su constructor).
+    """
+    if isinstance(cuenta_obj, Cuenta):  # Incluye CuentaJoven.
+        return cuenta_obj.to_state()
+    # Esto no debería pasar si construir_instancia_cuenta funciona bien.
+    raise TypeError(f"Tipo de objeto inesperado: {cuenta_obj.__class__.__name__}")
+
+
+def fila_cuenta(tipo_cuenta, estado_objeto):
+    """
+    Convierte el estado de una cuenta en las columnas tipadas de CuentasAlmacenadas.
+    Las columnas que no aplican (bonificacion y edad en una Cuenta) quedan a NULL.
+    """
+    return {
+        'tipo_cuenta': tipo_cuenta,
+        'titular': estado_objeto['titular'],
+        'cantidad': estado_objeto['cantidad'],
+        'bonificacion': estado_objeto.get('bonificacion'),
+        'edad': estado_objeto.get('edad')
+    }
+
+
+def validar_datos_cuenta(datos_iniciales):
+    """
+    Valida los parámetros del constructor de Cuenta recibidos en un JSON.
+
+    Returns:
+        Tupla (estado_objeto, None) si son válidos, o (None, mensaje_error) si no.
+    """
+    if not datos_iniciales or 'titular' not in datos_iniciales:
+        return None, 'Falta el campo "titular"'
+
+    titular = datos_iniciales['titular']
+
+    cantidad = datos_iniciales.get('cantidad', 0.00)
+    if not isinstance(titular, str) or not titular.strip():
+        return None, 'El titular debe ser una cadena no vacía'
+    if not isinstance(cantidad, (int, float)):
+        return None, 'La cantidad debe ser un número'
+    if cantidad < 0:
+        return None, 'La cantidad inicial no puede ser negativa'
+
+    return {
+        'titular': titular,
+        'cantidad': cantidad
+    }, None
+
+
+def validar_datos_cuenta_joven(datos_iniciales):
+    """
+    Valida los parámetros del constructor de CuentaJoven recibidos en un JSON.
+
+    Returns:
+        Tupla (estado_objeto, None) si son válidos, o (None, mensaje_error) si no.
+    """
+    # Validación de la entrada (parámetros para el constructor de CuentaJoven).
+    campos_requeridos = ['titular', 'bonificacion', 'edad']
+    if not datos_iniciales or any(campo not in datos_iniciales for campo in campos_requeridos):
+        campos_faltantes = [campo for campo in campos_requeridos if not datos_iniciales or campo not in datos_iniciales]
+        return None, f'Faltan campos obligatorios: {", ".join(campos_faltantes)}'
+
+    titular = datos_iniciales['titular']
+    cantidad = datos_iniciales.get('cantidad', 0.00) # Opcional, default 0.00.
+    bonificacion = datos_iniciales['bonificacion']
+    edad = datos_iniciales['edad']
+
+    # Validaciones adicionales de tipo y valor.
+    if not isinstance(titular, str) or not titular.strip():
+        return None, 'El titular debe ser una cadena no vacía'
+    if not isinstance(cantidad, (int, float)) or cantidad < 0:
+        return None, 'La cantidad debe ser un número no negativo'
+    if not isinstance(bonificacion, (int, float)) or bonificacion < 0: # Podríamos validar un rango 0-100.
+        return None, 'La bonificación debe ser un número no negativo'
+    if not isinstance(edad, int) or edad <= 0: # La edad debería ser un entero positivo.
+        return None, 'La edad debe ser un número entero positivo'
+    # Nota: NO estamos validando aquí si es TitularValido (18 <= edad < 25),
+    # solo que los datos sean correctos. Esa lógica pertenece al objeto.
+
+    # Creamos el diccionario que representa el estado del objeto CuentaJoven.
+    return {
+        'titular': titular,
+        'cantidad': cantidad,
+        'bonificacion': bonificacion,
+        'edad': edad
+    }, None
+
+
+def describir_cuenta(cuenta_id, cuenta_obj):
+    """
+    Construye el diccionario de respuesta con la información de una cuenta
+    (el formato de GET /cuentas/<id>/verificar).
+    """
+    # Ahora puedes usar los métodos del objeto.
+    info = {
+        'id_db': cuenta_id,
+        'tipo_objeto': cuenta_obj.__class__.__name__, # Obtiene 'Cuenta' o 'CuentaJoven'
+        'titular': cuenta_obj.consultar_titular(),
+        'saldo_actual': cuenta_obj.consultar_saldo(),
+    }
+    # Si es CuentaJoven, podríamos añadir más info.
+    if isinstance(cuenta_obj, CuentaJoven):
+         info['bonificacion'] = cuenta_obj.get_bonificacion()
+         info['edad'] = cuenta_obj.get_edad()
+         info['es_valido'] = cuenta_obj.TitularValido()
+    return info
+
+
+def validar_gasto(datos_gasto):
+    """
+    Valida el JSON de un gasto ('cantidad' obligatoria y positiva, 'version' opcional).
+
+    Returns:
+        Tupla (cantidad, version_esperada, None) si es válido, o (None, None, mensaje_error) si no.
+    """
+    if not datos_gasto or 'cantidad' not in datos_gasto:
+        return None, None, 'Falta el campo "cantidad" en el cuerpo JSON'
+
+    cantidad = datos_gasto['cantidad']
+    version_esperada = datos_gasto.get('version')
+
+    # Validar cantidad.
+    if not isinstance(cantidad, (int, float)):
+        return None, None, 'La cantidad debe ser un número'
+    if cantidad <= 0:
+        return None, None, 'La cantidad del gasto debe ser positiva'
+    if version_esperada is not None and (not isinstance(version_esperada, int) or version_esperada < 0):
+        return None, None, 'La versión debe ser un número entero no negativo'
+    return cantidad, version_esperada, None
+
+
+def aplicar_gasto_fila(cuenta_id, fila, cantidad):
+    """
+    Aplica un gasto sobre una fila de CuentasAlmacenadas usando el método realizar_gasto del objeto.
+
+    Returns:
+        Tupla (columnas a guardar en la BD, estado nuevo de la cuenta).
+        Lanza GastoRechazado si las reglas de la cuenta no permiten el gasto.
+        Lanza ValueError si los datos de la fila están corruptos.
+        Lanza FilaSinMigrar si la fila es antigua y se leyó sin 'datos_objeto'.
+    """
+    cuenta_obj = construir_instancia_cuenta(cuenta_id, fila)
+
+    # Intentar realizar el gasto usando el método del objeto.
+    try:
+        cuenta_obj.realizar_gasto(cantidad)
+    except TitularNoValido as e:
+        raise GastoRechazado(f"Gasto no permitido: {e}", 403) from e # Forbidden
+    except SaldoInsuficiente as e:
+        raise GastoRechazado('Saldo insuficiente para realizar el gasto', 400) from e # Bad Request
+
+    estado_nuevo = estado_cuenta(cuenta_obj)
+    datos_db = fila_cuenta(fila['tipo_cuenta'], estado_nuevo)
+    if fila.get('datos_objeto') is not None:
+        # La fila aún estaba en formato JSON, queda convertida a columnas.
+        datos_db['datos_objeto'] = None
+    return datos_db, estado_nuevo
+
+
+def validar_registro(datos_registro):
+    """
+    Valida el JSON de registro de usuario (dni_usuario, contraseña, id_cuenta).
+
+    Returns:
+        Tupla (datos para la tabla Usuarios, None) si es válido, o (None, mensaje_error) si no.
+    """
+    # Validar la entrada: campos obligatorios y tipos.
+    campos_requeridos = ['dni_usuario', 'contraseña', 'id_cuenta']
+    if not datos_registro or any(campo not in datos_registro for campo in campos_requeridos):
+        campos_faltantes = [campo for campo in campos_requeridos if not datos_registro or campo not in datos_registro]
+        return None, f'Faltan campos obligatorios: {", ".join(campos_faltantes)}'
+
+    dni_usuario = datos_registro['dni_usuario']
+    contraseña = datos_registro['contraseña']
+    id_cuenta_str = datos_registro['id_cuenta']
+
+    # Validar tipos y formatos.
+    if not isinstance(dni_usuario, str) or not dni_usuario.strip():
+        return None, 'El DNI de usuario debe ser una cadena no vacía'
+    if not isinstance(contraseña, str) or not contraseña.strip(): # Aunque ya hasheada, debe ser string no vacía.
+        return None, 'La contraseña debe ser una cadena no vacía'
+    if not isinstance(id_cuenta_str, (str, int)): # Aceptamos str o int inicialmente, luego convertimos a int.
+        return None, 'El ID de cuenta debe ser un número entero'
+
+    try:
+        id_cuenta = int(id_cuenta_str) # Intentar convertir a entero.
+        if id_cuenta <= 0:
+            raise ValueError # Lanzar error si no es positivo.
+    except ValueError:
+        return None, 'El ID de cuenta debe ser un número entero positivo válido'
+
+    # Preparar datos para la inserción en la tabla Usuarios.
+    return {
+        'dni_usuario': dni_usuario,
+        'contraseña': contraseña,
+        'fk_id_cuenta': id_cuenta # Usamos el ID de cuenta convertido a entero.
+    }, None
@@ -2,15 +2,23 @@
 import mysql.connector
 import os
 import logging
-
-# Configuración del registro (logging).
-logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+import base64
+import json
+import threading
+import time
+from collections import deque, OrderedDict
+from functools import lru_cache, wraps
+from inspect import isgeneratorfunction
 
 
 class ErrorBaseDeDatos(Exception):
     """Excepción personalizada para errores de base de datos."""
     pass
 
+class ErrorConflictoVersion(ErrorBaseDeDatos):
+    """La versión de la fila no coincide con la esperada (bloqueo optimista)."""
+    pass
+
 def obtener_conexion_bd():
     """
     Establece la conexión a la base de datos, usando variables de entorno.
@@ -25,141 +33,918 @@ def obtener_conexion_bd():
         )
         return mi_bd
     except mysql.connector.Error as err:
-        logging.error(f"Error de conexión a la BD: {err}")  # Log detallado.
+        logging.error("Error de conexión a la BD: %s", err)  # Log detallado.
         raise ErrorBaseDeDatos(f"No se pudo conectar a la base de datos: {err}")
 
-def obtener_todos_los_elementos(nombre_tabla, filtro=None, orden=None, limite=None, offset=None):
+
+class PoolConexiones:
+    """
+    Pool de conexiones acotado y seguro entre hilos.
+
+    Reutiliza las conexiones abiertas en lugar de abrir una nueva (TCP + autenticación)
+    en cada llamada. Si todas están en uso, espera hasta `timeout` segundos a que se
+    libere una. Las conexiones que llevan más de `intervalo_verificacion` segundos
+    ociosas se comprueban (ping) antes de entregarlas.
+
+    Args:
+        tamano: Número máximo de conexiones abiertas a la vez.
+        timeout: Segundos máximos de espera para obtener una conexión.
+        intervalo_verificacion: Segundos de inactividad a partir de los cuales se verifica la conexión.
+        fabrica: Función que crea una conexión nueva (por defecto obtener_conexion_bd).
+    """
+    def __init__(self, tamano=5, timeout=10.0, intervalo_verificacion=30.0, fabrica=None):
+        if tamano < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1.")
+        self.tamano = tamano
+        self.timeout = timeout
+        self.intervalo_verificacion = intervalo_verificacion
+        self._fabrica = fabrica or obtener_conexion_bd
+        self._libres = deque()  # Pares (conexion, instante_ultimo_uso).
+        self._condicion = threading.Condition()
+        self._abiertas = 0
+        self._cerrado = False
+        # Estadísticas.
+        self._prestamos = 0
+        self._esperas = 0
+        self._timeouts = 0
+        self._descartadas = 0
+        self._tiempo_espera_total = 0.0
+
+    def obtener(self):
+        """
+        Saca una conexión del pool (o crea una si aún no se ha llegado al tamaño máximo).
+        Lanza ErrorBaseDeDatos si se agota el tiempo de espera o falla la conexión.
+        """
+        inicio = time.monotonic()
+        limite = inicio + self.timeout
+        ha_esperado = False
+        with self._condicion:
+            while True:
+                if self._cerrado:
+                    raise ErrorBaseDeDatos("El pool de conexiones está cerrado.")
+                if self._libres:
+                    conexion, ultimo_uso = self._libres.pop()
+                    break
+                if self._abiertas < self.tamano:
+                    # Reservamos el hueco antes de conectar (fuera del lock).
+                    self._abiertas += 1
+                    conexion, ultimo_uso = None, None
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._timeouts += 1
+                    raise ErrorBaseDeDatos(
+                        f"Tiempo de espera agotado ({self.timeout}s) al obtener una conexión del pool.")
+                ha_esperado = True
+                self._condicion.wait(restante)
+            self._prestamos += 1
+            if ha_esperado:
+                self._esperas += 1
+                self._tiempo_espera_total += time.monotonic() - inicio
+
+        # Verificar las conexiones ociosas fuera del lock, el ping es un round trip.
+        if conexion is not None and time.monotonic() - ultimo_uso >= self.intervalo_verificacion:
+            if not self._conexion_valida(conexion):
+                logging.warning("Conexión ociosa del pool no válida, se reemplaza.")
+                self._cerrar_conexion(conexion)
+                with self._condicion:
+                    self._descartadas += 1
+                conexion = None
+
+        if conexion is None:
+            try:
+                conexion = self._fabrica()
+            except Exception:
+                self._liberar_hueco()
+                raise
+        _notificar_conexion(time.monotonic() - inicio)
+        return conexion
+
+    def devolver(self, conexion, descartar=False):
+        """
+        Devuelve una conexión al pool. Si había una transacción abierta se deshace,
+        y si la conexión no está en buen estado (o se pide `descartar`) se cierra
+        y deja su hueco libre para una nueva.
+        """
+        try:
+            if descartar:
+                raise ErrorBaseDeDatos("descarte solicitado")
+            if conexion.in_transaction:
+                conexion.rollback()
+        except Exception as err:
+            logging.warning("Se descarta una conexión del pool al devolverla: %s", err)
+            self._cerrar_conexion(conexion)
+            with self._condicion:
+                self._descartadas += 1
+            self._liberar_hueco()
+            return
+
+        with self._condicion:
+            if self._cerrado:
+                self._abiertas -= 1
+                cerrar = True
+            else:
+                self._libres.append((conexion, time.monotonic()))
+                cerrar = False
+            self._condicion.notify()
+        if cerrar:
+            self._cerrar_conexion(conexion)
+
+    def cerrar(self):
+        """Cierra todas las conexiones libres e impide nuevos préstamos."""
+        with self._condicion:
+            self._cerrado = True
+            libres = list(self._libres)
+            self._libres.clear()
+            self._abiertas -= len(libres)
+            self._condicion.notify_all()
+        for conexion, _ in libres:
+            self._cerrar_conexion(conexion)
+
+    def estadisticas(self):
+        """
+        Devuelve un diccionario con el estado y los contadores del pool.
+        """
+        with self._condicion:
+            return {
+                'tamano_maximo': self.tamano,
+                'abiertas': self._abiertas,
+                'libres': len(self._libres),
+                'en_uso': self._abiertas - len(self._libres),
+                'prestamos': self._prestamos,
+                'esperas': self._esperas,
+                'timeouts': self._timeouts,
+                'descartadas': self._descartadas,
+                'tiempo_espera_total': self._tiempo_espera_total,
+            }
+
+    def _liberar_hueco(self):
+        with self._condicion:
+            self._abiertas -= 1
+            self._condicion.notify()
+
+    @staticmethod
+    def _conexion_valida(conexion):
+        try:
+            return conexion.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _cerrar_conexion(conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def obtener_pool():
+    """
+    Devuelve el pool de conexiones del proceso, creándolo la primera vez.
+    Se configura con las variables de entorno DB_POOL_TAMANO, DB_POOL_TIMEOUT y
+    DB_POOL_VERIFICACION. Tras un fork (workers de gunicorn) se crea un pool nuevo.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = PoolConexiones(
+                    tamano=int(os.environ.get("DB_POOL_TAMANO", 5)),
+                    timeout=float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+                    intervalo_verificacion=float(os.environ.get("DB_POOL_VERIFICACION", 30)),
+                )
+                _pool_pid = pid
+    return _pool
+
+def estadisticas_pool():
+    """Devuelve las estadísticas del pool de conexiones del proceso."""
+    return obtener_pool().estadisticas()
+
+_observadores_escritura = []
+
+def registrar_observador_escritura(funcion):
+    """
+    Registra una función que se llama tras cada actualización o eliminación confirmada
+    con funcion(nombre_tabla, id_columna, id_valor). Sirve, por ejemplo, para invalidar cachés.
+    """
+    _observadores_escritura.append(funcion)
+
+def _notificar_escritura(nombre_tabla, id_columna, id_valor):
+    for funcion in _observadores_escritura:
+        try:
+            funcion(nombre_tabla, id_columna, id_valor)
+        except Exception as e:
+            logging.error("Error en un observador de escritura de %s: %s", nombre_tabla, e)
+
+# Instrumentación: funciones que reciben el tiempo de cada helper de BD y de cada
+# préstamo de conexión del pool (las usa metricas.py). Sin observadores no cuestan nada.
+_observadores_consulta = []
+_observadores_conexion = []
+
+def registrar_observador_consulta(funcion):
+    """
+    Registra una función que se llama al terminar cada helper de BD con
+    funcion(operacion, nombre_tabla, segundos, error), donde `error` es True si lanzó una excepción.
+    """
+    _observadores_consulta.append(funcion)
+
+def registrar_observador_conexion(funcion):
+    """
+    Registra una función que se llama tras cada préstamo de una conexión del pool con
+    funcion(segundos): el tiempo de espera más, en su caso, el de verificar o abrir la conexión.
+    """
+    _observadores_conexion.append(funcion)
+
+def _notificar_consulta(operacion, nombre_tabla, segundos, error):
+    for funcion in _observadores_consulta:
+        try:
+            funcion(operacion, nombre_tabla, segundos, error)
+        except Exception as e:
+            logging.error("Error en un observador de consultas de %s: %s", nombre_tabla, e)
+
+def _notificar_conexion(segundos):
+    for funcion in _observadores_conexion:
+        try:
+            funcion(segundos)
+        except Exception as e:
+            logging.error("Error en un observador de conexiones: %s", e)
+
+def _medir_consulta(funcion):
+    """
+    Decorador de los helpers de BD: mide cada llamada y avisa a los observadores de consultas.
+    En los generadores solo cuenta el tiempo dentro del generador, no el del consumidor.
+    """
+    operacion = funcion.__name__
+
+    if isgeneratorfunction(funcion):
+        @wraps(funcion)
+        def envoltorio_generador(nombre_tabla, *args, **kwargs):
+            if not _observadores_consulta:
+                yield from funcion(nombre_tabla, *args, **kwargs)
+                return
+            generador = funcion(nombre_tabla, *args, **kwargs)
+            duracion = 0.0
+            error = False
+            try:
+                while True:
+                    inicio = time.perf_counter()
+                    try:
+                        elemento = next(generador)
+                    except StopIteration:
+                        return
+                    finally:
+                        duracion += time.perf_counter() - inicio
+                    yield elemento
+            except Exception:
+                error = True
+                raise
+            finally:
+                generador.close()
+                _notificar_consulta(operacion, nombre_tabla, duracion, error)
+        return envoltorio_generador
+
+    @wraps(funcion)
+    def envoltorio(nombre_tabla, *args, **kwargs):
+        if not _observadores_consulta:
+            return funcion(nombre_tabla, *args, **kwargs)
+        inicio = time.perf_counter()
+        error = False
+        try:
+            return funcion(nombre_tabla, *args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            _notificar_consulta(operacion, nombre_tabla, time.perf_counter() - inicio, error)
+    return envoltorio
+
+# Sentencias preparadas: cada conexión del pool guarda sus cursores preparados por SQL,
+# así MariaDB no vuelve a analizar la misma sentencia en cada llamada.
+USAR_SENTENCIAS_PREPARADAS = os.environ.get("DB_SENTENCIAS_PREPARADAS", "1") == "1"
+TAMANO_CACHE_SENTENCIAS = int(os.environ.get("DB_CACHE_SENTENCIAS", 64))  # Por conexión.
+
+_estadisticas_sentencias = {'aciertos': 0, 'fallos': 0, 'expulsiones': 0}
+_estadisticas_sentencias_lock = threading.Lock()
+
+def _contar_sentencia(contador):
+    with _estadisticas_sentencias_lock:
+        _estadisticas_sentencias[contador] += 1
+
+def _obtener_cursor(conexion, sql, diccionario=False):
+    """
+    Devuelve un cursor para ejecutar `sql` en `conexion`.
+
+    Con sentencias preparadas activas, reutiliza el cursor preparado que la conexión
+    ya tenga para ese SQL (LRU de TAMANO_CACHE_SENTENCIAS por conexión). El SQL debe venir
+    de los constructores memorizados (_sql_select, ...): el conector solo evita volver
+    a preparar si recibe el mismo objeto cadena.
+    """
+    if not USAR_SENTENCIAS_PREPARADAS:
+        return conexion.cursor(dictionary=diccionario)
+
+    cursores = getattr(conexion, '_cursores_preparados', None)
+    if cursores is None:
+        cursores = conexion._cursores_preparados = OrderedDict()
+    clave = (sql, diccionario)
+    cursor = cursores.get(clave)
+    if cursor is not None:
+        cursores.move_to_end(clave)
+        _contar_sentencia('aciertos')
+        return cursor
+
+    _contar_sentencia('fallos')
+    cursor = conexion.cursor(prepared=True, dictionary=diccionario)
+    cursores[clave] = cursor
+    if len(cursores) > TAMANO_CACHE_SENTENCIAS:
+        _, cursor_viejo = cursores.popitem(last=False)
+        _contar_sentencia('expulsiones')
+        try:
+            cursor_viejo.close()  # Libera la sentencia en el servidor.
+        except mysql.connector.Error:
+            pass
+    return cursor
+
+def _proyeccion(columnas, *obligatorias):
+    """Lista de columnas de un SELECT ('*' si no se indican), añadiendo las `obligatorias` que falten."""
+    if not columnas:
+        return "*"
+    columnas = tuple(columnas) + tuple(c for c in obligatorias if c not in columnas)
+    return ", ".join(f"`{columna}`" for columna in columnas)
+
+def _condiciones_filtro(columnas_filtro):
+    """Condiciones WHERE de una forma de filtro de _preparar_filtro (columna o (columna, n) para IN)."""
+    condiciones = []
+    for columna in columnas_filtro:
+        if isinstance(columna, tuple):
+            columna, cantidad = columna
+            condiciones.append(f"`{columna}` IN ({', '.join(['%s'] * cantidad)})")
+        else:
+            condiciones.append(f"`{columna}` = %s")
+    return condiciones
+
+@lru_cache(maxsize=512)
+def _sql_select(nombre_tabla, columnas_filtro, orden, con_limite, con_offset, nulos_cursor=None,
+                columnas=()):
+    """
+    Construye (una sola vez por forma de consulta) el SELECT de obtener_todos_los_elementos.
+    `nulos_cursor` es None sin paginación por clave y, con ella, una tupla que indica qué
+    valores del cursor son NULL (cambian las condiciones, ver _alternativas_cursor).
+    """
+    sql = f"SELECT {_proyeccion(columnas)} FROM {nombre_tabla}"  # Consulta base.
+    # Añadir WHERE (si hay filtro). Usamos `backticks` para nombres de columnas.
+    condiciones = _condiciones_filtro(columnas_filtro)
+    if nulos_cursor is not None:
+        # Paginación por clave: filas posteriores a (c1, c2, ...) en el orden pedido, escrito como
+        # (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ... para que MariaDB use el índice.
+        descendente = orden[0][1].upper() == 'DESC'
+        alternativas = []
+        for i in _alternativas_cursor(nulos_cursor, descendente):
+            iguales = [f"`{previa}` IS NULL" if nulo else f"`{previa}` = %s"
+                       for (previa, _), nulo in zip(orden[:i], nulos_cursor)]
+            columna = orden[i][0]
+            if nulos_cursor[i]:
+                posterior = f"`{columna}` IS NOT NULL"  # Solo en orden ascendente.
+            elif descendente:
+                posterior = f"(`{columna}` < %s OR `{columna}` IS NULL)"
+            else:
+                posterior = f"`{columna}` > %s"
+            alternativas.append("(" + " AND ".join(iguales + [posterior]) + ")")
+        condiciones.append("(" + " OR ".join(alternativas) + ")" if alternativas else "FALSE")
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    # Añadir ORDER BY (si hay orden).
+    if orden:
+        sql += " ORDER BY " + ", ".join([f"`{columna}` {direccion}" for columna, direccion in orden])
+    # Añadir LIMIT y OFFSET (si hay paginación).
+    if con_limite:
+        sql += " LIMIT %s"
+        if con_offset:
+            sql += " OFFSET %s"
+    return sql
+
+def _alternativas_cursor(nulos_cursor, descendente):
+    """
+    Columnas de orden que dan una alternativa (ci posterior y las anteriores iguales) en la
+    condición de la paginación por clave. Como en el ORDER BY de MariaDB, NULL va antes que
+    cualquier valor: en orden descendente nada va después de un NULL y su alternativa se omite.
+    """
+    return [i for i, nulo in enumerate(nulos_cursor) if not (descendente and nulo)]
+
+def _parametros_cursor(despues_de, descendente):
+    """Valores de las alternativas de _sql_select: v1 | v1, v2 | v1, v2, v3 ... sin los NULL."""
+    parametros = []
+    for i in _alternativas_cursor(tuple(valor is None for valor in despues_de), descendente):
+        parametros.extend(valor for valor in despues_de[:i + 1] if valor is not None)
+    return parametros
+
+@lru_cache(maxsize=256)
+def _sql_existe(nombre_tabla, columnas_filtro):
+    """SELECT de existe_elemento: no lee ninguna columna y para en la primera fila."""
+    sql = f"SELECT 1 FROM {nombre_tabla}"
+    condiciones = _condiciones_filtro(columnas_filtro)
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    return sql + " LIMIT 1"
+
+def _preparar_filtro(filtro):
+    """
+    Convierte un filtro {'columna': valor} en (forma, parámetros) para _sql_select.
+    Los valores lista, tupla o conjunto se filtran con IN. Para no generar (ni preparar)
+    un SQL distinto por cada longitud, las listas se rellenan hasta la siguiente potencia
+    de 2 repitiendo el último valor, lo que no cambia el resultado de IN.
+    Devuelve forma None si alguna lista está vacía (ninguna fila puede cumplir el filtro).
+    """
+    if not filtro:
+        return (), []
+    forma = []
+    parametros = []
+    for columna, valor in filtro.items():
+        if isinstance(valor, (list, tuple, set, frozenset)):
+            valores = list(valor)
+            if not valores:
+                return None, []
+            cantidad = 1 << (len(valores) - 1).bit_length()
+            valores.extend([valores[-1]] * (cantidad - len(valores)))
+            forma.append((columna, cantidad))
+            parametros.extend(valores)
+        else:
+            forma.append(columna)
+            parametros.append(valor)
+    return tuple(forma), parametros
+
+@lru_cache(maxsize=256)
+def _sql_insert(nombre_tabla, columnas):
+    """Construye (una sola vez por tabla y columnas) el INSERT de insertar_elemento."""
+    columnas_sql = ', '.join([f"`{col}`" for col in columnas]) # Backticks.
+    marcadores = ', '.join(['%s'] * len(columnas))
+    return f"INSERT INTO {nombre_tabla} ({columnas_sql}) VALUES ({marcadores})"
+
+@lru_cache(maxsize=256)
+def _sql_update(nombre_tabla, columnas, id_columna):
+    """Construye (una sola vez por tabla, columnas e ID) el UPDATE de actualizar_elemento."""
+    sets = ', '.join([f"`{col}` = %s" for col in columnas]) # Backticks.
+    return f"UPDATE {nombre_tabla} SET {sets} WHERE `{id_columna}` = %s"  # Backticks.
+
+def estadisticas_sql():
+    """
+    Devuelve los aciertos/fallos de la caché de SQL construido y de la de sentencias preparadas.
+    """
+    cache_sql = {}
+    for nombre, funcion in (('select', _sql_select), ('existe', _sql_existe), ('insert', _sql_insert),
+                            ('update', _sql_update)):
+        info = funcion.cache_info()
+        cache_sql[nombre] = {'aciertos': info.hits, 'fallos': info.misses, 'entradas': info.currsize}
+    with _estadisticas_sentencias_lock:
+        preparadas = dict(_estadisticas_sentencias)
+    consultas = preparadas['aciertos'] + preparadas['fallos']
+    preparadas['tasa_aciertos'] = preparadas['aciertos'] / consultas if consultas else 0.0
+    preparadas['activas'] = USAR_SENTENCIAS_PREPARADAS
+    return {'sql': cache_sql, 'sentencias_preparadas': preparadas}
+
+@_medir_consulta
+def obtener_todos_los_elementos(nombre_tabla, filtro=None, orden=None, limite=None, offset=None,
+                                despues_de=None, columnas=None):
     """
     Obtiene registros de una tabla, con opciones de filtrado, orden y paginación.
 
     Args:
         nombre_tabla: Nombre de la tabla.
         filtro: Diccionario con condiciones WHERE (e.g., {'edad': 25, 'ciudad': 'Madrid'}).
+            Un valor lista, tupla o conjunto se filtra con IN (e.g., {'id': [1, 5, 7]}).
         orden: Lista de tuplas para ordenar (e.g., [('edad', 'ASC'), ('nombre', 'DESC')]).
         limite: Número máximo de registros a devolver (para paginación).
         offset:  Desplazamiento para la paginación (comenzar desde el registro N).
+        despues_de: Paginación por clave (keyset): tupla con los valores de las columnas de `orden`
+            de la última fila ya leída; solo se devuelven las filas posteriores. Coste constante
+            por página, al contrario que OFFSET. Todas las columnas de `orden` deben tener la
+            misma dirección y la última debe ser única (e.g., el ID). Las columnas pueden tener
+            NULL: van antes que cualquier valor, como en el ORDER BY de MariaDB.
+        columnas: Columnas a leer (e.g., ('id', 'titular')); por defecto todas (SELECT *).
 
     Returns:
         Lista de diccionarios (cada diccionario es una fila).
         Lanza ErrorBaseDeDatos si hay problemas.
     """
-    conexion = obtener_conexion_bd()
-    try:
-        #  Cursor que devuelve los resultados como diccionarios.
-        cursor = conexion.cursor(dictionary=True)
-
-        sql = f"SELECT * FROM {nombre_tabla}"  # Consulta base.
-
-        parametros = []
-        # Añadir WHERE (si hay filtro).
-        if filtro:
-            condiciones = []
-            for columna, valor in filtro.items():
-                # Usamos `backticks` para nombres de columnas.
-                condiciones.append(f"`{columna}` = %s")
-                parametros.append(valor)
-            sql += " WHERE " + " AND ".join(condiciones)
+    if despues_de is not None:
+        if not orden or len(despues_de) != len(orden):
+            raise ValueError("despues_de necesita un valor por cada columna de orden.")
+        if len({direccion.upper() for _, direccion in orden}) != 1:
+            raise ValueError("La paginación por clave necesita la misma dirección en todas las columnas.")
 
-        # Añadir ORDER BY (si hay orden).
-        if orden:
-            orden_sql = ", ".join([f"`{columna}` {direccion}" for columna, direccion in orden])
-            sql += " ORDER BY " + orden_sql
+    forma_filtro, parametros = _preparar_filtro(filtro)
+    if forma_filtro is None:
+        return []  # IN con una lista vacía: no hace falta consultar.
 
-        # Añadir LIMIT y OFFSET (si hay paginación).
+    pool = obtener_pool()
+    conexion = pool.obtener()
+    try:
+        if despues_de is not None:
+            parametros.extend(_parametros_cursor(despues_de, orden[0][1].upper() == 'DESC'))
         if limite is not None:
-            sql += " LIMIT %s"
             parametros.append(int(limite))  # Convertir a entero.
             if offset is not None:
-                sql += " OFFSET %s"
                 parametros.append(int(offset))
 
+        # El SQL solo depende de la forma de la consulta, no de los valores.
+        sql = _sql_select(
+            nombre_tabla,
+            forma_filtro,
+            tuple(tuple(o) for o in orden) if orden else (),
+            limite is not None,
+            limite is not None and offset is not None,
+            tuple(valor is None for valor in despues_de) if despues_de is not None else None,
+            tuple(columnas) if columnas else (),
+        )
+
+        #  Cursor que devuelve los resultados como diccionarios.
+        cursor = _obtener_cursor(conexion, sql, diccionario=True)
         # Ejecutar la consulta SQL con los parámetros.
         cursor.execute(sql, tuple(parametros))
         resultados = cursor.fetchall()
         return resultados
 
     except mysql.connector.Error as err:
-        logging.error(f"Error al obtener datos de {nombre_tabla}: {err}")
+        logging.error("Error al obtener datos de %s: %s", nombre_tabla, err)
         raise ErrorBaseDeDatos(f"Error al obtener datos: {err}")
     finally:
-        if conexion:
-            conexion.close()
+        pool.devolver(conexion)
 
 
 
+@_medir_consulta
+def existe_elemento(nombre_tabla, filtro):
+    """
+    Indica si existe algún registro que cumpla el filtro, sin leer ninguna columna
+    (SELECT 1 ... LIMIT 1).
+
+    Args:
+        nombre_tabla: Nombre de la tabla.
+        filtro: Diccionario con condiciones WHERE (igualdad, o IN si el valor es una lista).
+
+    Returns:
+        True si existe al menos un registro, False si no.
+        Lanza ErrorBaseDeDatos si hay problemas.
+    """
+    forma_filtro, parametros = _preparar_filtro(filtro)
+    if forma_filtro is None:
+        return False
+
+    pool = obtener_pool()
+    conexion = pool.obtener()
+    try:
+        sql = _sql_existe(nombre_tabla, forma_filtro)
+        cursor = _obtener_cursor(conexion, sql)
+        cursor.execute(sql, tuple(parametros))
+        return bool(cursor.fetchall())
+
+    except mysql.connector.Error as err:
+        logging.error("Error al comprobar la existencia en %s: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al obtener datos: {err}")
+    finally:
+        pool.devolver(conexion)
+
+
+@_medir_consulta
+def iterar_elementos(nombre_tabla, filtro=None, orden=None, tamano_bloque=1000, por_bloques=False,
+                     columnas=None):
+    """
+    Recorre los registros de una tabla sin cargarlos todos en memoria.
+
+    Usa un cursor sin buffer: las filas se leen del socket a medida que se consumen,
+    de `tamano_bloque` en `tamano_bloque`. La conexión del pool queda ocupada mientras
+    dura el recorrido y se libera en cuanto el generador termina o se cierra
+    (si se deja a medias, la conexión se descarta en lugar de leer el resto).
+
+    Args:
+        nombre_tabla: Nombre de la tabla.
+        filtro: Diccionario con condiciones WHERE (igualdad, o IN si el valor es una lista).
+        orden: Lista de tuplas para ordenar (e.g., [('id', 'ASC')]).
+        tamano_bloque: Filas que se piden al servidor en cada lectura.
+        por_bloques: Si es True, produce listas de hasta `tamano_bloque` filas en vez de filas sueltas.
+        columnas: Columnas a leer; por defecto todas.
+
+    Yields:
+        Diccionarios (cada uno es una fila) o listas de diccionarios si por_bloques es True.
+        Lanza ErrorBaseDeDatos si hay problemas.
+    """
+    forma_filtro, parametros = _preparar_filtro(filtro)
+    if forma_filtro is None:
+        return  # IN con una lista vacía: no hay filas.
+
+    pool = obtener_pool()
+    conexion = pool.obtener()
+    completado = False
+    try:
+        sql = _sql_select(
+            nombre_tabla,
+            forma_filtro,
+            tuple(tuple(o) for o in orden) if orden else (),
+            False,
+            False,
+            columnas=tuple(columnas) if columnas else (),
+        )
+        # Cursor normal (sin buffer ni preparado): no se guarda en la caché de sentencias
+        # porque puede quedar con filas pendientes.
+        cursor = conexion.cursor(dictionary=True)
+        cursor.execute(sql, tuple(parametros))
+        while True:
+            bloque = cursor.fetchmany(tamano_bloque)
+            if not bloque:
+                break
+            if por_bloques:
+                yield bloque
+            else:
+                yield from bloque
+        completado = True
+
+    except mysql.connector.Error as err:
+        logging.error("Error al recorrer datos de %s: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al obtener datos: {err}")
+    finally:
+        # Si el consumidor paró antes del final quedan filas sin leer en la conexión.
+        pool.devolver(conexion, descartar=not completado)
+
+def obtener_pagina(nombre_tabla, columna_orden='id', columna_id='id', limite=50, token=None,
+                   filtro=None, descendente=False, columnas=None):
+    """
+    Devuelve una página de registros usando paginación por clave (keyset) sobre
+    (columna_orden, columna_id), con un token opaco para pedir la siguiente.
+
+    Args:
+        nombre_tabla: Nombre de la tabla.
+        columna_orden: Columna por la que se ordena. Puede contener NULL: esas filas van al
+            principio en orden ascendente y al final en descendente.
+        columna_id: Columna única que desempata (normalmente la clave primaria).
+        limite: Número de registros por página.
+        token: Token devuelto por la llamada anterior, o None para la primera página.
+        filtro: Diccionario con condiciones WHERE de igualdad.
+        descendente: Si es True, ordena de mayor a menor.
+        columnas: Columnas a leer; por defecto todas. Siempre se leen también las de orden (el token las usa).
+
+    Returns:
+        Tupla (lista de diccionarios, token de la siguiente página o None si no hay más).
+        Lanza ValueError si el token no es válido para esta consulta.
+        Lanza ErrorBaseDeDatos si hay problemas.
+    """
+    direccion = 'DESC' if descendente else 'ASC'
+    if columna_orden == columna_id:
+        orden = [(columna_id, direccion)]
+    else:
+        orden = [(columna_orden, direccion), (columna_id, direccion)]
+    columnas_orden = [columna for columna, _ in orden]
+
+    despues_de = None
+    if token:
+        despues_de = _decodificar_token(token, nombre_tabla, columnas_orden, direccion)
+
+    if columnas:
+        columnas = tuple(columnas) + tuple(c for c in columnas_orden if c not in columnas)
+
+    # Pedimos una fila de más para saber si hay página siguiente.
+    filas = obtener_todos_los_elementos(
+        nombre_tabla, filtro=filtro, orden=orden, limite=limite + 1, despues_de=despues_de,
+        columnas=columnas)
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        siguiente = _codificar_token(nombre_tabla, columnas_orden, direccion, [ultima[c] for c in columnas_orden])
+    return filas, siguiente
+
+def _codificar_token(nombre_tabla, columnas, direccion, valores):
+    contenido = json.dumps({'t': nombre_tabla, 'c': columnas, 'd': direccion, 'v': valores},
+                           separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(contenido.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decodificar_token(token, nombre_tabla, columnas, direccion):
+    try:
+        relleno = '=' * (-len(token) % 4)
+        contenido = json.loads(base64.urlsafe_b64decode(token + relleno))
+        valores = contenido['v']
+        es_valido = (contenido['t'] == nombre_tabla and contenido['c'] == columnas
+                     and contenido['d'] == direccion and len(valores) == len(columnas))
+    except (ValueError, TypeError, KeyError):
+        es_valido = False
+    if not es_valido:
+        raise ValueError("Token de paginación no válido para esta consulta.")
+    return tuple(valores)
+
+
+@_medir_consulta
 def insertar_elemento(nombre_tabla, datos):
     """
     Inserta un nuevo registro y devuelve el ID del registro insertado.
     """
-    conexion = obtener_conexion_bd()
+    pool = obtener_pool()
+    conexion = pool.obtener()
     try:
-        cursor = conexion.cursor()
-        # Unir las claves del diccionario para formar la lista de columnas.
-        columnas = ', '.join([f"`{col}`" for col in datos.keys()]) # Backticks.
-        # Crear marcadores de posición para los valores.
-        marcadores = ', '.join(['%s'] * len(datos))
-        valores = tuple(datos.values())
-
-        sql = f"INSERT INTO {nombre_tabla} ({columnas}) VALUES ({marcadores})"
-        cursor.execute(sql, valores)
+        sql = _sql_insert(nombre_tabla, tuple(datos))
+        cursor = _obtener_cursor(conexion, sql)
+        cursor.execute(sql, tuple(datos.values()))
         conexion.commit()
         return cursor.lastrowid  # Devuelve el ID del nuevo registro.
 
     except mysql.connector.Error as err:
         conexion.rollback()
-        logging.error(f"Error al insertar en {nombre_tabla}: {err}")
+        logging.error("Error al insertar en %s: %s", nombre_tabla, err)
         raise ErrorBaseDeDatos(f"Error al insertar: {err}")
     finally:
-        if conexion:
-            conexion.close()
+        pool.devolver(conexion)
+
 
+# Incremento de los AUTO_INCREMENT y modo de bloqueo de InnoDB, para deducir los IDs de un INSERT múltiple.
+_SQL_AUTOINCREMENTO = "SELECT @@auto_increment_increment, @@innodb_autoinc_lock_mode"
 
+@_medir_consulta
+def insertar_elementos(nombre_tabla, lista_datos, tamano_bloque=500):
+    """
+    Inserta muchos registros con INSERT de varias filas (un VALUES por fila) de
+    `tamano_bloque` en `tamano_bloque`, todos en una sola transacción: si falla algún
+    bloque no se inserta ninguno.
+
+    Args:
+        nombre_tabla: Nombre de la tabla.
+        lista_datos: Lista de diccionarios, todos con las mismas columnas.
+        tamano_bloque: Número máximo de filas por sentencia.
+
+    Returns:
+        Lista con los IDs generados, en el mismo orden que lista_datos.
+        Lanza ErrorBaseDeDatos si hay problemas (y la transacción se deshace entera).
+    """
+    if not lista_datos:
+        return []
+    claves = list(lista_datos[0].keys())
+    if any(list(datos.keys()) != claves for datos in lista_datos):
+        raise ValueError("Todos los registros del lote deben tener las mismas columnas.")
+
+    pool = obtener_pool()
+    conexion = pool.obtener()
+    try:
+        cursor = conexion.cursor()
+        # Con innodb_autoinc_lock_mode 0 o 1 los IDs de un INSERT de varias filas son consecutivos
+        # y avanzan de @@auto_increment_increment en @@auto_increment_increment. Con el modo 2
+        # (intercalado) no está garantizado: se inserta fila a fila y se toma el ID de cada una.
+        cursor.execute(_SQL_AUTOINCREMENTO)
+        incremento, modo_bloqueo = cursor.fetchone()
+        if int(modo_bloqueo) not in (0, 1):
+            tamano_bloque = 1
+
+        columnas = ', '.join([f"`{col}`" for col in claves]) # Backticks.
+        marcador_fila = '(' + ', '.join(['%s'] * len(claves)) + ')'
+        ids = []
+        for inicio in range(0, len(lista_datos), tamano_bloque):
+            bloque = lista_datos[inicio:inicio + tamano_bloque]
+            marcadores = ', '.join([marcador_fila] * len(bloque))
+            valores = tuple(valor for datos in bloque for valor in datos.values())
+
+            sql = f"INSERT INTO {nombre_tabla} ({columnas}) VALUES {marcadores}"
+            cursor.execute(sql, valores)
+            # lastrowid es el ID de la PRIMERA fila insertada por la sentencia.
+            primer_id = cursor.lastrowid
+            ids.extend(primer_id + i * incremento for i in range(len(bloque)))
+        conexion.commit()
+        return ids
+
+    except mysql.connector.Error as err:
+        conexion.rollback()
+        logging.error("Error al insertar lote en %s: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al insertar lote: {err}")
+    finally:
+        pool.devolver(conexion)
+
+
+@_medir_consulta
 def actualizar_elemento(nombre_tabla, id_columna, id_valor, datos):
     """
     Actualiza un registro, permitiendo especificar la columna ID.
     """
-    conexion = obtener_conexion_bd()
+    pool = obtener_pool()
+    conexion = pool.obtener()
     try:
-        cursor = conexion.cursor()
-        # Generar la parte SET de la consulta SQL dinámicamente.
-        sets = ', '.join([f"`{col}` = %s" for col in datos.keys()]) # Backticks.
         valores = list(datos.values())
         valores.append(id_valor)
 
         #  Consulta SQL para actualizar registros en la tabla.
-        sql = f"UPDATE {nombre_tabla} SET {sets} WHERE `{id_columna}` = %s"  # Backticks.
+        sql = _sql_update(nombre_tabla, tuple(datos), id_columna)
+        cursor = _obtener_cursor(conexion, sql)
         cursor.execute(sql, tuple(valores))
         conexion.commit()
+        _notificar_escritura(nombre_tabla, id_columna, id_valor)
         return cursor.rowcount > 0  # Devuelve True si se actualizó alguna fila.
 
     except mysql.connector.Error as err:
         conexion.rollback()
-        logging.error(f"Error al actualizar {nombre_tabla}: {err}")
+        logging.error("Error al actualizar %s: %s", nombre_tabla, err)
         raise ErrorBaseDeDatos(f"Error al actualizar: {err}")
     finally:
-        if conexion:
-            conexion.close()
+        pool.devolver(conexion)
 
 
+@_medir_consulta
+def actualizar_elemento_atomico(nombre_tabla, id_columna, id_valor, funcion_actualizar,
+                                version_esperada=None, columna_version='version', columnas=None):
+    """
+    Lee y actualiza un registro dentro de una única transacción (SELECT ... FOR UPDATE),
+    de forma que las actualizaciones concurrentes sobre la misma fila no se pierdan.
+
+    Args:
+        nombre_tabla: Nombre de la tabla.
+        id_columna: Nombre de la columna identificadora.
+        id_valor: Valor del identificador.
+        funcion_actualizar: Función que recibe la fila actual (diccionario) y devuelve
+            un diccionario con las columnas a modificar. Si lanza una excepción,
+            la transacción se deshace y la excepción se propaga.
+        version_esperada: Si se indica, la fila debe estar en esa versión.
+        columna_version: Columna entera que se incrementa en cada actualización.
+        columnas: Columnas que se leen y se pasan a `funcion_actualizar`; por defecto todas.
+            La de identificador y la de versión se leen siempre.
+
+    Returns:
+        Diccionario con la fila actualizada (incluida la nueva versión),
+        o None si no existe ningún registro con ese identificador.
+        Lanza ErrorConflictoVersion si la versión no coincide.
+        Lanza ErrorBaseDeDatos si hay problemas.
+    """
+    proyeccion = _proyeccion(columnas, id_columna, columna_version)
+    pool = obtener_pool()
+    conexion = pool.obtener()
+    try:
+        cursor = conexion.cursor(dictionary=True, buffered=True)
+        conexion.start_transaction()
+        # Bloqueamos la fila hasta el commit/rollback.
+        cursor.execute(
+            f"SELECT {proyeccion} FROM {nombre_tabla} WHERE `{id_columna}` = %s FOR UPDATE", (id_valor,))
+        fila = cursor.fetchone()
+        if fila is None:
+            conexion.rollback()
+            return None
+
+        version_actual = fila[columna_version]
+        if version_esperada is not None and version_actual != version_esperada:
+            conexion.rollback()
+            raise ErrorConflictoVersion(
+                f"La fila {id_valor} de {nombre_tabla} está en la versión {version_actual}, "
+                f"se esperaba la {version_esperada}.")
+
+        datos = funcion_actualizar(dict(fila))
+
+        sets = ', '.join([f"`{col}` = %s" for col in datos.keys()])  # Backticks.
+        valores = list(datos.values())
+        valores.extend([id_valor, version_actual])
+        sql = (f"UPDATE {nombre_tabla} SET {sets}, `{columna_version}` = `{columna_version}` + 1 "
+               f"WHERE `{id_columna}` = %s AND `{columna_version}` = %s")
+        cursor.execute(sql, tuple(valores))
+        if cursor.rowcount == 0:
+            # Alguien modificó la fila sin pasar por el bloqueo.
+            conexion.rollback()
+            raise ErrorConflictoVersion(f"La fila {id_valor} de {nombre_tabla} cambió durante la actualización.")
+        conexion.commit()
+        _notificar_escritura(nombre_tabla, id_columna, id_valor)
+
+        fila.update(datos)
+        fila[columna_version] = version_actual + 1
+        return fila
+
+    except mysql.connector.Error as err:
+        conexion.rollback()
+        logging.error("Error al actualizar %s de forma atómica: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al actualizar: {err}")
+    except Exception:
+        # Errores de la función de actualización (reglas de negocio): deshacer y propagar.
+        if conexion.in_transaction:
+            conexion.rollback()
+        raise
+    finally:
+        pool.devolver(conexion)
+
+
+@_medir_consulta
 def eliminar_elemento(nombre_tabla, id_columna, id_valor):
     """
     Elimina un registro, permitiendo especificar la columna ID.
     """
-    conexion = obtener_conexion_bd()
+    pool = obtener_pool()
+    conexion = pool.obtener()
     try:
         cursor = conexion.cursor()
         sql = f"DELETE FROM {nombre_tabla} WHERE `{id_columna}` = %s" # Backticks.
         cursor.execute(sql, (id_valor,))
         conexion.commit()
+        _notificar_escritura(nombre_tabla, id_columna, id_valor)
         return cursor.rowcount > 0 # Devuelve True si se eliminó alguna fila.
 
     except mysql.connector.Error as err:
         conexion.rollback()
-        logging.error(f"Error al eliminar de {nombre_tabla}: {err}")
+        logging.error("Error al eliminar de %s: %s", nombre_tabla, err)
         raise ErrorBaseDeDatos(f"Error al eliminar: {err}")
     finally:
-        if conexion:
-            conexion.close()
+        pool.devolver(conexion)
+@_medir_consulta
 def obtener_valor_columna(nombre_tabla, columna, filtro):
     """
     Obtiene el valor de una columna específica de una fila que cumple un filtro.
@@ -173,10 +958,12 @@ def obtener_valor_columna(nombre_tabla, columna, filtro):
         El valor de la columna, o None si no se encuentra la fila.
         Lanza ErrorBaseDeDatos si hay problemas.
     """
-    conexion = obtener_conexion_bd()
+    pool = obtener_pool()
+    conexion = pool.obtener()
     try:
-        # Cursor que devuelve los resultados como diccionarios.
-        cursor = conexion.cursor(dictionary=True)
+        # Cursor que devuelve los resultados como diccionarios. Buffered para no dejar
+        # filas sin leer en la conexión, que vuelve al pool.
+        cursor = conexion.cursor(dictionary=True, buffered=True)
         # Seleccionamos solo la columna que nos interesa.
         sql = f"SELECT `{columna}` FROM {nombre_tabla}"
 
@@ -200,8 +987,7 @@ def obtener_valor_columna(nombre_tabla, columna, filtro):
             return None
 
     except mysql.connector.Error as err:
-        logging.error(f"Error al obtener valor de {columna} en {nombre_tabla}: {err}")
+        logging.error("Error al obtener valor de %s en %s: %s", columna, nombre_tabla, err)
         raise ErrorBaseDeDatos(f"Error al obtener valor: {err}")
     finally:
-        if conexion:
-            conexion.close()
\ No newline at end of file
+        pool.devolver(conexion)
\ No newline at end of file
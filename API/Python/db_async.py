@@ -0,0 +1,233 @@
+# file: db_async.py
+# Versión asíncrona (asyncio + aiomysql) de los helpers de db.py, para app_async.py.
+# Usa el mismo SQL memorizado que db.py y las mismas excepciones, así que ambos
+# servicios se comportan igual frente a la BD.
+import aiomysql
+import asyncio
+import os
+import logging
+from contextlib import asynccontextmanager
+
+from db import (ErrorBaseDeDatos, ErrorConflictoVersion, _preparar_filtro, _proyeccion, _sql_existe,
+                _sql_select, _sql_insert, _sql_update)
+
+
+_pool = None
+_pool_lock = None
+
+async def obtener_pool():
+    """
+    Devuelve el pool aiomysql del proceso, creándolo la primera vez.
+    Usa las mismas variables de entorno que db.py (DB_HOST, ..., DB_POOL_TAMANO, DB_POOL_VERIFICACION).
+    Lanza ErrorBaseDeDatos si falla la conexión.
+    """
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = await aiomysql.create_pool(
+                    minsize=1,
+                    maxsize=int(os.environ.get("DB_POOL_TAMANO", 5)),
+                    # Las conexiones con más de este tiempo se reabren al sacarlas del pool.
+                    pool_recycle=int(float(os.environ.get("DB_POOL_VERIFICACION", 30))),
+                    host=os.environ.get("DB_HOST"),
+                    user=os.environ.get("DB_USER"),
+                    password=os.environ.get("DB_PASSWORD"),
+                    db=os.environ.get("DB_NAME"),
+                    charset='utf8mb4',
+                    autocommit=False,
+                )
+            except aiomysql.Error as err:
+                logging.error("Error de conexión a la BD: %s", err)  # Log detallado.
+                raise ErrorBaseDeDatos(f"No se pudo conectar a la base de datos: {err}")
+    return _pool
+
+async def cerrar_pool():
+    """Cierra el pool y espera a que se cierren sus conexiones."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+# Errores tras los que la conexión puede haber quedado a medio leer una respuesta o rota:
+# no se puede deshacer sobre ella y se cierra. El resto (reglas de negocio como GastoRechazado,
+# ErrorConflictoVersion...) llegan con la conexión en buen estado: se deshace y vuelve al pool.
+_ERRORES_CONEXION = (aiomysql.Error, asyncio.CancelledError, asyncio.TimeoutError,
+                     asyncio.IncompleteReadError, ConnectionError)
+
+async def _deshacer(conexion):
+    """Deshace lo no confirmado; si ni eso se puede, cierra la conexión."""
+    try:
+        await conexion.rollback()  # Sin efecto si ya se confirmó.
+    except aiomysql.Error:
+        conexion.close()
+    except BaseException:
+        conexion.close()
+        raise
+
+@asynccontextmanager
+async def _conexion():
+    """
+    Saca una conexión del pool durante el bloque `async with` (esperando como mucho
+    DB_POOL_TIMEOUT segundos) y la devuelve siempre al final, deshaciendo lo no confirmado.
+    Solo se cierra (y el pool abre otra) si el bloque termina con un error de la BD o de la
+    red, o se cancela (p. ej. el cliente se desconecta) a mitad de una consulta.
+    """
+    pool = await obtener_pool()
+    timeout = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+    try:
+        conexion = await asyncio.wait_for(pool.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise ErrorBaseDeDatos(f"Tiempo de espera agotado ({timeout}s) al obtener una conexión del pool.")
+    try:
+        try:
+            yield conexion
+        except _ERRORES_CONEXION:
+            # Puede tener respuestas pendientes: el pool no reutiliza conexiones cerradas.
+            conexion.close()
+            raise
+        except Exception:
+            await _deshacer(conexion)
+            raise
+        except BaseException:
+            conexion.close()
+            raise
+        await _deshacer(conexion)
+    finally:
+        pool.release(conexion)
+
+
+async def obtener_todos_los_elementos(nombre_tabla, filtro=None, orden=None, limite=None, offset=None,
+                                      columnas=None):
+    """
+    Obtiene registros de una tabla, con opciones de filtrado, orden y paginación.
+    Mismos argumentos y resultado que db.obtener_todos_los_elementos.
+    """
+    forma_filtro, parametros = _preparar_filtro(filtro)
+    if forma_filtro is None:
+        return []  # IN con una lista vacía: no hace falta consultar.
+    if limite is not None:
+        parametros.append(int(limite))  # Convertir a entero.
+        if offset is not None:
+            parametros.append(int(offset))
+    sql = _sql_select(
+        nombre_tabla,
+        forma_filtro,
+        tuple(tuple(o) for o in orden) if orden else (),
+        limite is not None,
+        limite is not None and offset is not None,
+        columnas=tuple(columnas) if columnas else (),
+    )
+    try:
+        async with _conexion() as conexion:
+            async with conexion.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, tuple(parametros))
+                return list(await cursor.fetchall())
+    except aiomysql.Error as err:
+        logging.error("Error al obtener datos de %s: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al obtener datos: {err}")
+
+
+async def existe_elemento(nombre_tabla, filtro):
+    """
+    Indica si existe algún registro que cumpla el filtro (SELECT 1 ... LIMIT 1).
+    Mismos argumentos y resultado que db.existe_elemento.
+    """
+    forma_filtro, parametros = _preparar_filtro(filtro)
+    if forma_filtro is None:
+        return False
+    sql = _sql_existe(nombre_tabla, forma_filtro)
+    try:
+        async with _conexion() as conexion:
+            async with conexion.cursor() as cursor:
+                await cursor.execute(sql, tuple(parametros))
+                return await cursor.fetchone() is not None
+    except aiomysql.Error as err:
+        logging.error("Error al comprobar la existencia en %s: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al obtener datos: {err}")
+
+
+async def insertar_elemento(nombre_tabla, datos):
+    """
+    Inserta un nuevo registro y devuelve el ID del registro insertado.
+    """
+    sql = _sql_insert(nombre_tabla, tuple(datos))
+    try:
+        async with _conexion() as conexion:
+            async with conexion.cursor() as cursor:
+                await cursor.execute(sql, tuple(datos.values()))
+                await conexion.commit()
+                return cursor.lastrowid  # Devuelve el ID del nuevo registro.
+    except aiomysql.Error as err:
+        logging.error("Error al insertar en %s: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al insertar: {err}")
+
+
+async def actualizar_elemento(nombre_tabla, id_columna, id_valor, datos):
+    """
+    Actualiza un registro, permitiendo especificar la columna ID.
+    """
+    valores = list(datos.values())
+    valores.append(id_valor)
+    sql = _sql_update(nombre_tabla, tuple(datos), id_columna)
+    try:
+        async with _conexion() as conexion:
+            async with conexion.cursor() as cursor:
+                await cursor.execute(sql, tuple(valores))
+                await conexion.commit()
+                return cursor.rowcount > 0  # Devuelve True si se actualizó alguna fila.
+    except aiomysql.Error as err:
+        logging.error("Error al actualizar %s: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al actualizar: {err}")
+
+
+async def actualizar_elemento_atomico(nombre_tabla, id_columna, id_valor, funcion_actualizar,
+                                      version_esperada=None, columna_version='version', columnas=None):
+    """
+    Lee y actualiza un registro dentro de una única transacción (SELECT ... FOR UPDATE).
+    Mismos argumentos y resultado que db.actualizar_elemento_atomico; `funcion_actualizar`
+    es síncrona (solo aplica las reglas de negocio sobre la fila).
+    """
+    proyeccion = _proyeccion(columnas, id_columna, columna_version)
+    try:
+        async with _conexion() as conexion:
+            async with conexion.cursor(aiomysql.DictCursor) as cursor:
+                await conexion.begin()
+                # Bloqueamos la fila hasta el commit/rollback.
+                await cursor.execute(
+                    f"SELECT {proyeccion} FROM {nombre_tabla} WHERE `{id_columna}` = %s FOR UPDATE", (id_valor,))
+                fila = await cursor.fetchone()
+                if fila is None:
+                    return None
+
+                version_actual = fila[columna_version]
+                if version_esperada is not None and version_actual != version_esperada:
+                    raise ErrorConflictoVersion(
+                        f"La fila {id_valor} de {nombre_tabla} está en la versión {version_actual}, "
+                        f"se esperaba la {version_esperada}.")
+
+                # Si lanza una excepción, _conexion() deshace la transacción.
+                datos = funcion_actualizar(dict(fila))
+
+                sets = ', '.join([f"`{col}` = %s" for col in datos.keys()])  # Backticks.
+                valores = list(datos.values())
+                valores.extend([id_valor, version_actual])
+                sql = (f"UPDATE {nombre_tabla} SET {sets}, `{columna_version}` = `{columna_version}` + 1 "
+                       f"WHERE `{id_columna}` = %s AND `{columna_version}` = %s")
+                await cursor.execute(sql, tuple(valores))
+                if cursor.rowcount == 0:
+                    # Alguien modificó la fila sin pasar por el bloqueo.
+                    raise ErrorConflictoVersion(f"La fila {id_valor} de {nombre_tabla} cambió durante la actualización.")
+                await conexion.commit()
+
+                fila.update(datos)
+                fila[columna_version] = version_actual + 1
+                return fila
+    except aiomysql.Error as err:
+        logging.error("Error al actualizar %s de forma atómica: %s", nombre_tabla, err)
+        raise ErrorBaseDeDatos(f"Error al actualizar: {err}")
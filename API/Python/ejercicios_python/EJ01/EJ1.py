@@ -1,17 +1,126 @@
+import inspect
+import math
+import weakref
+
+try:
+    import numpy as np
+except ImportError:  # Solo lo necesita InventarioColumnar.
+    np = None
+
+
 class Producto:
     """
-    Representa un producto con su nombre, precio y cantidad
+    Representa un producto con su nombre, precio y cantidad.
+    Avisa a sus observadores (p. ej. el Inventario que lo contiene) cuando cambian
+    el precio o la cantidad.
     """
     def __init__(self,nombre,precio,cantidad):
         self.nombre = nombre
-        self.precio = precio
-        self.cantidad = cantidad
+        self._precio = precio
+        self._cantidad = cantidad
+        self._observadores = []
+
+    @property
+    def precio(self):
+        return self._precio
+
+    @precio.setter
+    def precio(self, precio):
+        anterior = self.valor()
+        self._precio = precio
+        self._notificar(anterior)
+
+    @property
+    def cantidad(self):
+        return self._cantidad
+
+    @cantidad.setter
+    def cantidad(self, cantidad):
+        anterior = self.valor()
+        self._cantidad = cantidad
+        self._notificar(anterior)
+
+    def valor(self):
+        """Valor del producto en el inventario (precio * cantidad)."""
+        return self.precio * self.cantidad
+
+    def registrar_observador(self, funcion):
+        """
+        funcion(producto, valor_anterior, valor_nuevo) se llama tras cada cambio de precio o cantidad.
+        Los métodos se guardan con weakref.WeakMethod: el producto no mantiene vivo a su
+        observador (p. ej. un Inventario descartado), que deja de recibir avisos al desaparecer.
+        """
+        referencia = weakref.WeakMethod(funcion) if inspect.ismethod(funcion) else (lambda: funcion)
+        self._observadores.append(referencia)
+
+    def eliminar_observador(self, funcion):
+        for i, referencia in enumerate(self._observadores):
+            if referencia() == funcion:
+                del self._observadores[i]
+                return
+        raise ValueError ("El observador no está registrado.")
+
+    def _notificar(self, valor_anterior):
+        if self._observadores:
+            valor = self.valor()
+            desaparecidos = False
+            for referencia in self._observadores:
+                funcion = referencia()
+                if funcion is None:
+                    desaparecidos = True
+                else:
+                    funcion(self, valor_anterior, valor)
+            if desaparecidos:
+                self._observadores = [r for r in self._observadores if r() is not None]
+
     def __str__(self):
         return f"Producto: {self.nombre}, Precio: {self.precio} y Cantidad: {self.cantidad}"
 
 class Inventario:
-    def __init__(self):
-        self.productos = []
+    """
+    Productos indexados por nombre, con el valor total mantenido al día en cada alta,
+    baja y cambio de precio o cantidad (el nombre de un producto no debe cambiar mientras
+    esté en el inventario).
+
+    Args:
+        verificar (bool): Si es True, calcular_valor_total comprueba el total mantenido
+            contra un recálculo completo (lento, para pruebas).
+    """
+    # Diferencia relativa admitida entre el total mantenido y el recalculado (redondeo).
+    TOLERANCIA_VERIFICACION = 1e-9
+
+    def __init__(self, verificar=False):
+        # Productos por nombre: búsqueda, alta y baja en O(1). El dict conserva el orden de alta.
+        self._productos = {}
+        self._valor_total = 0
+        self.verificar = verificar
+
+    @property
+    def productos(self):
+        """
+        Vista de solo lectura de los productos en orden de alta, sin copiarlos (O(1)): se puede
+        recorrer y medir con len(), y refleja las altas y bajas posteriores.
+
+        Antes era una lista: ya no admite índices ni append/remove. Para dar de alta o de baja
+        se usan agregar_producto y eliminar_producto, y list(inventario.productos) si hace falta
+        una lista (también para dar de baja mientras se recorre).
+        """
+        return self._productos.values()
+
+    def __len__(self):
+        return len(self._productos)
+
+    def __contains__(self, nombre):
+        return nombre in self._productos
+
+    def obtener_producto(self, nombre):
+        """
+        Busca un producto por su nombre.
+        Return:
+            producto (Producto): El producto, o None si no existe.
+        """
+        return self._productos.get(nombre)
+
     def agregar_producto(self,producto):
         """
         Agrega producto al inventario.
@@ -23,15 +132,31 @@ class Inventario:
         """
         if not isinstance(producto, Producto):
             raise TypeError ("Solo se pueden agregar productos.")
-        
-        for i in self.productos:
-            if i.nombre == producto.nombre:
-                raise ValueError (f"Ya existe un producto con el nombre {i.nombre}")
-            
-        self.productos.append(producto)
-            
+        if producto.nombre in self._productos:
+            raise ValueError (f"Ya existe un producto con el nombre {producto.nombre}")
+
+        self._guardar(producto)
+
+    def agregar_productos(self, productos):
+        """
+        Agrega varios productos. Si alguno no es válido no se agrega ninguno.
+        Args:
+            productos (iterable de Producto): Productos a meter.
+        Errores:
+            TypeError: Si algún elemento no es una instancia Producto
+            ValueError: Si ya existe un producto igual (en el inventario o repetido en la lista).
+        """
+        nuevos = {}
+        for producto in productos:
+            if not isinstance(producto, Producto):
+                raise TypeError ("Solo se pueden agregar productos.")
+            if producto.nombre in self._productos or producto.nombre in nuevos:
+                raise ValueError (f"Ya existe un producto con el nombre {producto.nombre}")
+            nuevos[producto.nombre] = producto
+        for producto in nuevos.values():
+            self._guardar(producto)
+
     def eliminar_producto(self,nombre):
-        estado = False
         """
         Elimina un producto de el inventario por su nombre
         Args:
@@ -43,33 +168,306 @@ class Inventario:
         """
         if not isinstance (nombre, str):
             raise TypeError ("El nombre debe ser una cadena de texto")
-        for i, producto in enumerate(self.productos):
-            if producto.nombre == nombre:
-                del self.productos[i]
-                estado = True
-            return estado # Devolvera True o False si ha borrado o no el Producto
-    def calcular_valor_total(self):
-        valor_total = 0
+        return self._quitar(nombre) # True o False si ha borrado o no el Producto
+
+    def eliminar_productos(self, nombres):
         """
-        Calcula el valor total de los productos
+        Elimina varios productos por su nombre.
+        Args:
+            nombres (iterable de str): Los nombres de los productos a borrar
+        Return:
+            eliminados (int): Cuántos productos se han borrado.
+        Devuelve:
+            TypeError: Si algún nombre no es una cadena (no se borra ninguno).
+        """
+        nombres = list(nombres)
+        if not all(isinstance(nombre, str) for nombre in nombres):
+            raise TypeError ("El nombre debe ser una cadena de texto")
+        eliminados = 0
+        for nombre in nombres:
+            if self._quitar(nombre):
+                eliminados += 1
+        return eliminados
+
+    def _guardar(self, producto):
+        self._productos[producto.nombre] = producto
+        self._valor_total += producto.valor()
+        producto.registrar_observador(self._producto_cambiado)
+
+    def _quitar(self, nombre):
+        producto = self._productos.pop(nombre, None)
+        if producto is None:
+            return False
+        producto.eliminar_observador(self._producto_cambiado)
+        if self._productos:
+            self._valor_total -= producto.valor()
+        else:
+            self._valor_total = 0  # Sin restos de redondeo acumulados.
+        return True
+
+    def _producto_cambiado(self, producto, valor_anterior, valor_nuevo):
+        self._valor_total += valor_nuevo - valor_anterior
+
+    def revalorizar(self, factor, nombres=None):
+        """
+        Multiplica el precio de todos los productos (o de los indicados) por `factor`.
+        Args:
+            factor (float): Por ejemplo 1.05 para subir un 5 %.
+            nombres (iterable de str): Productos a revalorizar; por defecto todos. Los nombres
+                repetidos cuentan una vez.
+        Errores:
+            ValueError: Si algún nombre no está en el inventario (no se cambia ninguno).
+        """
+        productos = self._seleccionar(nombres)
+        for producto in productos:
+            producto.precio = producto.precio * factor
+
+    def actualizar_precios(self, precios):
+        """
+        Cambia el precio de varios productos.
+        Args:
+            precios (dict): nombre -> precio nuevo.
+        Errores:
+            ValueError: Si algún nombre no está en el inventario (no se cambia ninguno).
+        """
+        productos = self._seleccionar(precios)
+        for producto in productos:
+            producto.precio = precios[producto.nombre]
+
+    def _seleccionar(self, nombres):
+        if nombres is None:
+            return list(self._productos.values())
+        nombres = list(dict.fromkeys(nombres))  # Un nombre repetido se aplica una sola vez.
+        faltan = [nombre for nombre in nombres if nombre not in self._productos]
+        if faltan:
+            raise ValueError (f"No existen productos con los nombres {', '.join(map(str, faltan))}")
+        return [self._productos[nombre] for nombre in nombres]
+
+    def recalcular_valor_total(self):
+        """
+        Recalcula el valor total recorriendo todos los productos y corrige el total mantenido.
         Return:
             valor_total (float): El valor total de el inventario
         """
-        for producto in self.productos:
+        valor_total = 0
+        for producto in self._productos.values():
             valor_total += producto.precio * producto.cantidad
-            
+        self._valor_total = valor_total
         return valor_total
+
+    def calcular_valor_total(self):
+        """
+        Calcula el valor total de los productos (mantenido en cada cambio, sin recorrerlos).
+        Return:
+            valor_total (float): El valor total de el inventario
+        Errores:
+            RuntimeError: En modo verificar, si el total mantenido no coincide con el recalculado.
+        """
+        if self.verificar:
+            mantenido = self._valor_total
+            recalculado = self.recalcular_valor_total()
+            if not math.isclose(mantenido, recalculado, rel_tol=self.TOLERANCIA_VERIFICACION,
+                                abs_tol=self.TOLERANCIA_VERIFICACION):
+                raise RuntimeError (f"Valor total mantenido {mantenido} distinto del recalculado {recalculado}")
+        return self._valor_total
     
     def __str__(self):
         salida = "Inventario\n"
         """
         Representacion de el inventario en cadena
         """
-        if not self.productos:
+        if not self._productos:
             return "El inventario esta vacio."
 
-        for producto in self.productos:
+        for producto in self._productos.values():
             salida += f"    -{producto}\n"
-        salida += f"Productos en el inventario: {len(self.productos)}"
+        salida += f"Productos en el inventario: {len(self._productos)}"
         return salida     
-    
\ No newline at end of file
+    
+
+class _Columnas:
+    """
+    Columnas de precios y cantidades de un InventarioColumnar. Sus productos apuntan a ellas
+    y no al inventario, para no formar un ciclo de referencias con él.
+    """
+    __slots__ = ('precios', 'cantidades')
+
+    def __init__(self, capacidad):
+        self.precios = np.zeros(max(1, capacidad), dtype=np.float64)
+        self.cantidades = np.zeros(max(1, capacidad), dtype=np.int64)
+
+
+class _ProductoColumnar(Producto):
+    """
+    Producto guardado en un InventarioColumnar: precio y cantidad se leen y escriben en
+    las columnas del inventario. Al darlo de baja conserva sus últimos valores.
+    """
+    def __init__(self, columnas, fila, nombre):
+        self.nombre = nombre
+        self._observadores = []
+        self._columnas = columnas
+        self._fila = fila
+        self._valores = None
+
+    @property
+    def _precio(self):
+        if self._columnas is None:
+            return self._valores[0]
+        return self._columnas.precios[self._fila].item()
+
+    @_precio.setter
+    def _precio(self, precio):
+        if self._columnas is None:
+            self._valores = (precio, self._valores[1])
+        else:
+            self._columnas.precios[self._fila] = precio
+
+    @property
+    def _cantidad(self):
+        if self._columnas is None:
+            return self._valores[1]
+        return self._columnas.cantidades[self._fila].item()
+
+    @_cantidad.setter
+    def _cantidad(self, cantidad):
+        if self._columnas is None:
+            self._valores = (self._valores[0], cantidad)
+        else:
+            InventarioColumnar._comprobar_cantidad(cantidad)
+            self._columnas.cantidades[self._fila] = cantidad
+
+    def _desligar(self):
+        self._valores = (self._precio, self._cantidad)
+        self._columnas = None
+
+
+class InventarioColumnar(Inventario):
+    """
+    Inventario con precios y cantidades en columnas de NumPy, para revalorizar miles de
+    productos de una vez (revalorizar, actualizar_precios) con operaciones vectorizadas.
+
+    Misma interfaz que Inventario, con dos diferencias:
+        - agregar_producto y agregar_productos guardan una copia del producto (sus valores
+          pasan a las columnas). El objeto que se agrega queda desligado: cambiar después su
+          precio o cantidad no cambia el inventario ni su total. Los productos del inventario
+          son los que devuelven obtener_producto y productos, y sus cambios van a las columnas.
+        - Las cantidades deben ser números enteros.
+    Los cambios en bloque no avisan a los observadores que se hayan registrado en cada producto.
+
+    Args:
+        verificar (bool): Como en Inventario.
+        capacidad (int): Filas reservadas al principio (las columnas crecen solas).
+    """
+    def __init__(self, verificar=False, capacidad=1024):
+        if np is None:
+            raise ImportError ("InventarioColumnar necesita numpy.")
+        super().__init__(verificar)
+        self._columnas = _Columnas(capacidad)
+        self._filas_usadas = 0
+
+    @property
+    def _precios(self):
+        return self._columnas.precios
+
+    @_precios.setter
+    def _precios(self, precios):
+        self._columnas.precios = precios
+
+    @property
+    def _cantidades(self):
+        return self._columnas.cantidades
+
+    @_cantidades.setter
+    def _cantidades(self, cantidades):
+        self._columnas.cantidades = cantidades
+
+    @staticmethod
+    def _comprobar_cantidad(cantidad):
+        if int(cantidad) != cantidad:
+            raise ValueError ("La cantidad debe ser un número entero.")
+
+    def agregar_producto(self, producto):
+        if isinstance(producto, Producto):
+            self._comprobar_cantidad(producto.cantidad)
+        super().agregar_producto(producto)
+
+    def agregar_productos(self, productos):
+        productos = list(productos)
+        for producto in productos:
+            if isinstance(producto, Producto):
+                self._comprobar_cantidad(producto.cantidad)
+        super().agregar_productos(productos)
+
+    def _guardar(self, producto):
+        fila = self._reservar_fila()
+        self._precios[fila] = producto.precio
+        self._cantidades[fila] = producto.cantidad
+        super()._guardar(_ProductoColumnar(self._columnas, fila, producto.nombre))
+
+    def _quitar(self, nombre):
+        vista = self._productos.get(nombre)
+        if not super()._quitar(nombre):
+            return False
+        fila = vista._fila
+        vista._desligar()
+        # Fila a cero: no cuenta en el total y se reutiliza al compactar.
+        self._precios[fila] = 0
+        self._cantidades[fila] = 0
+        if not self._productos:
+            self._filas_usadas = 0
+        return True
+
+    def _reservar_fila(self):
+        if self._filas_usadas == len(self._precios):
+            if len(self._productos) <= self._filas_usadas // 2:
+                self._compactar()
+            else:
+                self._precios = np.concatenate((self._precios, np.zeros_like(self._precios)))
+                self._cantidades = np.concatenate((self._cantidades, np.zeros_like(self._cantidades)))
+        fila = self._filas_usadas
+        self._filas_usadas += 1
+        return fila
+
+    def _compactar(self):
+        """Reordena las filas según el orden de alta, sin los huecos de las bajas."""
+        filas = np.fromiter((vista._fila for vista in self._productos.values()),
+                            dtype=np.int64, count=len(self._productos))
+        n = len(filas)
+        self._precios[:n] = self._precios[filas]
+        self._cantidades[:n] = self._cantidades[filas]
+        self._precios[n:] = 0
+        self._cantidades[n:] = 0
+        for fila, vista in enumerate(self._productos.values()):
+            vista._fila = fila
+        self._filas_usadas = n
+
+    def _filas(self, nombres):
+        if nombres is None:
+            return slice(0, self._filas_usadas)
+        nombres = list(nombres)
+        productos = self._productos
+        try:
+            filas = np.fromiter((productos[nombre]._fila for nombre in nombres), dtype=np.int64, count=len(nombres))
+        except KeyError:
+            self._seleccionar(nombres)  # Lanza el ValueError con los nombres que faltan.
+            raise
+        return np.unique(filas)
+
+    def _cambiar_precios(self, filas, precios):
+        anteriores = self._precios[filas].copy()  # Con un slice sería una vista.
+        self._precios[filas] = precios
+        self._valor_total += float(np.dot(self._precios[filas] - anteriores, self._cantidades[filas]))
+
+    def revalorizar(self, factor, nombres=None):
+        filas = self._filas(nombres)
+        self._cambiar_precios(filas, self._precios[filas] * factor)
+
+    def actualizar_precios(self, precios):
+        self._seleccionar(precios)
+        filas = np.fromiter((self._productos[nombre]._fila for nombre in precios), dtype=np.int64, count=len(precios))
+        self._cambiar_precios(filas, np.fromiter(precios.values(), dtype=np.float64, count=len(precios)))
+
+    def recalcular_valor_total(self):
+        n = self._filas_usadas
+        self._valor_total = float(np.dot(self._precios[:n], self._cantidades[:n]))
+        return self._valor_total
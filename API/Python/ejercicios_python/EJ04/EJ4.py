@@ -1,28 +1,81 @@
+class ErrorGasto(ValueError):
+    """El gasto no se puede realizar; el saldo de la cuenta no cambia."""
+    pass
+
+class SaldoInsuficiente(ErrorGasto):
+    """El saldo no alcanza para el gasto."""
+    pass
+
+class TitularNoValido(ErrorGasto):
+    """El titular de la cuenta no puede realizar la operación."""
+    pass
+
+
 class Cuenta:
+    # Sin __dict__ por instancia: menos memoria y acceso a atributos más rápido.
+    __slots__ = ('titular', 'cantidad')
+
     def __init__(self,titular,cantidad):
         """Inicializa los atributos de la clase Cuenta."""
         self.titular = titular
         self.cantidad = cantidad
+
+    def to_state(self):
+        """Devuelve el estado de la cuenta (los parámetros de su constructor) como diccionario."""
+        return {'titular': self.titular, 'cantidad': self.cantidad}
+
+    @classmethod
+    def from_state(cls, estado):
+        """
+        Crea una cuenta a partir de un diccionario como el de to_state() (puede tener más claves).
+        No pasa por __init__. Lanza KeyError si falta algún atributo.
+        """
+        cuenta = cls.__new__(cls)
+        cuenta.titular = estado['titular']
+        cuenta.cantidad = estado['cantidad']
+        return cuenta
     def consultar_saldo(self):
         """Consulta el saldo de la cuenta"""
         return self.cantidad
     def realizar_gasto(self, cantidad):
-        """Reduce el saldo si hay suficiente saldo disponible."""
+        """Reduce el saldo si hay suficiente saldo disponible.
+           Devuelve la cantidad descontada; lanza SaldoInsuficiente si no hay saldo.
+        """
         if self.cantidad >= cantidad:
             self.cantidad -= cantidad
-        else:
-            print("Saldo insuficiente.")
+            return cantidad
+        raise SaldoInsuficiente("Saldo insuficiente.")
     def consultar_titular(self):
         """Getter para el atributo titular."""
         return self.titular
     
 class CuentaJoven (Cuenta):
     """Inicializa los atributos de la clase CuentaJoven"""
+    __slots__ = ('bonificacion', 'edad')
+
     def __init__(self, titular, cantidad, bonificacion,edad):
         """Inicializa la clase CuentaJoven con titular, cuenta y bonificación."""
         super().__init__(titular, cantidad)
         self.bonificacion = bonificacion
         self.edad = edad
+
+    def to_state(self):
+        """Devuelve el estado de la cuenta (los parámetros de su constructor) como diccionario."""
+        return {'titular': self.titular, 'cantidad': self.cantidad,
+                'bonificacion': self.bonificacion, 'edad': self.edad}
+
+    @classmethod
+    def from_state(cls, estado):
+        """
+        Crea una cuenta joven a partir de un diccionario como el de to_state() (puede tener más claves).
+        No pasa por __init__. Lanza KeyError si falta algún atributo.
+        """
+        cuenta = cls.__new__(cls)
+        cuenta.titular = estado['titular']
+        cuenta.cantidad = estado['cantidad']
+        cuenta.bonificacion = estado['bonificacion']
+        cuenta.edad = estado['edad']
+        return cuenta
     def get_bonificacion(self):
         """Getter para la bonificación."""
         return self.bonificacion
@@ -47,12 +100,13 @@ class CuentaJoven (Cuenta):
     def realizar_gasto(self, cantidad):
         """Sobrecarga de realizar_gasto para que solo un titular valido pueda efectuar la operacion.
            Comprueba la edad y, si es válida, llama al método realizar_gasto de la clase padre (Cuenta).
+           Devuelve la cantidad descontada (con la bonificación); lanza TitularNoValido o SaldoInsuficiente.
         """
         if self.TitularValido():
             cantidad_con_descuento = cantidad * (1 - self.bonificacion / 100)
-            super().realizar_gasto(cantidad_con_descuento)
+            return super().realizar_gasto(cantidad_con_descuento)
         else:
-            raise ValueError("El titular no es válido para realizar esta operación.")
+            raise TitularNoValido("El titular no es válido para realizar esta operación.")
     def mostrar(self):
         """Muestra la información de la cuenta joven."""
         return f"Cuenta Joven {self.bonificacion}"
@@ -1,4 +1,4 @@
-from EJ4 import Cuenta, CuentaJoven
+from EJ4 import Cuenta, CuentaJoven, SaldoInsuficiente
 
 
 cuenta1 = Cuenta("Juan Perez", 1000)
@@ -6,7 +6,10 @@ print(f"Titular: {cuenta1.consultar_titular()}")
 print(f"Saldo inicial: {cuenta1.consultar_saldo()}")
 cuenta1.realizar_gasto(200)
 print(f"Saldo después de gasto: {cuenta1.consultar_saldo()}")
-cuenta1.realizar_gasto(1500)
+try:
+    cuenta1.realizar_gasto(1500)
+except SaldoInsuficiente as e:
+    print(e)
 print(f"Saldo después de gasto fallido: {cuenta1.consultar_saldo()}")
 
 
@@ -1,4 +1,47 @@
 # python EJ05/EJ5.py
+import csv
+import io
+import json
+import sys
+import threading
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+# Filas que se acumulan antes de cada escritura en consultar y exportarCatalogo.
+FILAS_POR_BLOQUE = 1000
+COLUMNAS_CATALOGO = ('titulo', 'autor', 'fech_pub', 'num_cop')
+# json.dumps con argumentos crea un codificador en cada llamada: se reutiliza uno.
+_CODIFICADOR_JSON = json.JSONEncoder(ensure_ascii=False)
+FORMATO_FECHA = "%d-%m-%Y"
+
+
+@lru_cache(maxsize=65536)
+def _parsear_fecha_texto(fech_pub):
+    # Caso habitual DD-MM-YYYY con dígitos ASCII, sin pasar por strptime. Cualquier otra
+    # forma (p. ej. "5-6-1967", que strptime también acepta) va a strptime, así que el
+    # resultado y los errores son siempre los mismos.
+    if (len(fech_pub) == 10 and fech_pub[2] == '-' and fech_pub[5] == '-' and fech_pub.isascii()
+            and fech_pub[:2].isdigit() and fech_pub[3:5].isdigit() and fech_pub[6:].isdigit()):
+        dia, mes = int(fech_pub[:2]), int(fech_pub[3:5])
+        if 1 <= dia <= 31 and 1 <= mes <= 12:
+            return datetime(int(fech_pub[6:]), mes, dia)  # ValueError si el día no existe en el mes
+    return datetime.strptime(fech_pub, FORMATO_FECHA)
+
+
+def parsear_fecha(fech_pub):
+    """Convierte una fecha DD-MM-YYYY en datetime, como datetime.strptime(fech_pub, "%d-%m-%Y").
+
+    Las fechas ya vistas se sirven de una caché (los catálogos repiten mucho las fechas).
+
+    Raises:
+        ValueError: Si la fecha no tiene el formato DD-MM-YYYY o no existe.
+    """
+    if not isinstance(fech_pub, str):
+        return datetime.strptime(fech_pub, FORMATO_FECHA)  # Mismo TypeError que antes
+    return _parsear_fecha_texto(fech_pub)
+
+
 class Libro:
     """
     Representa un libro en una biblioteca.
@@ -10,27 +53,97 @@ class Libro:
         num_cop (int): El número de copias disponibles del libro.
     """
     def __init__(self, titulo: str, autor: str, fech_pub: str, num_cop: int):
-        from datetime import datetime
         self.titulo = titulo
         self.autor = autor
         # Convertir la fecha de publicación a un objeto datetime
         try:
-            self.fech_pub = datetime.strptime(fech_pub, "%d-%m-%Y")
+            self.fech_pub = parsear_fecha(fech_pub)
         except ValueError:
             raise ValueError("El formato de fecha debe ser DD-MM-YYYY")
         self.num_cop = num_cop
     def getCopias(self):
         return self.num_cop
 
+    def fechaPublicacion(self):
+        """Devuelve fech_pub como texto DD-MM-YYYY. Se formatea una vez y se guarda."""
+        formateada = self.__dict__.get('_fech_pub_texto')
+        if formateada is None or formateada[0] is not self.fech_pub:
+            formateada = (self.fech_pub, self.fech_pub.strftime(FORMATO_FECHA))
+            self._fech_pub_texto = formateada
+        return formateada[1]
+
 class Biblioteca:
-    def __init__(self):
+    def __init__(self, verificar: bool = False, franjas: int = 8):
         """
         Representa una biblioteca que contiene una colección de libros.
 
+        Los libros se indexan por título (título -> Libro) y por autor (autor -> libros de ese
+        autor), así que buscar, prestar, devolver o eliminar un libro no recorre la colección.
+        El total de copias, general y por autor, se mantiene en cada alta, baja, préstamo y
+        devolución. El título, el autor y num_cop de un libro no deben cambiarse directamente
+        mientras esté en la biblioteca.
+
+        Cada título pertenece a una de `franjas` franjas (por el hash del título), con su
+        cerrojo y sus propios totales de copias: los préstamos y devoluciones de títulos de
+        franjas distintas no se esperan entre sí. Los totales de la biblioteca son la suma
+        de los de las franjas.
+
+        Args:
+            verificar (bool): Si es True, totalCopias, totalCopiasAutor y copiasPorAutor comprueban
+                el total mantenido contra un recuento completo (lento, para pruebas).
+            franjas (int): Número de franjas. Con pocas basta en un solo hilo; con muchos hilos
+                prestando a la vez conviene subirlo (p. ej. 256) para que se esperen menos.
+
         Atributos:
-            biblioteca (list): Una lista de objetos `libro` que representan los libros en la biblioteca.
+            biblioteca: Vista de solo lectura de los objetos `libro`, en orden de alta (antes era
+                una lista modificable): se usan agregarLibro y eliminarLibro.
         """
-        self.biblioteca = []
+        if franjas < 1:
+            raise ValueError("El número de franjas debe ser mayor que 0.")
+        self._libros = {}  # título -> Libro, en orden de alta
+        self._por_autor = {}  # autor -> {título: Libro}
+        # Por franja: cerrojo, copias y autor -> copias (sin los autores con 0 copias).
+        self._cerrojos = [threading.Lock() for _ in range(franjas)]
+        self._copias_franja = [0] * franjas
+        self._autores_franja = [{} for _ in range(franjas)]
+        # Altas y bajas de libros de un mismo autor en franjas distintas comparten _por_autor.
+        self._cerrojo_indices = threading.Lock()
+        self.verificar = verificar
+
+    def franjaDe(self, titulo):
+        """Franja (cerrojo y totales) a la que pertenece un título, para bloquearFranja."""
+        return hash(titulo) % len(self._cerrojos)
+
+    @contextmanager
+    def bloquearFranja(self, franja: int):
+        """Toma el cerrojo de una franja durante el bloque `with`, para hacer varios préstamos y
+        devoluciones de sus títulos tomándolo una sola vez:
+
+            with biblioteca.bloquearFranja(biblioteca.franjaDe(titulo)) as franja:
+                franja.prestar(titulo)
+
+        Yields:
+            FranjaBloqueada: Presta y devuelve títulos de la franja mientras dura el bloque.
+        """
+        with self._cerrojos[franja]:
+            bloqueada = FranjaBloqueada(self, franja)
+            try:
+                yield bloqueada
+            finally:
+                bloqueada._biblioteca = None
+
+    @property
+    def biblioteca(self):
+        """Vista de los libros en orden de alta, sin copiarlos (O(1)). No admite índices, y la
+        biblioteca no debe cambiar de tamaño mientras se recorre (list(...) si hace falta)."""
+        return self._libros.values()
+
+    def __len__(self):
+        return len(self._libros)
+
+    def obtenerLibro(self, titulo:str):
+        """Devuelve el libro con ese título, o None si no está en la biblioteca."""
+        return self._libros.get(titulo)
 
     def agregarLibro(self, libro: Libro):
         """
@@ -42,12 +155,17 @@ class Biblioteca:
         Returns:
             bool: True si el libro se agregó correctamente, False si el libro ya existe en la biblioteca.
         """
-        # Verificar si el libro ya existe (usando el título como identificador único)
-        if not self.libro_existe(libro.titulo):
-            self.biblioteca.append(libro)
-            return True  # Operación exitosa
-        else:
-            return False  # Operación fallida
+        franja = self.franjaDe(libro.titulo)
+        with self._cerrojos[franja]:
+            # Verificar si el libro ya existe (usando el título como identificador único)
+            if not self.libro_existe(libro.titulo):
+                with self._cerrojo_indices:
+                    self._libros[libro.titulo] = libro
+                    self._por_autor.setdefault(libro.autor, {})[libro.titulo] = libro
+                self._sumar_copias(franja, libro.autor, libro.num_cop)
+                return True  # Operación exitosa
+            else:
+                return False  # Operación fallida
 
     def libro_existe(self, titulo:str):
         """Verifica si un libro existe en la biblioteca por su título.
@@ -58,10 +176,7 @@ class Biblioteca:
         Returns:
             bool: True si el libro existe, False en caso contrario.
         """
-        for libro_actual in self.biblioteca:
-            if libro_actual.titulo == titulo:
-                return True
-        return False
+        return titulo in self._libros
 
     def eliminarLibro(self, titulo:str):
         """Elimina un libro de la biblioteca por su título.
@@ -74,37 +189,165 @@ class Biblioteca:
         Raises:
             ValueError: Si no se encuentra el libro en la biblioteca.
         """
-        for libro_actual in self.biblioteca:
-            if libro_actual.titulo == titulo:
-                self.biblioteca.remove(libro_actual)
-                return  # Sale de la función después de eliminar el libro
+        franja = self.franjaDe(titulo)
+        with self._cerrojos[franja]:
+            with self._cerrojo_indices:
+                libro_actual = self._libros.pop(titulo, None)
+                if libro_actual is None:
+                    raise ValueError(f"No se encontró el libro con el título {titulo} en la biblioteca.")
 
-        raise ValueError(f"No se encontró el libro con el título {titulo} en la biblioteca.")
+                libros_autor = self._por_autor[libro_actual.autor]
+                del libros_autor[titulo]
+                if not libros_autor:
+                    del self._por_autor[libro_actual.autor]
+            self._sumar_copias(franja, libro_actual.autor, -libro_actual.num_cop)
 
     def consultar(self, autor=None):
         """Consulta los libros de la biblioteca.
 
         Si se proporciona un autor, lista solo los libros de ese autor.
         Si no se proporciona un autor, lista todos los libros de la biblioteca.
+        Las líneas se escriben en stdout en bloques de FILAS_POR_BLOQUE.
 
         Args:
             autor (str, optional): El autor de los libros a consultar. Defaults to None.
         """
-        libros_a_mostrar = []
+        salida = sys.stdout
+        lineas = []
+        for fila in self.iterarConsulta(autor):
+            lineas.append(f"Título: {fila['titulo']}, Autor: {fila['autor']}, Fecha de Publicación: {fila['fech_pub']}, Número de Copias: {fila['num_cop']}\n")
+            if len(lineas) == FILAS_POR_BLOQUE:  # Una escritura por bloque, no por libro
+                salida.write(''.join(lineas))
+                lineas.clear()
+
+        if lineas:
+            salida.write(''.join(lineas))
+        elif not self._libros_consulta(autor): #No hay libros
+            print("No hay libros que mostrar con los parámetros dados.")
 
+    def _libros_consulta(self, autor):
         if autor:  # Si se proporcionó un autor
-            for libro_actual in self.biblioteca:
-                if libro_actual.autor == autor:
-                    libros_a_mostrar.append(libro_actual)
-        else:  # Si no se proporcionó un autor
-            libros_a_mostrar = self.biblioteca
+            return self._por_autor.get(autor, {}).values()
+        return self._libros.values()
 
-        if not libros_a_mostrar: #No hay libros
-            print("No hay libros que mostrar con los parámetros dados.")
-        else: #Si hay libros
-             for libro_actual in libros_a_mostrar:
-                #Formateo de fech_pub a string DD-MM-YYYY
-                print(f"Título: {libro_actual.titulo}, Autor: {libro_actual.autor}, Fecha de Publicación: {libro_actual.fech_pub.strftime('%d-%m-%Y')}, Número de Copias: {libro_actual.num_cop}")
+    def iterarConsulta(self, autor=None):
+        """Recorre los libros de la consulta sin construir ninguna lista.
+
+        Mismo filtro que consultar. La biblioteca no debe cambiar de tamaño mientras se recorre.
+
+        Args:
+            autor (str, optional): El autor de los libros a consultar. Defaults to None.
+
+        Yields:
+            dict: {'titulo', 'autor', 'fech_pub' (texto DD-MM-YYYY), 'num_cop'} por libro.
+        """
+        for libro_actual in self._libros_consulta(autor):
+            yield {'titulo': libro_actual.titulo, 'autor': libro_actual.autor,
+                   'fech_pub': libro_actual.fechaPublicacion(), 'num_cop': libro_actual.num_cop}
+
+    def cargarLibros(self, filas):
+        """Crea y agrega libros a partir de filas, sin guardarlas todas en memoria.
+
+        Los libros con un título que ya existe se omiten, como en agregarLibro. Si una fila
+        no es válida se lanza el error y los libros de las filas anteriores quedan agregados.
+
+        Args:
+            filas (iterable): Diccionarios con las claves de COLUMNAS_CATALOGO o secuencias
+                (titulo, autor, fech_pub, num_cop), con fech_pub como texto DD-MM-YYYY.
+
+        Returns:
+            int: Número de libros agregados.
+        Raises:
+            ValueError: Si alguna fecha no tiene el formato DD-MM-YYYY.
+        """
+        agregados = 0
+        for fila in filas:
+            if isinstance(fila, dict):
+                libro = Libro(fila['titulo'], fila['autor'], fila['fech_pub'], fila['num_cop'])
+            else:
+                libro = Libro(*fila)
+            if self.agregarLibro(libro):
+                agregados += 1
+        return agregados
+
+    def importarCatalogo(self, archivo, formato: str = 'csv'):
+        """Carga los libros de un CSV (con la cabecera de COLUMNAS_CATALOGO) o NDJSON, como
+        los escribe exportarCatalogo. El archivo se lee fila a fila.
+
+        Args:
+            archivo: Objeto archivo de texto o binario (en binario se lee UTF-8).
+            formato (str): 'csv' o 'ndjson'.
+
+        Returns:
+            int: Número de libros agregados.
+        Raises:
+            ValueError: Si el formato no es 'csv' ni 'ndjson', o alguna fila no es válida.
+        """
+        if formato not in ('csv', 'ndjson'):
+            raise ValueError(f"Formato de importación no soportado: {formato}")
+        binario = isinstance(archivo, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(archivo, 'mode', '')
+        texto = io.TextIOWrapper(archivo, encoding='utf-8', newline='') if binario else archivo
+        try:
+            if formato == 'csv':
+                lector = csv.reader(texto)
+                cabecera = next(lector, None)
+                if cabecera is None:
+                    return 0
+                faltan = [columna for columna in COLUMNAS_CATALOGO if columna not in cabecera]
+                if faltan:
+                    raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltan)}")
+                t, a, f, n = (cabecera.index(columna) for columna in COLUMNAS_CATALOGO)
+                filas = ((fila[t], fila[a], fila[f], int(fila[n])) for fila in lector)
+            else:
+                filas = (json.loads(linea) for linea in texto if linea.strip())
+            return self.cargarLibros(filas)
+        finally:
+            if binario:
+                texto.detach()  # Sin cerrar el archivo del llamante.
+
+    def exportarCatalogo(self, archivo, formato: str = 'csv', autor=None, filas_por_bloque: int = FILAS_POR_BLOQUE):
+        """Escribe los libros de la consulta en CSV (con cabecera) o NDJSON.
+
+        Las filas se generan de una en una y se escriben en bloques de `filas_por_bloque`,
+        así que la memoria no crece con el tamaño del catálogo.
+
+        Args:
+            archivo: Objeto archivo de texto o binario (en binario se escribe UTF-8).
+            formato (str): 'csv' o 'ndjson'.
+            autor (str, optional): Exportar solo los libros de este autor.
+            filas_por_bloque (int): Filas por escritura.
+
+        Returns:
+            int: Número de libros escritos.
+        Raises:
+            ValueError: Si el formato no es 'csv' ni 'ndjson'.
+        """
+        if formato not in ('csv', 'ndjson'):
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        binario = isinstance(archivo, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(archivo, 'mode', '')
+
+        def escribir(texto):
+            archivo.write(texto.encode('utf-8') if binario else texto)
+
+        bloque = io.StringIO()
+        escritor = csv.writer(bloque, lineterminator='\n') if formato == 'csv' else None
+        if escritor:
+            escritor.writerow(COLUMNAS_CATALOGO)
+        escritas = 0
+        for fila in self.iterarConsulta(autor):
+            if escritor:
+                escritor.writerow((fila['titulo'], fila['autor'], fila['fech_pub'], fila['num_cop']))
+            else:
+                bloque.write(_CODIFICADOR_JSON.encode(fila))
+                bloque.write('\n')
+            escritas += 1
+            if escritas % filas_por_bloque == 0:
+                escribir(bloque.getvalue())
+                bloque.seek(0)
+                bloque.truncate()
+        if bloque.tell():
+            escribir(bloque.getvalue())
+        return escritas
 
     def prestarLibro(self, titulo:str):
         """Presta un libro de la biblioteca si hay copias disponibles.
@@ -115,19 +358,9 @@ class Biblioteca:
         Returns:
             bool: True si el libro fue prestado, False si no se encontró o no hay copias.
         """
-        libro_encontrado = False
-        indice = 0
-        while indice < len(self.biblioteca) and not libro_encontrado:
-            if self.biblioteca[indice].titulo == titulo:
-                libro_encontrado = True
-                if self.biblioteca[indice].num_cop > 0:
-                    self.biblioteca[indice].num_cop -= 1
-                    return True  # Operación exitosa
-                else:
-                    return False  # No hay copias disponibles
-            else:
-                indice += 1
-        return False  # Libro no encontrado
+        franja = self.franjaDe(titulo)
+        with self._cerrojos[franja]:
+            return self._prestar(franja, titulo)
 
     def devolverLibro(self, titulo:str):
         """Devuelve un libro a la biblioteca, incrementando el número de copias.
@@ -138,26 +371,231 @@ class Biblioteca:
         Returns:
             bool: True si el libro fue devuelto, False si no se encontró.
         """
-        libro_encontrado = False
-        indice = 0
-        operacion_estado = False
-        while indice < len(self.biblioteca) and not libro_encontrado:
-            if self.biblioteca[indice].titulo == titulo:
-                libro_encontrado = True
-                self.biblioteca[indice].num_cop += 1
-                operacion_estado = True
-            else:
-                indice +=1
-        return operacion_estado
+        franja = self.franjaDe(titulo)
+        with self._cerrojos[franja]:
+            return self._devolver(franja, titulo)
 
+    def _prestar(self, franja, titulo):
+        # Con el cerrojo de la franja del título ya tomado.
+        libro_actual = self._libros.get(titulo)
+        if libro_actual is None:
+            return False  # Libro no encontrado
+        if libro_actual.num_cop > 0:
+            libro_actual.num_cop -= 1
+            self._sumar_copias(franja, libro_actual.autor, -1)
+            return True  # Operación exitosa
+        return False  # No hay copias disponibles
+
+    def _devolver(self, franja, titulo):
+        # Con el cerrojo de la franja del título ya tomado.
+        libro_actual = self._libros.get(titulo)
+        if libro_actual is None:
+            return False
+        libro_actual.num_cop += 1
+        self._sumar_copias(franja, libro_actual.autor, 1)
+        return True
 
     def totalCopias(self):
         """Calcula el número total de copias de todos los libros en la biblioteca.
 
+        Suma los totales de las franjas, sin recorrer los libros.
+
         Returns:
             int: El número total de copias.
         """
+        if self.verificar:
+            with self._todas_las_franjas():
+                total_copias = sum(self._copias_franja)
+                self._comprobar(total_copias, self._contar_copias(self._libros.values()), "total")
+            return total_copias
+        return sum(self._copias_franja)
+
+    def totalCopiasAutor(self, autor:str):
+        """Número total de copias de los libros de un autor (0 si no tiene libros).
+
+        Returns:
+            int: El número total de copias del autor.
+        """
+        if self.verificar:
+            with self._todas_las_franjas():
+                copias = self._copias_autor(autor)
+                self._comprobar(copias, self._contar_copias(self._por_autor.get(autor, {}).values()), f"de {autor}")
+            return copias
+        return self._copias_autor(autor)
+
+    def _copias_autor(self, autor):
+        return sum(autores.get(autor, 0) for autores in self._autores_franja)
+
+    def copiasPorAutor(self):
+        """Devuelve un diccionario autor -> número total de copias de sus libros."""
+        if self.verificar:
+            with self._todas_las_franjas():
+                copias = self._sumar_franjas_autores(cerrojos_tomados=True)
+                for autor, libros in self._por_autor.items():
+                    self._comprobar(copias.get(autor, 0), self._contar_copias(libros.values()), f"de {autor}")
+            return copias
+        return self._sumar_franjas_autores()
+
+    def _sumar_franjas_autores(self, cerrojos_tomados=False):
+        with self._cerrojo_indices:
+            copias = dict.fromkeys(self._por_autor, 0)
+        for cerrojo, autores in zip(self._cerrojos, self._autores_franja):
+            if cerrojos_tomados:
+                elementos = list(autores.items())
+            else:
+                with cerrojo:
+                    elementos = list(autores.items())
+            for autor, copias_autor in elementos:
+                copias[autor] = copias.get(autor, 0) + copias_autor
+        return copias
+
+    def recalcularCopias(self):
+        """Recuenta las copias de todos los libros y corrige los totales mantenidos.
+
+        Returns:
+            int: El número total de copias.
+        """
+        with self._todas_las_franjas():
+            self._copias_franja = [0] * len(self._cerrojos)
+            self._autores_franja = [{} for _ in self._cerrojos]
+            for libro_actual in self._libros.values():
+                self._sumar_copias(self.franjaDe(libro_actual.titulo), libro_actual.autor, libro_actual.num_cop)
+            return sum(self._copias_franja)
+
+    def _todas_las_franjas(self):
+        """Toma los cerrojos de todas las franjas, siempre en el mismo orden."""
+        pila = ExitStack()
+        for cerrojo in self._cerrojos:
+            pila.enter_context(cerrojo)
+        return pila
+
+    def _sumar_copias(self, franja, autor, copias):
+        # Con el cerrojo de la franja ya tomado.
+        self._copias_franja[franja] += copias
+        autores = self._autores_franja[franja]
+        restantes = autores.get(autor, 0) + copias
+        if restantes:
+            autores[autor] = restantes
+        else:
+            autores.pop(autor, None)
+
+    @staticmethod
+    def _contar_copias(libros):
         total_copias = 0
-        for libro_actual in self.biblioteca:
+        for libro_actual in libros:
             total_copias += libro_actual.num_cop
-        return total_copias
\ No newline at end of file
+        return total_copias
+
+    @staticmethod
+    def _comprobar(mantenido, recontado, descripcion):
+        if mantenido != recontado:
+            raise RuntimeError(f"Copias en el total {descripcion}: mantenido {mantenido}, recontado {recontado}")
+
+
+class FranjaBloqueada:
+    """
+    Préstamos y devoluciones con el cerrojo de una franja ya tomado (Biblioteca.bloquearFranja).
+    Solo sirve para títulos de esa franja y dentro del bloque `with`.
+    """
+    def __init__(self, biblioteca, franja):
+        self._biblioteca = biblioteca
+        self.franja = franja
+
+    def _comprobar(self, titulo):
+        if self._biblioteca is None:
+            raise RuntimeError("La franja ya no está bloqueada.")
+        if self._biblioteca.franjaDe(titulo) != self.franja:
+            raise ValueError(f"El título {titulo} no pertenece a la franja {self.franja}.")
+        return self._biblioteca
+
+    def prestar(self, titulo:str):
+        """Como Biblioteca.prestarLibro. Returns: bool."""
+        return self._comprobar(titulo)._prestar(self.franja, titulo)
+
+    def devolver(self, titulo:str):
+        """Como Biblioteca.devolverLibro. Returns: bool."""
+        return self._comprobar(titulo)._devolver(self.franja, titulo)
+
+
+class MotorPrestamos:
+    """
+    Préstamos y devoluciones de una Biblioteca por lotes, seguros entre hilos.
+
+    Usa los cerrojos por franja de la biblioteca (Biblioteca.bloquearFranja, uno por grupo de
+    títulos elegido por el hash del título): las operaciones sobre títulos de franjas distintas no se esperan entre
+    sí y no hace falta un cerrojo por libro. Los totales de copias se actualizan en la franja,
+    con el mismo cerrojo.
+
+    Args:
+        biblioteca (Biblioteca): La biblioteca cuyos libros se prestan. El número de cerrojos
+            se elige al crearla (Biblioteca(franjas=...)).
+    """
+    PRESTAR = 'prestar'
+    DEVOLVER = 'devolver'
+
+    # Motivo de cada resultado.
+    PRESTADO = 'prestado'
+    DEVUELTO = 'devuelto'
+    SIN_COPIAS = 'sin_copias'
+    NO_ENCONTRADO = 'no_encontrado'
+
+    def __init__(self, biblioteca: Biblioteca):
+        self.biblioteca = biblioteca
+
+    def _aplicar(self, franja, operacion, titulo):
+        """Aplica una operación en su franja (FranjaBloqueada). Devuelve el motivo."""
+        # Las altas y bajas del título toman el mismo cerrojo: no cambia hasta salir del bloque.
+        if not self.biblioteca.libro_existe(titulo):
+            return self.NO_ENCONTRADO
+        if operacion == self.PRESTAR:
+            return self.PRESTADO if franja.prestar(titulo) else self.SIN_COPIAS
+        franja.devolver(titulo)
+        return self.DEVUELTO
+
+    def prestarLibro(self, titulo:str):
+        """Presta un libro (Biblioteca.prestarLibro ya toma el cerrojo de su franja).
+
+        Returns:
+            bool: True si el libro fue prestado, False si no se encontró o no hay copias.
+        """
+        return self.biblioteca.prestarLibro(titulo)
+
+    def devolverLibro(self, titulo:str):
+        """Devuelve un libro (Biblioteca.devolverLibro ya toma el cerrojo de su franja).
+
+        Returns:
+            bool: True si el libro fue devuelto, False si no se encontró.
+        """
+        return self.biblioteca.devolverLibro(titulo)
+
+    def procesar(self, solicitudes):
+        """Procesa un lote de solicitudes de préstamo y devolución.
+
+        Las solicitudes se agrupan por cerrojo y cada cerrojo se toma una sola vez por lote;
+        las de un mismo título se aplican en el orden del lote.
+
+        Args:
+            solicitudes (iterable): Pares (operacion, titulo), con operacion MotorPrestamos.PRESTAR
+                o MotorPrestamos.DEVOLVER.
+
+        Returns:
+            list: Un diccionario {'operacion', 'titulo', 'ok', 'motivo'} por solicitud, en el mismo orden.
+        Raises:
+            ValueError: Si alguna operación no es válida (no se aplica ninguna).
+        """
+        solicitudes = list(solicitudes)
+        grupos = {}
+        for indice, (operacion, titulo) in enumerate(solicitudes):
+            if operacion not in (self.PRESTAR, self.DEVOLVER):
+                raise ValueError(f"Operación no válida en la solicitud {indice}: {operacion}")
+            grupos.setdefault(self.biblioteca.franjaDe(titulo), []).append(indice)
+
+        resultados = [None] * len(solicitudes)
+        for numero, indices in grupos.items():
+            with self.biblioteca.bloquearFranja(numero) as franja:
+                for indice in indices:
+                    operacion, titulo = solicitudes[indice]
+                    motivo = self._aplicar(franja, operacion, titulo)
+                    resultados[indice] = {'operacion': operacion, 'titulo': titulo,
+                                          'ok': motivo in (self.PRESTADO, self.DEVUELTO), 'motivo': motivo}
+        return resultados
@@ -0,0 +1,20 @@
+# file: gunicorn.conf.py
+# Gunicorn lo carga automáticamente desde el directorio de trabajo (/app).
+# Prepara el directorio de métricas compartidas entre workers (ver metricas.py).
+import os
+import shutil
+
+
+def on_starting(server):
+    """Vacía el directorio de métricas al arrancar, para no sumar las de una ejecución anterior."""
+    directorio = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Descarta los valores en vivo de un worker que ha terminado (los contadores se conservan)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
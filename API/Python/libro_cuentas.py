@@ -0,0 +1,204 @@
+# file: libro_cuentas.py
+# Libro de cuentas en columnas (arrays de NumPy) para aplicar lotes grandes de gastos,
+# p. ej. la liquidación de fin de día, sin crear un objeto Cuenta/CuentaJoven por cuenta
+# ni llamar a realizar_gasto gasto a gasto.
+#
+# Mismas reglas que ejercicios_python/EJ04/EJ4.py, en el orden del lote:
+#   - CuentaJoven con titular no válido (edad fuera de [18, 25)): gasto rechazado.
+#   - CuentaJoven válida: se gasta cantidad * (1 - bonificacion / 100).
+#   - Si el saldo no alcanza, el gasto se rechaza y el saldo no cambia.
+import numpy as np
+
+from ejercicios_python.EJ04.EJ4 import Cuenta, CuentaJoven
+
+# Resultado de cada gasto del lote (array ResultadoLote.motivos).
+ACEPTADO = 0
+SALDO_INSUFICIENTE = 1
+TITULAR_NO_VALIDO = 2
+CUENTA_INEXISTENTE = 3
+
+DESCRIPCION_MOTIVOS = {
+    ACEPTADO: 'aceptado',
+    SALDO_INSUFICIENTE: 'Saldo insuficiente para realizar el gasto',
+    TITULAR_NO_VALIDO: 'El titular no es válido para realizar esta operación.',
+    CUENTA_INEXISTENTE: 'La cuenta no existe',
+}
+
+# Margen relativo con el que un grupo de gastos se da por cubierto sin simular uno a uno
+# (la suma acumulada y las restas sucesivas pueden diferir en el último decimal).
+_MARGEN_REDONDEO = 1e-9
+
+
+class ResultadoLote:
+    """
+    Resultado de LibroCuentas.aplicar_gastos, un elemento por gasto del lote.
+
+    Attributes:
+        motivos: Array de enteros (ACEPTADO, SALDO_INSUFICIENTE, TITULAR_NO_VALIDO, CUENTA_INEXISTENTE).
+        cantidades_aplicadas: Cantidad descontada del saldo (con la bonificación), 0 si se rechazó.
+    """
+    def __init__(self, ids_cuenta, motivos, cantidades_aplicadas):
+        self.ids_cuenta = ids_cuenta
+        self.motivos = motivos
+        self.cantidades_aplicadas = cantidades_aplicadas
+
+    @property
+    def aceptados(self):
+        """Array booleano: True en los gastos aplicados."""
+        return self.motivos == ACEPTADO
+
+    def rechazos(self):
+        """Lista de diccionarios {'indice', 'id', 'motivo'} con los gastos rechazados."""
+        indices = np.flatnonzero(self.motivos != ACEPTADO)
+        return [{'indice': int(i), 'id': int(self.ids_cuenta[i]),
+                 'motivo': DESCRIPCION_MOTIVOS[int(self.motivos[i])]} for i in indices]
+
+
+class LibroCuentas:
+    """
+    Cuentas en columnas: ids, saldos, bonificaciones y edades (las Cuenta no tienen
+    bonificación ni restricción de edad).
+
+    Args:
+        ids: IDs de las cuentas (sin repetir).
+        titulares: Titulares, en el mismo orden.
+        saldos: Saldos iniciales.
+        bonificaciones: Bonificación en % de cada CuentaJoven; None o NaN en las Cuenta.
+        edades: Edad del titular de cada CuentaJoven; None en las Cuenta.
+    """
+    def __init__(self, ids, titulares, saldos, bonificaciones, edades):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        if len(np.unique(self.ids)) != len(self.ids):
+            raise ValueError("Los IDs de las cuentas no pueden repetirse.")
+        self.titulares = list(titulares)
+        self.saldos = np.asarray(saldos, dtype=np.float64).copy()
+        self.bonificaciones = np.array([np.nan if b is None else b for b in bonificaciones], dtype=np.float64)
+        self.edades = np.array([-1 if e is None else e for e in edades], dtype=np.int64)
+        self.es_joven = ~np.isnan(self.bonificaciones)
+        # Lo que se descuenta por unidad de gasto, y quién puede gastar.
+        self.factores = np.where(self.es_joven, 1 - np.nan_to_num(self.bonificaciones) / 100, 1.0)
+        self.validas = ~self.es_joven | ((self.edades >= 18) & (self.edades < 25))
+        # Para traducir IDs a posiciones: con IDs densos (autoincrementales) una tabla
+        # indexada por ID; si no, búsqueda binaria sobre los IDs ordenados.
+        self._orden_ids = np.argsort(self.ids, kind='stable')
+        self._ids_ordenados = self.ids[self._orden_ids]
+        self._tabla_posiciones = None
+        if len(self.ids) and self._ids_ordenados[-1] - self._ids_ordenados[0] < 4 * len(self.ids):
+            self._id_minimo = int(self._ids_ordenados[0])
+            self._tabla_posiciones = np.full(int(self._ids_ordenados[-1]) - self._id_minimo + 1, -1, dtype=np.int64)
+            self._tabla_posiciones[self.ids - self._id_minimo] = np.arange(len(self.ids))
+
+    @classmethod
+    def desde_cuentas(cls, cuentas):
+        """Crea el libro a partir de un diccionario id -> Cuenta/CuentaJoven."""
+        ids, titulares, saldos, bonificaciones, edades = [], [], [], [], []
+        for id_cuenta, cuenta in cuentas.items():
+            ids.append(id_cuenta)
+            titulares.append(cuenta.titular)
+            saldos.append(cuenta.cantidad)
+            es_joven = isinstance(cuenta, CuentaJoven)
+            bonificaciones.append(cuenta.bonificacion if es_joven else None)
+            edades.append(cuenta.edad if es_joven else None)
+        return cls(ids, titulares, saldos, bonificaciones, edades)
+
+    @classmethod
+    def desde_filas(cls, filas):
+        """Crea el libro a partir de filas de CuentasAlmacenadas con columnas tipadas."""
+        filas = list(filas)
+        return cls(
+            [f['id'] for f in filas],
+            [f['titular'] for f in filas],
+            [f['cantidad'] for f in filas],
+            [f['bonificacion'] if f['tipo_cuenta'] == 'CuentaJoven' else None for f in filas],
+            [f['edad'] if f['tipo_cuenta'] == 'CuentaJoven' else None for f in filas],
+        )
+
+    def a_cuentas(self):
+        """Devuelve un diccionario id -> Cuenta/CuentaJoven con los saldos actuales."""
+        cuentas = {}
+        for i, id_cuenta in enumerate(self.ids.tolist()):
+            estado = {'titular': self.titulares[i], 'cantidad': float(self.saldos[i])}
+            if self.es_joven[i]:
+                estado['bonificacion'] = float(self.bonificaciones[i])
+                estado['edad'] = int(self.edades[i])
+                cuentas[id_cuenta] = CuentaJoven.from_state(estado)
+            else:
+                cuentas[id_cuenta] = Cuenta.from_state(estado)
+        return cuentas
+
+    def _posiciones(self, ids_cuenta):
+        """Posición de cada ID en las columnas, o -1 si no existe."""
+        if len(self.ids) == 0:
+            return np.full(len(ids_cuenta), -1, dtype=np.int64)
+        if self._tabla_posiciones is not None:
+            desplazados = ids_cuenta - self._id_minimo
+            dentro = (desplazados >= 0) & (desplazados < len(self._tabla_posiciones))
+            return np.where(dentro, self._tabla_posiciones[np.where(dentro, desplazados, 0)], -1)
+        indices = np.searchsorted(self._ids_ordenados, ids_cuenta)
+        indices = np.minimum(indices, len(self._ids_ordenados) - 1)
+        existe = self._ids_ordenados[indices] == ids_cuenta
+        return np.where(existe, self._orden_ids[indices], -1)
+
+    def aplicar_gastos(self, ids_cuenta, cantidades):
+        """
+        Aplica un lote de gastos (id de cuenta, cantidad) en el orden dado y actualiza los saldos.
+
+        Los gastos de las cuentas con saldo de sobra para todo su lote se aplican con
+        operaciones vectorizadas; solo las cuentas en las que algún gasto podría rechazarse
+        por saldo se recorren gasto a gasto, para respetar el orden.
+
+        Returns:
+            ResultadoLote con el resultado de cada gasto.
+        """
+        ids_cuenta = np.asarray(ids_cuenta, dtype=np.int64)
+        cantidades = np.asarray(cantidades, dtype=np.float64)
+        if ids_cuenta.shape != cantidades.shape:
+            raise ValueError("Debe haber una cantidad por cada ID de cuenta.")
+
+        posiciones = self._posiciones(ids_cuenta)
+        motivos = np.full(len(ids_cuenta), ACEPTADO, dtype=np.int8)
+        motivos[posiciones < 0] = CUENTA_INEXISTENTE
+        existentes = np.flatnonzero(posiciones >= 0)
+        motivos[existentes[~self.validas[posiciones[existentes]]]] = TITULAR_NO_VALIDO
+
+        aplicadas = np.zeros(len(ids_cuenta), dtype=np.float64)
+        candidatos = np.flatnonzero(motivos == ACEPTADO)
+        if len(candidatos) == 0:
+            return ResultadoLote(ids_cuenta, motivos, aplicadas)
+
+        # Agrupar los gastos por cuenta conservando su orden en el lote.
+        orden = candidatos[np.argsort(posiciones[candidatos], kind='stable')]
+        cuentas_orden = posiciones[orden]
+        importes = cantidades[orden] * self.factores[cuentas_orden]
+        inicios = np.flatnonzero(np.r_[True, cuentas_orden[1:] != cuentas_orden[:-1]])
+        cuentas_grupo = cuentas_orden[inicios]
+
+        # Gasto acumulado dentro de cada grupo.
+        acumulado = np.cumsum(importes)
+        base = np.repeat(np.r_[0.0, acumulado[inicios[1:] - 1]], np.diff(np.r_[inicios, len(orden)]))
+        acumulado -= base
+        saldo_inicial = self.saldos[cuentas_orden]
+        margen = _MARGEN_REDONDEO * np.maximum(1.0, np.abs(saldo_inicial))
+        cubierto = acumulado <= saldo_inicial - margen
+        grupo_cubierto = np.logical_and.reduceat(cubierto, inicios)
+
+        # Grupos cubiertos: todos sus gastos se aceptan.
+        fin_grupos = np.r_[inicios[1:], len(orden)]
+        en_grupo_cubierto = np.repeat(grupo_cubierto, fin_grupos - inicios)
+        aplicadas[orden[en_grupo_cubierto]] = importes[en_grupo_cubierto]
+        self.saldos[cuentas_grupo[grupo_cubierto]] -= np.add.reduceat(importes, inicios)[grupo_cubierto]
+
+        # El resto, gasto a gasto con la misma comparación que Cuenta.realizar_gasto.
+        for g in np.flatnonzero(~grupo_cubierto):
+            cuenta = cuentas_grupo[g]
+            saldo = float(self.saldos[cuenta])
+            for k in range(inicios[g], fin_grupos[g]):
+                importe = float(importes[k])
+                if saldo >= importe:
+                    saldo -= importe
+                    aplicadas[orden[k]] = importe
+                else:
+                    motivos[orden[k]] = SALDO_INSUFICIENTE
+            self.saldos[cuenta] = saldo
+
+        return ResultadoLote(ids_cuenta, motivos, aplicadas)
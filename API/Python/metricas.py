@@ -0,0 +1,123 @@
+# file: metricas.py
+# Métricas de la API en formato Prometheus (GET /metrics): latencia, número de peticiones
+# y códigos de estado por ruta, y consultas / tiempo de BD / espera de conexiones por petición.
+#
+# Con varios workers de Gunicorn cada proceso tiene sus propios contadores. Si se define
+# PROMETHEUS_MULTIPROC_DIR (antes de arrancar Gunicorn), cada worker los escribe en ese
+# directorio y /metrics los suma todos, responda el worker que responda (ver gunicorn.conf.py).
+import os
+import time
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter,
+                               Histogram, generate_latest, multiprocess)
+
+from db import registrar_observador_conexion, registrar_observador_consulta
+
+# Límites de los histogramas (en segundos, salvo el de consultas por petición).
+LIMITES_PETICION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_BD = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+RUTA_DESCONOCIDA = 'sin_ruta'  # Peticiones que no coinciden con ninguna ruta (404).
+
+peticiones_total = Counter(
+    'api_peticiones_total', 'Peticiones HTTP atendidas.', ['metodo', 'ruta', 'codigo'])
+duracion_peticion = Histogram(
+    'api_peticion_duracion_segundos', 'Tiempo de respuesta de las peticiones HTTP.',
+    ['metodo', 'ruta'], buckets=LIMITES_PETICION)
+
+consultas_total = Counter(
+    'api_bd_consultas_total', 'Llamadas a los helpers de db.py.', ['operacion', 'tabla'])
+consultas_error_total = Counter(
+    'api_bd_consultas_error_total', 'Llamadas a los helpers de db.py que lanzaron una excepción.',
+    ['operacion', 'tabla'])
+duracion_consulta = Histogram(
+    'api_bd_consulta_duracion_segundos', 'Duración de cada llamada a un helper de db.py.',
+    ['operacion', 'tabla'], buckets=LIMITES_BD)
+duracion_obtener_conexion = Histogram(
+    'api_bd_obtener_conexion_segundos', 'Tiempo para obtener una conexión del pool.',
+    buckets=LIMITES_BD)
+
+consultas_por_peticion = Histogram(
+    'api_bd_consultas_por_peticion', 'Llamadas a la BD hechas por cada petición HTTP.',
+    ['ruta'], buckets=LIMITES_CONSULTAS)
+tiempo_bd_por_peticion = Histogram(
+    'api_bd_tiempo_por_peticion_segundos', 'Tiempo total en la BD de cada petición HTTP.',
+    ['ruta'], buckets=LIMITES_PETICION)
+espera_conexion_por_peticion = Histogram(
+    'api_bd_espera_conexion_por_peticion_segundos',
+    'Tiempo total obteniendo conexiones del pool en cada petición HTTP.',
+    ['ruta'], buckets=LIMITES_PETICION)
+
+
+def _observar_consulta(operacion, nombre_tabla, segundos, error):
+    """Observador de consultas de db.py."""
+    consultas_total.labels(operacion, nombre_tabla).inc()
+    duracion_consulta.labels(operacion, nombre_tabla).observe(segundos)
+    if error:
+        consultas_error_total.labels(operacion, nombre_tabla).inc()
+    if has_request_context() and 'metricas_inicio' in g:
+        g.metricas_consultas += 1
+        g.metricas_tiempo_bd += segundos
+
+def _observar_conexion(segundos):
+    """Observador de préstamos de conexiones de db.py."""
+    duracion_obtener_conexion.observe(segundos)
+    if has_request_context() and 'metricas_inicio' in g:
+        g.metricas_espera_conexion += segundos
+
+
+def _iniciar_peticion():
+    g.metricas_inicio = time.perf_counter()
+    g.metricas_consultas = 0
+    g.metricas_tiempo_bd = 0.0
+    g.metricas_espera_conexion = 0.0
+
+def _terminar_peticion(respuesta):
+    """
+    Registra las métricas de la petición y añade la cabecera Server-Timing.
+    En las respuestas en streaming solo se mide hasta que empieza el envío.
+    """
+    if 'metricas_inicio' not in g:
+        return respuesta
+    duracion = time.perf_counter() - g.metricas_inicio
+    ruta = request.url_rule.rule if request.url_rule is not None else RUTA_DESCONOCIDA
+
+    peticiones_total.labels(request.method, ruta, str(respuesta.status_code)).inc()
+    duracion_peticion.labels(request.method, ruta).observe(duracion)
+    consultas_por_peticion.labels(ruta).observe(g.metricas_consultas)
+    tiempo_bd_por_peticion.labels(ruta).observe(g.metricas_tiempo_bd)
+    espera_conexion_por_peticion.labels(ruta).observe(g.metricas_espera_conexion)
+
+    # Visible en las herramientas de desarrollo del navegador (milisegundos).
+    respuesta.headers['Server-Timing'] = (
+        f"bd;desc=\"{g.metricas_consultas} consultas\";dur={g.metricas_tiempo_bd * 1000:.2f}, "
+        f"conexion;dur={g.metricas_espera_conexion * 1000:.2f}, "
+        f"total;dur={duracion * 1000:.2f}")
+    return respuesta
+
+
+def exponer_metricas():
+    """
+    Devuelve el texto en formato Prometheus con las métricas de todos los workers
+    (si PROMETHEUS_MULTIPROC_DIR está definido) o solo las de este proceso.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return Response(generate_latest(registro), mimetype=CONTENT_TYPE_LATEST)
+
+
+def instalar_metricas(aplicacion):
+    """
+    Activa las métricas en una aplicación Flask: mide cada petición, registra los
+    observadores de db.py y añade la ruta GET /metrics.
+    """
+    registrar_observador_consulta(_observar_consulta)
+    registrar_observador_conexion(_observar_conexion)
+    aplicacion.before_request(_iniciar_peticion)
+    aplicacion.after_request(_terminar_peticion)
+    aplicacion.add_url_rule('/metrics', 'metricas', exponer_metricas, methods=['GET'])
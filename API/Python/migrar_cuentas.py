@@ -0,0 +1,97 @@
+# file: migrar_cuentas.py
+# Convierte las filas antiguas de CuentasAlmacenadas (estado en el JSON de 'datos_objeto')
+# a las columnas tipadas de sql/002_columnas_cuentas.sql.
+# Se puede ejecutar con la API en marcha: trabaja por bloques pequeños, cada uno en su
+# propia transacción, y nunca pisa una fila que la API ya haya escrito en columnas.
+#
+# python migrar_cuentas.py --bloque 1000 --pausa 0.05
+import argparse
+import json
+import logging
+import time
+
+from db import obtener_pool, ErrorBaseDeDatos
+import mysql.connector
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def convertir_bloque(conexion, ultimo_id, tamano_bloque):
+    """
+    Convierte un bloque de filas con id > ultimo_id que aún no tienen columnas.
+
+    Returns:
+        Tupla (id de la última fila leída o None si no quedan, convertidas, corruptas).
+    """
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute(
+        "SELECT id, tipo_cuenta, datos_objeto FROM CuentasAlmacenadas "
+        "WHERE id > %s AND titular IS NULL ORDER BY id LIMIT %s",
+        (ultimo_id, tamano_bloque))
+    filas = cursor.fetchall()
+    if not filas:
+        return None, 0, 0
+
+    parametros = []
+    corruptas = 0
+    for fila in filas:
+        try:
+            atributos = json.loads(fila['datos_objeto'])
+            parametros.append((
+                atributos['titular'],
+                atributos['cantidad'],
+                atributos.get('bonificacion'),
+                atributos.get('edad'),
+                fila['id'],
+            ))
+        except (TypeError, KeyError, json.JSONDecodeError) as e:
+            # Se deja la fila como está para revisarla a mano.
+            corruptas += 1
+            logging.error("Fila id=%s con datos_objeto no convertible: %s", fila['id'], e)
+
+    if parametros:
+        # 'titular IS NULL' evita pisar filas que la API haya actualizado mientras tanto.
+        cursor.executemany(
+            "UPDATE CuentasAlmacenadas SET titular = %s, cantidad = %s, bonificacion = %s, edad = %s, "
+            "datos_objeto = NULL WHERE id = %s AND titular IS NULL",
+            parametros)
+    conexion.commit()
+    return filas[-1]['id'], len(parametros), corruptas
+
+
+def migrar(tamano_bloque=1000, pausa=0.05):
+    """
+    Recorre toda la tabla por bloques (paginando por id) y convierte las filas antiguas.
+    La pausa entre bloques deja sitio a las peticiones de la API.
+    """
+    pool = obtener_pool()
+    conexion = pool.obtener()
+    total_convertidas = 0
+    total_corruptas = 0
+    ultimo_id = 0
+    try:
+        while True:
+            ultimo_id, convertidas, corruptas = convertir_bloque(conexion, ultimo_id, tamano_bloque)
+            if ultimo_id is None:
+                break
+            total_convertidas += convertidas
+            total_corruptas += corruptas
+            logging.info("Convertidas %d filas (último id: %s).", total_convertidas, ultimo_id)
+            time.sleep(pausa)
+    except mysql.connector.Error as err:
+        conexion.rollback()
+        logging.error("Error durante la migración de cuentas: %s", err)
+        raise ErrorBaseDeDatos(f"Error durante la migración: {err}")
+    finally:
+        pool.devolver(conexion)
+
+    logging.info("Migración terminada: %d convertidas, %d no convertibles.", total_convertidas, total_corruptas)
+    return total_convertidas, total_corruptas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convierte el JSON de CuentasAlmacenadas a columnas tipadas.")
+    parser.add_argument('--bloque', type=int, default=1000, help="Filas por bloque/transacción.")
+    parser.add_argument('--pausa', type=float, default=0.05, help="Segundos de pausa entre bloques.")
+    argumentos = parser.parse_args()
+    migrar(argumentos.bloque, argumentos.pausa)
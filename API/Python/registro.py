@@ -0,0 +1,96 @@
+# file: registro.py
+# Configuración del registro (logging) de las APIs.
+#
+# Los mensajes se formatean y se escriben en un hilo en segundo plano: el hilo de la
+# petición solo crea el registro y lo deja en una cola, así la E/S de los logs no se
+# suma a la latencia de las peticiones. Variables de entorno:
+#   LOG_NIVEL      DEBUG, INFO (por defecto), WARNING, ERROR.
+#   LOG_FORMATO    'texto' (por defecto) o 'json' (una línea JSON por registro).
+#   LOG_ASINCRONO  '1' (por defecto) usa la cola; '0' escribe directamente.
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+FORMATO_TEXTO = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class FormateadorJSON(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una sola línea."""
+    def format(self, record):
+        entrada = {
+            'fecha': self.formatTime(record),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'proceso': record.process,
+            'hilo': record.threadName,
+        }
+        if record.exc_info:
+            entrada['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+
+class ManejadorCola(QueueHandler):
+    """
+    QueueHandler que no formatea el mensaje antes de encolarlo (el de la librería
+    estándar sí lo hace, en el hilo que registra). El formateo lo hace el hilo de escucha.
+    """
+    def prepare(self, record):
+        return record
+
+
+_manejador_cola = None
+_escucha = None
+
+def _arrancar_escucha(manejador_salida):
+    global _escucha
+    _manejador_cola.queue = queue.SimpleQueue()
+    _escucha = QueueListener(_manejador_cola.queue, manejador_salida, respect_handler_level=True)
+    _escucha.start()
+
+def _reiniciar_escucha_tras_fork():
+    # El hilo de escucha no sobrevive al fork (p. ej. Gunicorn con --preload).
+    if _escucha is not None:
+        _arrancar_escucha(_escucha.handlers[0])
+
+def detener_registro():
+    """Detiene el hilo de escucha tras escribir los registros pendientes."""
+    global _escucha
+    if _escucha is not None:
+        _escucha.stop()
+        _escucha = None
+
+def configurar_registro(nivel=None, formato=None, asincrono=None):
+    """
+    Configura el logger raíz. Los argumentos que no se indican se leen del entorno
+    (LOG_NIVEL, LOG_FORMATO, LOG_ASINCRONO). Se puede llamar más de una vez.
+    """
+    global _manejador_cola
+    nivel = nivel or os.environ.get("LOG_NIVEL", "INFO")
+    formato = formato or os.environ.get("LOG_FORMATO", "texto")
+    if asincrono is None:
+        asincrono = os.environ.get("LOG_ASINCRONO", "1") == "1"
+
+    manejador_salida = logging.StreamHandler(sys.stderr)
+    if formato == 'json':
+        manejador_salida.setFormatter(FormateadorJSON())
+    else:
+        manejador_salida.setFormatter(logging.Formatter(FORMATO_TEXTO))
+
+    detener_registro()
+    if asincrono:
+        if _manejador_cola is None:
+            _manejador_cola = ManejadorCola(queue.SimpleQueue())
+            atexit.register(detener_registro)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=_reiniciar_escucha_tras_fork)
+        _arrancar_escucha(manejador_salida)
+        manejador = _manejador_cola
+    else:
+        manejador = manejador_salida
+
+    logging.basicConfig(level=nivel.upper(), handlers=[manejador], force=True)
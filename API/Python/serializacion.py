@@ -0,0 +1,142 @@
+# file: serializacion.py
+# Capa de serialización JSON de la API: cuerpos HTTP (request.get_json / jsonify, a través
+# de ProveedorJSON), exportación NDJSON y el estado JSON antiguo de las cuentas (datos_objeto).
+#
+# Usa orjson si está instalado (varias veces más rápido que el módulo json) y el módulo json
+# de la librería estándar si no. SERIALIZADOR=json fuerza la librería estándar.
+import datetime
+import decimal
+import json
+import os
+import re
+import uuid
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError hereda de json.JSONDecodeError: se captura igual con cualquier motor.
+ErrorJSON = json.JSONDecodeError
+
+
+def _por_defecto(obj):
+    """Tipos que ninguno de los dos motores sabe serializar por sí mismo."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime.date, uuid.UUID)):
+        return str(obj)
+    raise TypeError(f"El objeto de tipo {type(obj).__name__} no es serializable a JSON")
+
+
+# Lo que json.dumps(ensure_ascii=True) escapa y orjson no: todo lo que no es ASCII imprimible
+# (los caracteres de control ya los escapan los dos igual).
+_NO_ASCII = re.compile(r'[^\x00-\x7e]')
+
+
+def _escapar(coincidencia):
+    """Escape \\uXXXX de un carácter, con pares sustitutos fuera del plano básico (como json)."""
+    codigo = ord(coincidencia.group())
+    if codigo < 0x10000:
+        return f'\\u{codigo:04x}'
+    codigo -= 0x10000
+    return f'\\u{0xd800 | (codigo >> 10):04x}\\u{0xdc00 | (codigo & 0x3ff):04x}'
+
+
+class Serializador:
+    """
+    Codifica y decodifica JSON con el motor indicado.
+
+    Args:
+        motor: 'orjson', 'json' o 'auto' (orjson si está instalado).
+    """
+    def __init__(self, motor='auto'):
+        if motor == 'auto':
+            motor = 'orjson' if orjson is not None else 'json'
+        if motor == 'orjson' and orjson is None:
+            raise ValueError("El motor 'orjson' no está instalado.")
+        if motor not in ('orjson', 'json'):
+            raise ValueError(f"Motor de serialización no soportado: {motor}")
+        self.motor = motor
+
+    def a_bytes(self, obj, ordenar_claves=False, solo_ascii=False, por_defecto=None):
+        """
+        Serializa `obj` a JSON compacto en UTF-8.
+
+        Args:
+            ordenar_claves: Como sort_keys de json.dumps.
+            solo_ascii: Como ensure_ascii de json.dumps (escapa lo que no es ASCII).
+            por_defecto: Función para los tipos no serializables, en lugar de _por_defecto.
+                Con ella orjson tampoco serializa por sí mismo fechas ni dataclasses.
+        """
+        if self.motor == 'orjson':
+            opciones = orjson.OPT_NON_STR_KEYS
+            if ordenar_claves:
+                opciones |= orjson.OPT_SORT_KEYS
+            if por_defecto is not None:
+                opciones |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            datos = orjson.dumps(obj, default=por_defecto or _por_defecto, option=opciones)
+            if solo_ascii and not datos.isascii():
+                datos = _NO_ASCII.sub(_escapar, datos.decode('utf-8')).encode('ascii')
+            return datos
+        return json.dumps(obj, default=por_defecto or _por_defecto, ensure_ascii=solo_ascii,
+                          sort_keys=ordenar_claves, separators=(',', ':')).encode('utf-8')
+
+    def a_texto(self, obj):
+        """Serializa `obj` a una cadena JSON compacta."""
+        if self.motor == 'orjson':
+            return self.a_bytes(obj).decode('utf-8')
+        return json.dumps(obj, default=_por_defecto, ensure_ascii=False, separators=(',', ':'))
+
+    def desde_json(self, datos):
+        """Deserializa JSON de una cadena o de bytes. Lanza ErrorJSON si no es válido."""
+        if self.motor == 'orjson':
+            return orjson.loads(datos)
+        return json.loads(datos)
+
+
+serializador = Serializador(os.environ.get("SERIALIZADOR", "auto"))
+
+def usar_motor(motor):
+    """Cambia el motor de todo el proceso (lo usan los benchmarks para comparar)."""
+    global serializador
+    serializador = Serializador(motor)
+
+def a_bytes(obj):
+    return serializador.a_bytes(obj)
+
+def a_texto(obj):
+    return serializador.a_texto(obj)
+
+def desde_json(datos):
+    return serializador.desde_json(datos)
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask que usa `serializador` para request.get_json() y jsonify().
+
+    Las respuestas tienen los mismos bytes que las de DefaultJSONProvider: respeta sort_keys,
+    ensure_ascii y default, y con compact=False (o en modo debug) delega en él. Con orjson solo
+    cambian los float con exponente (1e20 en lugar de 1e+20), NaN/Infinity, que salen como null,
+    y el orden de las claves que no son str (se ordenan como texto).
+    """
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return serializador.desde_json(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and current_app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        # Mismos argumentos que JSONProvider.response: un valor, varios (lista) o claves (dict).
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+        datos = serializador.a_bytes(obj, ordenar_claves=self.sort_keys, solo_ascii=self.ensure_ascii,
+                                     por_defecto=self.default)
+        # Directamente a bytes, sin pasar por str.
+        return current_app.response_class(datos + b'\n', mimetype=self.mimetype)
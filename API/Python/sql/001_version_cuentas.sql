@@ -0,0 +1,7 @@
+-- file: sql/001_version_cuentas.sql
+-- Añade la columna de versión a CuentasAlmacenadas para el bloqueo optimista.
+-- Cada actualización hecha con actualizar_elemento_atomico (db.py) la incrementa en 1.
+-- Ejecutar: mariadb -u root -p Banco < sql/001_version_cuentas.sql
+
+ALTER TABLE CuentasAlmacenadas
+    ADD COLUMN IF NOT EXISTS version INT UNSIGNED NOT NULL DEFAULT 0;
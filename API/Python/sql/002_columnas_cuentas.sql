@@ -0,0 +1,28 @@
+-- file: sql/002_columnas_cuentas.sql
+-- Guarda el estado de las cuentas en columnas tipadas en lugar del JSON de 'datos_objeto',
+-- para poder indexar, sumar y filtrar saldos en SQL.
+-- Ejecutar: mariadb -u root -p Banco < sql/002_columnas_cuentas.sql
+--
+-- Pasos:
+--   1. Ejecutar este script (las columnas nuevas admiten NULL, la API sigue funcionando).
+--   2. Desplegar la API que lee/escribe las columnas (lee el JSON si 'titular' es NULL).
+--   3. Convertir las filas antiguas por bloques con: python migrar_cuentas.py
+--   4. Cuando no queden filas con titular NULL, ejecutar el bloque final (comentado abajo).
+--
+-- Los saldos se guardan como DOUBLE: son los mismos float que usan las clases Cuenta/CuentaJoven
+-- y que había en el JSON, así que la conversión no redondea nada.
+
+ALTER TABLE CuentasAlmacenadas
+    ADD COLUMN IF NOT EXISTS titular VARCHAR(255) NULL,
+    ADD COLUMN IF NOT EXISTS cantidad DOUBLE NULL,
+    ADD COLUMN IF NOT EXISTS bonificacion DOUBLE NULL,  -- Solo CuentaJoven.
+    ADD COLUMN IF NOT EXISTS edad SMALLINT UNSIGNED NULL,  -- Solo CuentaJoven.
+    MODIFY COLUMN datos_objeto TEXT NULL;  -- Las filas nuevas ya no lo rellenan.
+
+CREATE INDEX IF NOT EXISTS idx_cuentas_cantidad ON CuentasAlmacenadas (cantidad);
+
+-- Paso 4 (cuando migrar_cuentas.py haya terminado; la API solo lee 'datos_objeto' si titular es NULL):
+-- ALTER TABLE CuentasAlmacenadas
+--     MODIFY COLUMN titular VARCHAR(255) NOT NULL,
+--     MODIFY COLUMN cantidad DOUBLE NOT NULL,
+--     DROP COLUMN datos_objeto;
@@ -0,0 +1,6 @@
+-- file: sql/003_indice_titular.sql
+-- Índice para GET /cuentas?orden=titular: la paginación por clave recorre (titular, id)
+-- directamente en el índice (InnoDB añade la clave primaria a los índices secundarios).
+-- Ejecutar: mariadb -u root -p Banco < sql/003_indice_titular.sql
+
+CREATE INDEX IF NOT EXISTS idx_cuentas_titular ON CuentasAlmacenadas (titular);
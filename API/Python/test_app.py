@@ -0,0 +1,149 @@
+# file: test_app.py
+# Endpoints de app.py con el cliente de pruebas de Flask, contra el sustituto SQLite de
+# benchmarks/sqlite_bd.py.
+#
+#   python -m pytest test_app.py
+import json
+
+import pytest
+
+import app
+import db
+
+
+@pytest.fixture
+def cliente(bd_sqlite):
+    app.cache_cuentas.vaciar()  # Cada test tiene una BD nueva con los mismos IDs.
+    return app.aplicacion.test_client()
+
+
+def test_lote_con_json_no_valido(cliente):
+    respuesta = cliente.post('/cuentas/lote', data='[{"titular": ', content_type='application/json')
+    assert respuesta.status_code == 400
+    assert respuesta.get_json() == {'error': 'JSON de entrada inválido'}
+
+
+def test_lote_con_error_de_bd_no_crea_ninguna_cuenta(cliente, monkeypatch):
+    lote = [{'titular': f"t{i}", 'cantidad': 1} for i in range(5)]
+    lote[4]['tipo_cuenta'] = 'CuentaJoven'
+    lote[4].update(bonificacion=5, edad=20)
+    insertar = db.insertar_elementos
+
+    def insertar_con_fallo(nombre_tabla, lista_datos):
+        lista_datos[-1]['tipo_cuenta'] = None  # NOT NULL en el último bloque.
+        return insertar(nombre_tabla, lista_datos, tamano_bloque=2)
+    monkeypatch.setattr(app, 'insertar_elementos', insertar_con_fallo)
+
+    respuesta = cliente.post('/cuentas/lote', json=lote)
+    assert respuesta.status_code == 500
+    assert db.obtener_todos_los_elementos('CuentasAlmacenadas') == []
+
+
+def test_lote_mezclado(cliente):
+    lote = [{'titular': 'Ana', 'cantidad': 5}, {'titular': ''}, {'titular': 'Luis', 'bonificacion': 5, 'edad': 20}]
+    respuesta = cliente.post('/cuentas/lote', json=lote)
+    assert respuesta.status_code == 207
+    resultados = respuesta.get_json()['resultados']
+    assert 'error' in resultados[1]
+    for resultado in (resultados[0], resultados[2]):
+        cuenta = cliente.get(f"/cuentas/{resultado['id']}/verificar").get_json()
+        assert cuenta['titular'] == lote[resultado['indice']]['titular']
+
+
+def test_verificar_con_json_no_valido(cliente):
+    respuesta = cliente.post('/cuentas/verificar', data='[1, 2', content_type='application/json')
+    assert respuesta.status_code == 400
+    assert respuesta.get_json() == {'error': 'JSON de entrada inválido'}
+
+
+def test_verificar_lote(cliente):
+    ids = cliente.post('/cuentas/lote', json=[{'titular': 'Ana'}, {'titular': 'Luis'}]).get_json()['resultados']
+    ids = [r['id'] for r in ids]
+    respuesta = cliente.post('/cuentas/verificar', json=[ids[1], 999, ids[0], ids[1]])
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert [c.get('titular') for c in datos['cuentas']] == ['Luis', None, 'Ana', 'Luis']
+    assert datos['encontradas'] == 3 and datos['no_encontradas'] == 1
+
+
+def test_gasto_invalida_la_cuenta_en_la_cache(cliente):
+    cuenta_id = cliente.post('/cuentas/lote', json=[{'titular': 'Ana', 'cantidad': 10}]).get_json()['resultados'][0]['id']
+    assert cliente.get(f'/cuentas/{cuenta_id}/verificar').get_json()['saldo_actual'] == 10
+    assert cliente.post(f'/cuentas/{cuenta_id}/gasto', json={'cantidad': 4}).status_code == 200
+    assert cliente.get(f'/cuentas/{cuenta_id}/verificar').get_json()['saldo_actual'] == 6
+
+
+def test_gasto_con_version_antigua_devuelve_409(cliente):
+    cuenta_id = cliente.post('/cuentas/lote', json=[{'titular': 'Ana', 'cantidad': 10}]).get_json()['resultados'][0]['id']
+    respuesta = cliente.post(f'/cuentas/{cuenta_id}/gasto', json={'cantidad': 4, 'version': 0})
+    assert respuesta.status_code == 200 and respuesta.get_json()['version'] == 1
+    respuesta = cliente.post(f'/cuentas/{cuenta_id}/gasto', json={'cantidad': 1, 'version': 0})
+    assert respuesta.status_code == 409
+    assert cliente.get(f'/cuentas/{cuenta_id}/verificar?consistente=1').get_json()['saldo_actual'] == 6
+
+
+def test_consistente_no_usa_la_cache(cliente, monkeypatch):
+    cuenta_id = cliente.post('/cuentas/lote', json=[{'titular': 'Ana', 'cantidad': 10}]).get_json()['resultados'][0]['id']
+    assert cliente.get(f'/cuentas/{cuenta_id}/verificar').get_json()['saldo_actual'] == 10
+    # Un gasto atendido por otro worker: la invalidación no llega a esta caché.
+    monkeypatch.setattr(db, '_observadores_escritura', [])
+    assert cliente.post(f'/cuentas/{cuenta_id}/gasto', json={'cantidad': 4}).status_code == 200
+
+    assert cliente.get(f'/cuentas/{cuenta_id}/verificar').get_json()['saldo_actual'] == 10
+    assert cliente.get(f'/cuentas/{cuenta_id}/verificar?consistente=1').get_json()['saldo_actual'] == 6
+    lote = cliente.post('/cuentas/verificar?consistente=1', json=[cuenta_id]).get_json()
+    assert lote['cuentas'][0]['saldo_actual'] == 6
+
+
+@pytest.mark.parametrize('parametros', ['limite=abc', 'limite=0', 'limite=501', 'limite=2.5',
+                                        'orden=datos_objeto', 'token=no-es-un-token'])
+def test_listar_con_parametros_no_validos(cliente, parametros):
+    assert cliente.get(f'/cuentas?{parametros}').status_code == 400
+
+
+def test_listar_por_saldo_incluye_las_filas_antiguas(cliente):
+    cliente.post('/cuentas/lote', json=[{'titular': f"t{i}", 'cantidad': i % 2} for i in range(5)])
+    antigua = db.insertar_elemento('CuentasAlmacenadas', {
+        'tipo_cuenta': 'Cuenta', 'datos_objeto': '{"titular": "antigua", "cantidad": 7.0}'})
+    for desc in ('0', '1'):
+        vistos = []
+        url = f'/cuentas?orden=cantidad&limite=2&desc={desc}'
+        while url:
+            datos = cliente.get(url).get_json()
+            vistos.extend(c['id_db'] for c in datos['cuentas'])
+            url = datos['siguiente'] and f"/cuentas?orden=cantidad&limite=2&desc={desc}&token={datos['siguiente']}"
+        assert sorted(vistos) == list(range(1, 7))
+        assert vistos[0 if desc == '0' else -1] == antigua
+
+
+def test_filas_antiguas_se_leen_de_datos_objeto(cliente, monkeypatch):
+    nueva = cliente.post('/cuentas/lote', json=[{'titular': 'Ana', 'cantidad': 3}]).get_json()['resultados'][0]['id']
+    antigua = db.insertar_elemento('CuentasAlmacenadas', {
+        'tipo_cuenta': 'Cuenta', 'datos_objeto': '{"titular": "antigua", "cantidad": 7.0}'})
+    lecturas = []
+    obtener = app.obtener_todos_los_elementos
+
+    def obtener_registrando(nombre_tabla, **kwargs):
+        lecturas.append(kwargs.get('columnas'))
+        return obtener(nombre_tabla, **kwargs)
+    monkeypatch.setattr(app, 'obtener_todos_los_elementos', obtener_registrando)
+
+    assert cliente.get(f'/cuentas/{nueva}/verificar').get_json()['titular'] == 'Ana'
+    assert lecturas == [app.COLUMNAS_CUENTA]
+    assert cliente.get(f'/cuentas/{antigua}/verificar').get_json()['titular'] == 'antigua'
+    assert lecturas[1:] == [app.COLUMNAS_CUENTA, app.COLUMNAS_CUENTA_ANTIGUA]
+
+    app.cache_cuentas.vaciar()
+    lote = cliente.post('/cuentas/verificar', json=[antigua, nueva]).get_json()
+    assert [c['saldo_actual'] for c in lote['cuentas']] == [7.0, 3.0]
+    exportadas = cliente.get('/cuentas/exportar').get_data(as_text=True).splitlines()
+    assert [json.loads(linea)['titular'] for linea in exportadas] == ['Ana', 'antigua']
+
+
+def test_gasto_en_fila_antigua_la_convierte(cliente):
+    antigua = db.insertar_elemento('CuentasAlmacenadas', {
+        'tipo_cuenta': 'Cuenta', 'datos_objeto': '{"titular": "antigua", "cantidad": 7.0}'})
+    respuesta = cliente.post(f'/cuentas/{antigua}/gasto', json={'cantidad': 2})
+    assert respuesta.status_code == 200 and respuesta.get_json()['nuevo_saldo'] == 5.0
+    fila = db.obtener_todos_los_elementos('CuentasAlmacenadas', filtro={'id': antigua})[0]
+    assert fila['titular'] == 'antigua' and fila['cantidad'] == 5.0 and fila['datos_objeto'] is None
@@ -0,0 +1,294 @@
+# file: test_bd.py
+# Helpers de db.py contra el sustituto SQLite de benchmarks/sqlite_bd.py (sin servidor MariaDB).
+#
+#   python -m pytest test_bd.py
+import threading
+
+import mysql.connector
+import pytest
+
+import db
+from benchmarks import sqlite_bd
+
+
+def fila(titular, cantidad=10.0, tipo_cuenta='Cuenta'):
+    return {'tipo_cuenta': tipo_cuenta, 'titular': titular, 'cantidad': cantidad,
+            'bonificacion': None, 'edad': None}
+
+
+def test_insertar_elementos_devuelve_los_ids_en_orden(bd_sqlite):
+    ids = db.insertar_elementos('CuentasAlmacenadas', [fila(f"t{i}") for i in range(7)], tamano_bloque=3)
+    filas = db.obtener_todos_los_elementos('CuentasAlmacenadas', orden=[('id', 'ASC')])
+    assert ids == [f['id'] for f in filas]
+    assert [f['titular'] for f in filas] == [f"t{i}" for i in range(7)]
+
+
+def test_insertar_elementos_es_todo_o_nada(bd_sqlite):
+    lote = [fila(f"t{i}") for i in range(6)]
+    lote[5]['tipo_cuenta'] = None  # NOT NULL: falla el tercer bloque.
+    with pytest.raises(db.ErrorBaseDeDatos):
+        db.insertar_elementos('CuentasAlmacenadas', lote, tamano_bloque=2)
+    assert db.obtener_todos_los_elementos('CuentasAlmacenadas') == []
+
+
+def test_insertar_elementos_fila_a_fila_con_modo_intercalado(bd_sqlite, monkeypatch):
+    # innodb_autoinc_lock_mode=2 y un incremento que no cuadra con los IDs reales: si se
+    # dedujeran los IDs de un INSERT múltiple saldrían mal.
+    traducir = sqlite_bd._traducir_sql
+    monkeypatch.setattr(sqlite_bd, '_traducir_sql',
+                        lambda sql: "SELECT 2, 2" if sql == db._SQL_AUTOINCREMENTO else traducir(sql))
+    ids = db.insertar_elementos('CuentasAlmacenadas', [fila(f"t{i}") for i in range(5)])
+    filas = db.obtener_todos_los_elementos('CuentasAlmacenadas', orden=[('id', 'ASC')])
+    assert ids == [f['id'] for f in filas]
+
+
+def crear_cuentas_con_nulos():
+    """Cuentas con saldos y titulares repetidos, y filas antiguas con ambos a NULL."""
+    filas = [fila(f"t{i % 4}", float(i % 3)) for i in range(12)]
+    for i in (0, 5, 6, 11):
+        filas[i].update(titular=None, cantidad=None, datos_objeto='{"titular": "antigua", "cantidad": 1.0}')
+    for datos in filas:
+        datos.setdefault('datos_objeto', None)
+    db.insertar_elementos('CuentasAlmacenadas', filas)
+    return db.obtener_todos_los_elementos('CuentasAlmacenadas')
+
+
+def recorrer_paginas(columna_orden, descendente, limite=5):
+    ids = []
+    token = None
+    while True:
+        filas, token = db.obtener_pagina('CuentasAlmacenadas', columna_orden=columna_orden, limite=limite,
+                                         token=token, descendente=descendente, columnas=('id',))
+        ids.extend(f['id'] for f in filas)
+        if token is None:
+            return ids
+
+
+@pytest.mark.parametrize('columna_orden', ['id', 'cantidad', 'titular'])
+@pytest.mark.parametrize('descendente', [False, True])
+def test_paginacion_por_clave_con_nulos(bd_sqlite, columna_orden, descendente):
+    filas = crear_cuentas_con_nulos()
+
+    def clave(f):
+        # NULL antes que cualquier valor, como en el ORDER BY de MariaDB (y de SQLite).
+        valor = f[columna_orden]
+        return (valor is not None, valor if valor is not None else 0, f['id'])
+    esperado = [f['id'] for f in sorted(filas, key=clave)]
+    if descendente:
+        esperado.reverse()
+    for limite in (1, 3, 5, 50):
+        assert recorrer_paginas(columna_orden, descendente, limite) == esperado
+
+
+def test_token_de_paginacion(bd_sqlite):
+    crear_cuentas_con_nulos()
+    _, token = db.obtener_pagina('CuentasAlmacenadas', columna_orden='cantidad', limite=2)
+    # El token vale para la misma consulta...
+    filas, _ = db.obtener_pagina('CuentasAlmacenadas', columna_orden='cantidad', limite=2, token=token)
+    assert len(filas) == 2
+    # ...pero no para otra ni si está corrupto.
+    for columna_orden, descendente, token_malo in (('titular', False, token), ('cantidad', True, token),
+                                                  ('cantidad', False, 'no-es-un-token'),
+                                                  ('cantidad', False, token[:-3])):
+        with pytest.raises(ValueError):
+            db.obtener_pagina('CuentasAlmacenadas', columna_orden=columna_orden, limite=2,
+                              token=token_malo, descendente=descendente)
+
+
+def test_columnas_limitan_el_select(bd_sqlite):
+    id_ana = db.insertar_elemento('CuentasAlmacenadas', fila('Ana', 5.0))
+    assert db.obtener_todos_los_elementos('CuentasAlmacenadas', columnas=('id', 'titular')) == [
+        {'id': id_ana, 'titular': 'Ana'}]
+    assert set(db.obtener_todos_los_elementos('CuentasAlmacenadas')[0]) >= {'datos_objeto', 'version'}
+    # La paginación por clave añade las columnas del orden que necesita el token.
+    filas, _ = db.obtener_pagina('CuentasAlmacenadas', columna_orden='cantidad', limite=5, columnas=('titular',))
+    assert filas == [{'titular': 'Ana', 'cantidad': 5.0, 'id': id_ana}]
+
+
+def test_existe_elemento(bd_sqlite):
+    ids = db.insertar_elementos('CuentasAlmacenadas', [fila('Ana'), fila('Luis', tipo_cuenta='CuentaJoven')])
+    assert db.existe_elemento('CuentasAlmacenadas', {'id': ids[0]})
+    assert not db.existe_elemento('CuentasAlmacenadas', {'id': ids[0], 'tipo_cuenta': 'CuentaJoven'})
+    assert db.existe_elemento('CuentasAlmacenadas', {'id': [999, ids[1]]})
+    assert not db.existe_elemento('CuentasAlmacenadas', {'id': [998, 999]})
+    assert not db.existe_elemento('CuentasAlmacenadas', {'id': []})
+
+
+class ConexionFalsa:
+    """Conexión mínima para PoolConexiones (sin BD)."""
+    def __init__(self, fallo_rollback=False, conectada=True):
+        self.in_transaction = False
+        self.fallo_rollback = fallo_rollback
+        self.conectada = conectada
+        self.cerrada = False
+
+    def rollback(self):
+        if self.fallo_rollback:
+            raise mysql.connector.errors.OperationalError(msg="Lost connection")
+        self.in_transaction = False
+
+    def is_connected(self):
+        return self.conectada
+
+    def close(self):
+        self.cerrada = True
+
+
+def test_pool_agotado_espera_y_agota_el_tiempo():
+    pool = db.PoolConexiones(tamano=2, timeout=0.05, fabrica=ConexionFalsa)
+    primera, segunda = pool.obtener(), pool.obtener()
+    with pytest.raises(db.ErrorBaseDeDatos, match="Tiempo de espera agotado"):
+        pool.obtener()
+
+    # Una conexión devuelta mientras se espera pasa al que espera.
+    pool.timeout = 5
+    threading.Timer(0.05, pool.devolver, (segunda,)).start()
+    assert pool.obtener() is segunda
+    estadisticas = pool.estadisticas()
+    assert estadisticas['abiertas'] == 2 and estadisticas['en_uso'] == 2
+    assert estadisticas['timeouts'] == 1 and estadisticas['esperas'] == 1
+    pool.devolver(primera)
+    pool.cerrar()
+    assert primera.cerrada
+
+
+def test_pool_descarta_las_conexiones_rotas():
+    pool = db.PoolConexiones(tamano=1, timeout=0.05, intervalo_verificacion=0, fabrica=ConexionFalsa)
+    rota = pool.obtener()
+    rota.in_transaction, rota.fallo_rollback = True, True
+    pool.devolver(rota)  # No se puede deshacer: se cierra y deja su hueco.
+    assert rota.cerrada
+    ociosa = pool.obtener()
+    assert ociosa is not rota
+    ociosa.conectada = False
+    pool.devolver(ociosa)
+    assert pool.obtener() is not ociosa  # Verificada al sacarla (ping) y reemplazada.
+    assert ociosa.cerrada
+    assert pool.estadisticas()['descartadas'] == 2
+
+
+def test_conexion_devuelta_a_mitad_de_transaccion_se_deshace(bd_sqlite):
+    conexion = db._pool.obtener()
+    conexion.start_transaction()
+    conexion.cursor().execute("INSERT INTO CuentasAlmacenadas (tipo_cuenta, titular) VALUES (%s, %s)",
+                              ('Cuenta', 'Ana'))
+    db._pool.devolver(conexion)
+    # La conexión vuelve al pool sin la transacción: quien la saque no confirma el INSERT.
+    assert db._pool.obtener() is conexion
+    assert not conexion.in_transaction
+    conexion.commit()
+    db._pool.devolver(conexion)
+    assert db.obtener_todos_los_elementos('CuentasAlmacenadas') == []
+    assert db._pool.estadisticas()['descartadas'] == 0
+
+
+def test_actualizacion_atomica_comprueba_la_version(bd_sqlite):
+    id_ana = db.insertar_elemento('CuentasAlmacenadas', fila('Ana', 10.0))
+    fila_nueva = db.actualizar_elemento_atomico(
+        'CuentasAlmacenadas', 'id', id_ana, lambda f: {'cantidad': f['cantidad'] - 4}, version_esperada=0,
+        columnas=('cantidad',))
+    assert fila_nueva == {'cantidad': 6.0, 'id': id_ana, 'version': 1}
+
+    llamadas = []
+    with pytest.raises(db.ErrorConflictoVersion, match="versión 1, se esperaba la 0"):
+        db.actualizar_elemento_atomico('CuentasAlmacenadas', 'id', id_ana, llamadas.append, version_esperada=0)
+    assert llamadas == []  # No se llega a aplicar el cambio.
+    assert db.actualizar_elemento_atomico('CuentasAlmacenadas', 'id', 999, llamadas.append) is None
+
+    def falla(f):
+        raise RuntimeError("regla de negocio")
+    with pytest.raises(RuntimeError):
+        db.actualizar_elemento_atomico('CuentasAlmacenadas', 'id', id_ana, falla)
+    guardada = db.obtener_todos_los_elementos('CuentasAlmacenadas', filtro={'id': id_ana})[0]
+    assert guardada['cantidad'] == 6.0 and guardada['version'] == 1
+    assert db._pool.estadisticas()['en_uso'] == 0
+
+
+def contadores_sentencias():
+    estadisticas = db.estadisticas_sql()['sentencias_preparadas']
+    return estadisticas['aciertos'], estadisticas['fallos'], estadisticas['expulsiones']
+
+
+def test_cursores_preparados_se_reutilizan_por_conexion(bd_sqlite, monkeypatch):
+    monkeypatch.setattr(db, 'USAR_SENTENCIAS_PREPARADAS', True)
+    monkeypatch.setattr(db, 'TAMANO_CACHE_SENTENCIAS', 2)
+    aciertos, fallos, expulsiones = contadores_sentencias()
+    # Llamadas seguidas desde un hilo: el pool entrega siempre la misma conexión (la última devuelta).
+    id_ana = db.insertar_elemento('CuentasAlmacenadas', fila('Ana'))
+    for _ in range(3):
+        assert db.obtener_todos_los_elementos('CuentasAlmacenadas', filtro={'id': id_ana})[0]['titular'] == 'Ana'
+    assert contadores_sentencias() == (aciertos + 2, fallos + 2, expulsiones)
+    conexion = db._pool.obtener()
+    db._pool.devolver(conexion)
+    insert, select_id = conexion._cursores_preparados.values()
+
+    # Con dos SQL más, la caché (2 por conexión) expulsa los menos usados.
+    db.existe_elemento('CuentasAlmacenadas', {'id': id_ana})
+    db.obtener_todos_los_elementos('CuentasAlmacenadas', filtro={'titular': 'Ana'})
+    assert contadores_sentencias() == (aciertos + 2, fallos + 4, expulsiones + 2)
+    restantes = list(conexion._cursores_preparados.values())
+    assert len(restantes) == 2 and insert not in restantes and select_id not in restantes
+
+
+def test_sin_sentencias_preparadas_no_se_guardan_cursores(bd_sqlite, monkeypatch):
+    monkeypatch.setattr(db, 'USAR_SENTENCIAS_PREPARADAS', False)
+    db.insertar_elemento('CuentasAlmacenadas', fila('Ana'))
+    antes = contadores_sentencias()
+    db.obtener_todos_los_elementos('CuentasAlmacenadas', filtro={'titular': 'Ana'})
+    assert contadores_sentencias() == antes
+    conexion = db._pool.obtener()
+    assert not getattr(conexion, '_cursores_preparados', None)
+    db._pool.devolver(conexion)
+
+
+@pytest.mark.parametrize('valores, forma, rellenos', [
+    ([7], ('id', 1), [7]),
+    ([1, 2], ('id', 2), [1, 2]),
+    ([1, 2, 3], ('id', 4), [1, 2, 3, 3]),
+    ((5, 6, 7, 8, 9), ('id', 8), [5, 6, 7, 8, 9, 9, 9, 9]),
+])
+def test_filtro_in_se_rellena_hasta_potencia_de_2(valores, forma, rellenos):
+    assert db._preparar_filtro({'tipo_cuenta': 'Cuenta', 'id': valores}) == (('tipo_cuenta', forma),
+                                                                            ['Cuenta'] + rellenos)
+
+
+def test_filtro_in_con_lista_vacia():
+    assert db._preparar_filtro({'id': []}) == (None, [])
+
+
+def test_filtro_in_rellenado_da_las_mismas_filas(bd_sqlite):
+    ids = db.insertar_elementos('CuentasAlmacenadas', [fila(f"t{i}") for i in range(9)])
+    for n in range(1, 10):
+        buscados = ids[:n - 1] + [999] if n > 1 else [999]
+        filas = db.obtener_todos_los_elementos('CuentasAlmacenadas', filtro={'id': buscados}, orden=[('id', 'ASC')])
+        assert [f['id'] for f in filas] == ids[:n - 1]
+    # Longitudes de 5 a 8 comparten un mismo SQL.
+    assert len({db._sql_select('CuentasAlmacenadas', db._preparar_filtro({'id': ids[:n]})[0], (), False, False)
+                for n in range(5, 9)}) == 1
+
+
+def test_iterar_elementos_completo_devuelve_la_conexion(bd_sqlite):
+    ids = db.insertar_elementos('CuentasAlmacenadas', [fila(f"t{i}") for i in range(7)])
+    bloques = list(db.iterar_elementos('CuentasAlmacenadas', orden=[('id', 'ASC')], tamano_bloque=3,
+                                       por_bloques=True, columnas=('id',)))
+    assert [[f['id'] for f in bloque] for bloque in bloques] == [ids[:3], ids[3:6], ids[6:]]
+    assert [f['id'] for f in db.iterar_elementos('CuentasAlmacenadas', filtro={'id': ids[2:4]})] == ids[2:4]
+    estadisticas = db._pool.estadisticas()
+    assert estadisticas['descartadas'] == 0 and estadisticas['en_uso'] == 0
+
+
+def test_iterar_elementos_a_medias_descarta_la_conexion(bd_sqlite):
+    db.insertar_elementos('CuentasAlmacenadas', [fila(f"t{i}") for i in range(7)])
+    filas = db.iterar_elementos('CuentasAlmacenadas', tamano_bloque=2)
+    next(filas)
+    assert db._pool.estadisticas()['en_uso'] == 1  # Ocupada mientras dura el recorrido.
+    filas.close()
+    estadisticas = db._pool.estadisticas()
+    # Quedaban filas sin leer: la conexión se cierra en lugar de volver al pool.
+    assert estadisticas['descartadas'] == 1 and estadisticas['en_uso'] == 0
+    assert len(db.obtener_todos_los_elementos('CuentasAlmacenadas')) == 7
+
+
+def test_iterar_elementos_con_lista_vacia_no_usa_conexion(bd_sqlite):
+    assert list(db.iterar_elementos('CuentasAlmacenadas', filtro={'id': []})) == []
+    assert db._pool.estadisticas()['prestamos'] == 0
@@ -0,0 +1,23 @@
+# file: test_biblioteca.py
+# Biblioteca (ejercicios_python/EJ05) en un solo hilo: acceso a los libros y totales de copias.
+#
+#   python -m pytest test_biblioteca.py
+from ejercicios_python.EJ05.EJ5 import Biblioteca, Libro
+
+
+def crear_biblioteca(libros=20):
+    biblioteca = Biblioteca(verificar=True)
+    for i in range(libros):
+        biblioteca.agregarLibro(Libro(f"Título {i}", f"Autor {i % 3}", "01-01-2000", 1 + i % 4))
+    return biblioteca
+
+
+def test_biblioteca_es_una_vista_de_solo_lectura():
+    biblioteca = crear_biblioteca()
+    libros = biblioteca.biblioteca
+    assert [l.titulo for l in libros] == [f"Título {i}" for i in range(20)]
+    assert not hasattr(libros, 'append') and not hasattr(libros, 'remove')
+    biblioteca.eliminarLibro("Título 0")
+    biblioteca.agregarLibro(Libro("Nuevo", "Autor", "01-01-2000", 1))
+    # Refleja los cambios sin volver a pedirla.
+    assert len(libros) == 20 and [l.titulo for l in libros][-1] == "Nuevo"
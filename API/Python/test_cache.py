@@ -0,0 +1,73 @@
+# file: test_cache.py
+# CacheLRU (cache.py): aciertos, invalidación, caducidad por TTL y expulsión LRU, con el
+# reloj (time.monotonic) sustituido para no depender de esperas reales.
+#
+#   python -m pytest test_cache.py
+import pytest
+
+import cache
+from cache import CacheLRU
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    instante = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: instante[0])
+    return instante
+
+
+def test_acierto_y_fallo(reloj):
+    memoria = CacheLRU(capacidad=4, ttl=5)
+    assert memoria.obtener(1) is None
+    memoria.guardar(1, 'a')
+    assert memoria.obtener(1) == 'a'
+    estadisticas = memoria.estadisticas()
+    assert estadisticas['aciertos'] == 1 and estadisticas['fallos'] == 1
+    assert estadisticas['tasa_aciertos'] == 0.5
+
+
+def test_invalidar(reloj):
+    memoria = CacheLRU(capacidad=4, ttl=5)
+    memoria.guardar(1, 'a')
+    memoria.guardar(2, 'b')
+    memoria.invalidar(1)
+    memoria.invalidar(3)  # No está: no cuenta.
+    assert memoria.obtener(1) is None
+    assert memoria.obtener(2) == 'b'
+    assert memoria.estadisticas()['invalidaciones'] == 1
+
+
+def test_caduca_al_cumplirse_el_ttl(reloj):
+    memoria = CacheLRU(capacidad=4, ttl=5)
+    memoria.guardar(1, 'a')
+    reloj[0] += 4.999
+    assert memoria.obtener(1) == 'a'  # Un acierto no alarga la vida de la entrada.
+    reloj[0] += 0.001
+    assert memoria.obtener(1) is None
+    estadisticas = memoria.estadisticas()
+    assert estadisticas['caducadas'] == 1 and estadisticas['entradas'] == 0
+
+
+def test_guardar_de_nuevo_renueva_el_ttl(reloj):
+    memoria = CacheLRU(capacidad=4, ttl=5)
+    memoria.guardar(1, 'a')
+    reloj[0] += 4
+    memoria.guardar(1, 'b')
+    reloj[0] += 4
+    assert memoria.obtener(1) == 'b'
+
+
+def test_expulsa_la_menos_usada(reloj):
+    memoria = CacheLRU(capacidad=2, ttl=5)
+    memoria.guardar(1, 'a')
+    memoria.guardar(2, 'b')
+    memoria.obtener(1)  # 2 pasa a ser la menos usada.
+    memoria.guardar(3, 'c')
+    assert memoria.obtener(2) is None
+    assert memoria.obtener(1) == 'a' and memoria.obtener(3) == 'c'
+    assert memoria.estadisticas()['expulsiones'] == 1
+
+
+def test_capacidad_no_valida():
+    with pytest.raises(ValueError):
+        CacheLRU(capacidad=0)
@@ -0,0 +1,149 @@
+# file: test_db_async.py
+# db_async._conexion con un pool y una conexión falsos (sin servidor): los errores de negocio
+# deshacen y devuelven la conexión abierta al pool; los de la BD o una cancelación la cierran.
+#
+#   python -m pytest test_db_async.py
+import asyncio
+
+import aiomysql
+import pytest
+
+import db_async
+from cuentas import GastoRechazado, aplicar_gasto_fila
+from db import ErrorBaseDeDatos, ErrorConflictoVersion
+
+
+class CursorFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excepcion):
+        return False
+
+    async def execute(self, sql, parametros=()):
+        await self.conexion.antes_de_ejecutar()
+        self.rowcount = 1
+
+    async def fetchone(self):
+        return dict(self.conexion.fila)
+
+
+class ConexionFalsa:
+    def __init__(self, fila, fallo=None):
+        self.fila = fila
+        self.fallo = fallo
+        self.cerrada = False
+        self.deshechas = 0
+        self.confirmadas = 0
+
+    async def antes_de_ejecutar(self):
+        if self.fallo == 'colgada':
+            await asyncio.sleep(3600)
+        elif self.fallo is not None:
+            raise self.fallo
+
+    def cursor(self, *args):
+        return CursorFalso(self)
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        self.confirmadas += 1
+
+    async def rollback(self):
+        self.deshechas += 1
+
+    def close(self):
+        self.cerrada = True
+
+
+class PoolFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.devueltas = []
+
+    async def acquire(self):
+        return self.conexion
+
+    def release(self, conexion):
+        self.devueltas.append(conexion)
+
+
+def fila_cuenta(saldo=10.0, version=0):
+    return {'id': 1, 'tipo_cuenta': 'Cuenta', 'titular': 'Ana', 'cantidad': saldo,
+            'bonificacion': None, 'edad': None, 'version': version}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    def instalar(conexion):
+        pool_falso = PoolFalso(conexion)
+        monkeypatch.setattr(db_async, '_pool', pool_falso)
+        return pool_falso
+    return instalar
+
+
+def gastar(cantidad, version_esperada=None):
+    return db_async.actualizar_elemento_atomico(
+        'CuentasAlmacenadas', 'id', 1, lambda fila: aplicar_gasto_fila(1, fila, cantidad)[0],
+        version_esperada=version_esperada)
+
+
+def test_gasto_rechazado_devuelve_la_conexion_abierta(pool):
+    conexion = ConexionFalsa(fila_cuenta(saldo=10.0))
+    pool_falso = pool(conexion)
+    with pytest.raises(GastoRechazado):
+        asyncio.run(gastar(50))
+    assert pool_falso.devueltas == [conexion]
+    assert not conexion.cerrada
+    assert conexion.deshechas == 1 and conexion.confirmadas == 0
+
+
+def test_conflicto_de_version_devuelve_la_conexion_abierta(pool):
+    conexion = ConexionFalsa(fila_cuenta(version=3))
+    pool_falso = pool(conexion)
+    with pytest.raises(ErrorConflictoVersion):
+        asyncio.run(gastar(1, version_esperada=2))
+    assert pool_falso.devueltas == [conexion]
+    assert not conexion.cerrada
+    assert conexion.deshechas == 1
+
+
+def test_gasto_aceptado_devuelve_la_conexion_abierta(pool):
+    conexion = ConexionFalsa(fila_cuenta(saldo=10.0))
+    pool_falso = pool(conexion)
+    fila = asyncio.run(gastar(4))
+    assert fila['cantidad'] == 6.0 and fila['version'] == 1
+    assert pool_falso.devueltas == [conexion]
+    assert not conexion.cerrada
+    assert conexion.confirmadas == 1
+
+
+def test_error_de_bd_cierra_la_conexion(pool):
+    conexion = ConexionFalsa(fila_cuenta(), fallo=aiomysql.OperationalError(2013, "Lost connection"))
+    pool_falso = pool(conexion)
+    with pytest.raises(ErrorBaseDeDatos):
+        asyncio.run(gastar(1))
+    assert pool_falso.devueltas == [conexion]
+    assert conexion.cerrada
+
+
+def test_cancelacion_cierra_la_conexion(pool):
+    conexion = ConexionFalsa(fila_cuenta(), fallo='colgada')
+    pool_falso = pool(conexion)
+
+    async def cancelar():
+        tarea = asyncio.ensure_future(gastar(1))
+        await asyncio.sleep(0.01)
+        tarea.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea
+
+    asyncio.run(cancelar())
+    assert pool_falso.devueltas == [conexion]
+    assert conexion.cerrada
@@ -0,0 +1,46 @@
+# file: test_fechas.py
+# parsear_fecha (ejercicios_python/EJ05) debe dar el mismo resultado, y los mismos errores,
+# que datetime.strptime(fecha, "%d-%m-%Y").
+#
+#   python -m pytest test_fechas.py
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from ejercicios_python.EJ05.EJ5 import FORMATO_FECHA, Libro, parsear_fecha
+
+
+def resultado(funcion, fecha):
+    """Devuelve el valor de funcion(fecha), o el tipo de excepción que lanza."""
+    try:
+        return funcion(fecha)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize('fecha', [
+    "01-01-2000", "31-12-1999", "29-02-2020", "05-06-1967", "5-6-1967", "01-01-0001",
+    "31-02-2020", "00-01-2000", "32-01-2000", "01-13-2000", "01-00-2000", "29-02-1900",
+    "01-01-0000", " 1-01-2000", "01-01-2000 ", "01/01/2000", "2000-01-01", "", "aa-bb-cccc",
+    "+1-01-2000", "01-01-+200", "٠١-٠١-٢٠٠٠", None, 5,
+])
+def test_igual_que_strptime(fecha):
+    esperado = resultado(lambda f: datetime.strptime(f, FORMATO_FECHA), fecha)
+    # Dos veces: la segunda sale de la caché.
+    assert resultado(parsear_fecha, fecha) == esperado
+    assert resultado(parsear_fecha, fecha) == esperado
+
+
+def test_fechas_al_azar_igual_que_strptime():
+    azar = random.Random(1)
+    for _ in range(2000):
+        # Día y mes de una fecha real con otro año: incluye 29-02 de años no bisiestos.
+        dia_mes = (datetime(1, 1, 1) + timedelta(days=azar.randrange(3652058))).strftime("%d-%m-")
+        fecha = dia_mes + f"{azar.randint(1, 9999):04d}"
+        assert resultado(parsear_fecha, fecha) == resultado(lambda f: datetime.strptime(f, FORMATO_FECHA), fecha)
+
+
+def test_libro_con_fecha_no_valida():
+    with pytest.raises(ValueError, match="El formato de fecha debe ser DD-MM-YYYY"):
+        Libro("t", "a", "31-02-2020", 1)
@@ -0,0 +1,138 @@
+# file: test_inventario.py
+# Inventario (total mantenido en cada cambio) e InventarioColumnar deben dar siempre el
+# mismo valor total que un recálculo completo y que el otro backend.
+#
+#   python -m pytest test_inventario.py
+import gc
+import math
+import random
+import weakref
+
+import pytest
+
+from ejercicios_python.EJ01.EJ1 import Inventario, InventarioColumnar, Producto
+
+
+def crear(clase):
+    inventario = clase(verificar=True)
+    inventario.agregar_productos(Producto(f"p{i}", 1.0 + i, i) for i in range(10))
+    return inventario
+
+
+def test_revalorizar_con_nombres_repetidos_se_aplica_una_vez():
+    for clase in (Inventario, InventarioColumnar):
+        inventario = crear(clase)
+        inventario.revalorizar(2, ['p1', 'p1'])
+        assert inventario.obtener_producto('p1').precio == 4.0
+        assert inventario.calcular_valor_total() == pytest.approx(inventario.recalcular_valor_total())
+
+
+def test_nombre_inexistente_no_cambia_nada():
+    for clase in (Inventario, InventarioColumnar):
+        inventario = crear(clase)
+        total = inventario.calcular_valor_total()
+        with pytest.raises(ValueError):
+            inventario.revalorizar(2, ['p1', 'no_existe'])
+        assert inventario.obtener_producto('p1').precio == 2.0
+        assert inventario.calcular_valor_total() == total
+
+
+def test_mismos_totales_en_ambos_backends():
+    azar = random.Random(7)
+    inventarios = [Inventario(verificar=True), InventarioColumnar(verificar=True, capacidad=4)]
+    for paso in range(3000):
+        operacion = azar.random()
+        nombre = f"p{azar.randrange(60)}"
+        precio, cantidad, factor = round(azar.uniform(0, 50), 2), azar.randrange(20), azar.uniform(0.5, 1.5)
+        nombres = [f"p{azar.randrange(60)}" for _ in range(5)]
+        for inventario in inventarios:
+            if operacion < 0.25:
+                if nombre not in inventario:
+                    inventario.agregar_producto(Producto(nombre, precio, cantidad))
+            elif operacion < 0.4:
+                inventario.eliminar_producto(nombre)
+            elif operacion < 0.55:
+                producto = inventario.obtener_producto(nombre)
+                if producto:
+                    producto.precio = precio
+            elif operacion < 0.7:
+                producto = inventario.obtener_producto(nombre)
+                if producto:
+                    producto.cantidad = cantidad
+            elif operacion < 0.8:
+                inventario.revalorizar(factor, [n for n in nombres if n in inventario])
+            elif operacion < 0.9:
+                inventario.actualizar_precios({n: precio for n in nombres if n in inventario})
+            else:
+                inventario.revalorizar(factor)
+        # calcular_valor_total en modo verificar lanza RuntimeError si se desvía del recálculo.
+        totales = [inventario.calcular_valor_total() for inventario in inventarios]
+        assert math.isclose(*totales, rel_tol=1e-9, abs_tol=1e-9), paso
+        productos, columnares = inventarios[0].productos, inventarios[1].productos
+        assert [p.nombre for p in productos] == [p.nombre for p in columnares]
+        assert [p.cantidad for p in productos] == [p.cantidad for p in columnares]
+        assert [p.precio for p in productos] == pytest.approx([p.precio for p in columnares])
+
+
+def test_vaciar_deja_el_total_a_cero():
+    for clase in (Inventario, InventarioColumnar):
+        inventario = crear(clase)
+        inventario.eliminar_productos([f"p{i}" for i in range(10)])
+        assert inventario.calcular_valor_total() == 0
+        assert len(inventario) == 0
+
+
+def test_productos_es_una_vista_de_solo_lectura():
+    for clase in (Inventario, InventarioColumnar):
+        inventario = crear(clase)
+        productos = inventario.productos
+        assert [p.nombre for p in productos] == [f"p{i}" for i in range(10)]
+        assert not hasattr(productos, 'append') and not hasattr(productos, 'remove')
+        inventario.eliminar_producto('p3')
+        inventario.agregar_producto(Producto('nuevo', 1.0, 1))
+        # Refleja los cambios sin volver a pedirla.
+        assert len(productos) == 10 and [p.nombre for p in productos][-1] == 'nuevo'
+
+
+def test_total_igual_a_la_suma_tras_cambios_y_bajas():
+    for clase in (Inventario, InventarioColumnar):
+        inventario = clase()  # Sin verificar: se compara con una suma independiente.
+        inventario.agregar_productos(Producto(f"p{i}", 1.5 + i, i) for i in range(10))
+        inventario.obtener_producto('p2').precio = 10.25
+        inventario.obtener_producto('p5').cantidad = 40
+        baja = inventario.obtener_producto('p7')
+        inventario.eliminar_producto('p7')
+        baja.precio = 1000.0  # Ya no está en el inventario: no cuenta.
+        inventario.obtener_producto('p9').precio = 0.5
+        inventario.eliminar_productos(['p0', 'p9'])
+        inventario.obtener_producto('p1').cantidad = 3
+        suma = sum(p.precio * p.cantidad for p in inventario.productos)
+        assert inventario.calcular_valor_total() == pytest.approx(suma)
+
+
+def test_columnar_copia_el_producto_agregado():
+    inventario = InventarioColumnar()
+    original = Producto('p', 2.0, 3)
+    inventario.agregar_producto(original)
+    original.precio = 100.0
+    assert inventario.obtener_producto('p') is not original
+    assert inventario.obtener_producto('p').precio == 2.0
+    assert inventario.calcular_valor_total() == 6.0
+
+
+def test_el_inventario_se_libera_sin_recolector_de_ciclos():
+    for clase in (Inventario, InventarioColumnar):
+        producto = Producto('fuera', 2.0, 3)
+        inventario = clase()
+        inventario.agregar_productos([producto, Producto('otro', 1.0, 1)])
+        guardado = inventario.obtener_producto('fuera')
+        referencia = weakref.ref(inventario)
+        gc.disable()
+        try:
+            del inventario
+            assert referencia() is None
+        finally:
+            gc.enable()
+        # Los productos siguen funcionando: el observador desaparecido se descarta.
+        guardado.precio = 5.0
+        assert guardado.valor() == 15.0
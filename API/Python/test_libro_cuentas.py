@@ -0,0 +1,89 @@
+# file: test_libro_cuentas.py
+# LibroCuentas.aplicar_gastos debe rechazar los mismos gastos, por los mismos motivos, y dejar
+# los mismos saldos que llamar a realizar_gasto de EJ4.py objeto a objeto.
+#
+#   python -m pytest test_libro_cuentas.py
+import random
+
+import pytest
+
+from ejercicios_python.EJ04.EJ4 import Cuenta, CuentaJoven, SaldoInsuficiente, TitularNoValido
+from libro_cuentas import (
+    ACEPTADO, CUENTA_INEXISTENTE, SALDO_INSUFICIENTE, TITULAR_NO_VALIDO, LibroCuentas,
+)
+
+
+def gastar_objeto_a_objeto(cuentas, ids, cantidades):
+    """Lo que haría un bucle sobre los objetos de EJ4.py."""
+    motivos = []
+    for id_cuenta, cantidad in zip(ids, cantidades):
+        cuenta = cuentas.get(id_cuenta)
+        if cuenta is None:
+            motivos.append(CUENTA_INEXISTENTE)
+            continue
+        try:
+            cuenta.realizar_gasto(cantidad)
+        except TitularNoValido:
+            motivos.append(TITULAR_NO_VALIDO)
+        except SaldoInsuficiente:
+            motivos.append(SALDO_INSUFICIENTE)
+        else:
+            motivos.append(ACEPTADO)
+    return motivos
+
+
+def comparar(crear_cuentas, ids, cantidades):
+    """Aplica el lote con LibroCuentas y objeto a objeto y comprueba que coinciden."""
+    libro = LibroCuentas.desde_cuentas(crear_cuentas())
+    resultado = libro.aplicar_gastos(ids, cantidades)
+    cuentas = crear_cuentas()
+    motivos = gastar_objeto_a_objeto(cuentas, ids, cantidades)
+    assert resultado.motivos.tolist() == motivos
+    for id_cuenta, cuenta in libro.a_cuentas().items():
+        assert cuenta.cantidad == pytest.approx(cuentas[id_cuenta].cantidad)
+    return motivos
+
+
+def test_gasto_igual_al_saldo_se_acepta():
+    def crear_cuentas():
+        return {1: Cuenta("Ana", 100.0), 2: CuentaJoven("Luis", 100.0, 50, 20)}
+    # La cuenta joven descuenta 200 * 0.5 = 100, justo su saldo.
+    motivos = comparar(crear_cuentas, [1, 2, 1, 2], [100.0, 200.0, 0.01, 0.01])
+    assert motivos == [ACEPTADO, ACEPTADO, SALDO_INSUFICIENTE, SALDO_INSUFICIENTE]
+
+
+def test_cuenta_joven_con_edad_no_valida():
+    def crear_cuentas():
+        return {
+            1: CuentaJoven("Menor", 100.0, 10, 17),
+            2: CuentaJoven("Mayor", 100.0, 10, 25),
+            3: CuentaJoven("Límite", 100.0, 10, 18),
+            4: CuentaJoven("Límite", 100.0, 10, 24),
+        }
+    motivos = comparar(crear_cuentas, [1, 2, 3, 4], [10.0] * 4)
+    assert motivos == [TITULAR_NO_VALIDO, TITULAR_NO_VALIDO, ACEPTADO, ACEPTADO]
+
+
+def test_cuenta_inexistente():
+    def crear_cuentas():
+        return {5: Cuenta("Ana", 10.0), 7: Cuenta("Luis", 10.0)}
+    motivos = comparar(crear_cuentas, [4, 5, 6, 7, 8], [1.0] * 5)
+    assert motivos == [CUENTA_INEXISTENTE, ACEPTADO, CUENTA_INEXISTENTE, ACEPTADO, CUENTA_INEXISTENTE]
+
+
+def test_lotes_al_azar_coinciden_con_objeto_a_objeto():
+    azar = random.Random(1)
+    for _ in range(20):
+        estados = {}
+        for id_cuenta in azar.sample(range(1, 200), 50):
+            saldo = float(azar.randint(0, 200))
+            if azar.random() < 0.5:
+                estados[id_cuenta] = (CuentaJoven, ("t", saldo, azar.choice([0, 10, 25, 50]), azar.randint(15, 28)))
+            else:
+                estados[id_cuenta] = (Cuenta, ("t", saldo))
+
+        def crear_cuentas():
+            return {id_cuenta: clase(*args) for id_cuenta, (clase, args) in estados.items()}
+        ids = [azar.randint(0, 210) for _ in range(500)]
+        cantidades = [float(azar.randint(1, 60)) for _ in ids]
+        comparar(crear_cuentas, ids, cantidades)
@@ -0,0 +1,263 @@
+# file: test_prestamos.py
+# MotorPrestamos bajo concurrencia: varios hilos prestan y devuelven a la vez (por lotes con
+# procesar y sueltos con prestarLibro/devolverLibro) y no se crea ni se pierde ninguna copia.
+#
+#   python -m pytest test_prestamos.py
+import argparse
+import random
+import sys
+import threading
+
+import pytest
+
+from ejercicios_python.EJ05.EJ5 import Biblioteca, Libro, MotorPrestamos
+
+HILOS = 8
+RONDAS = 150
+TITULOS = 200
+COPIAS = 2
+
+
+@pytest.fixture
+def cambios_de_hilo_frecuentes():
+    # Para que las carreras, si las hubiera, aparezcan.
+    anterior = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(anterior)
+
+
+def crear_biblioteca():
+    biblioteca = Biblioteca(franjas=16)
+    for i in range(TITULOS):
+        biblioteca.agregarLibro(Libro(f"Título {i}", f"Autor {i % 7}", "01-01-2000", COPIAS))
+    return biblioteca
+
+
+def trabajador(motor, titulos, semilla, prestados, errores):
+    azar = random.Random(semilla)
+    en_mano = []
+    try:
+        for ronda in range(RONDAS):
+            if ronda % 2:
+                # Lote: préstamos al azar y devolución de parte de lo que se tiene.
+                devolver = en_mano[:azar.randint(0, len(en_mano))]
+                del en_mano[:len(devolver)]
+                solicitudes = [(MotorPrestamos.DEVOLVER, t) for t in devolver]
+                solicitudes += [(MotorPrestamos.PRESTAR, azar.choice(titulos)) for _ in range(10)]
+                azar.shuffle(solicitudes)
+                for resultado in motor.procesar(solicitudes):
+                    if resultado['operacion'] == MotorPrestamos.PRESTAR and resultado['ok']:
+                        en_mano.append(resultado['titulo'])
+                    elif resultado['operacion'] == MotorPrestamos.DEVOLVER:
+                        assert resultado['ok']
+            else:
+                titulo = azar.choice(titulos)
+                if motor.prestarLibro(titulo):
+                    en_mano.append(titulo)
+                if en_mano and azar.random() < 0.5:
+                    assert motor.devolverLibro(en_mano.pop())
+    except Exception as e:  # Se comprueba en el hilo principal.
+        errores.append(e)
+    prestados.extend(en_mano)
+
+
+def test_copias_conservadas_con_hilos_concurrentes(cambios_de_hilo_frecuentes):
+    biblioteca = crear_biblioteca()
+    motor = MotorPrestamos(biblioteca)
+    copias_iniciales = biblioteca.totalCopias()
+    # Todos los hilos piden los mismos títulos populares y además los suyos.
+    titulos = [f"Título {i}" for i in range(TITULOS)]
+    populares = titulos[:10]
+    prestados, errores, negativos = [], [], []
+    terminado = threading.Event()
+
+    def vigilar():
+        while not terminado.is_set():
+            negativos.extend(l.titulo for l in biblioteca.biblioteca if l.num_cop < 0)
+
+    hilos = [threading.Thread(target=trabajador,
+                              args=(motor, titulos[h::HILOS] + populares * 5, h, prestados, errores))
+             for h in range(HILOS)]
+    vigilante = threading.Thread(target=vigilar)
+    vigilante.start()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    terminado.set()
+    vigilante.join()
+
+    assert not errores
+    assert not negativos
+    assert all(libro.num_cop >= 0 for libro in biblioteca.biblioteca)
+    assert biblioteca.totalCopias() + len(prestados) == copias_iniciales
+    por_autor = biblioteca.copiasPorAutor()
+    assert biblioteca.totalCopias() == biblioteca.recalcularCopias()
+    assert por_autor == biblioteca.copiasPorAutor()
+
+
+def test_verificar_durante_prestamos_concurrentes(cambios_de_hilo_frecuentes):
+    # El modo verificar recuenta con todas las franjas bloqueadas: sin falsos desajustes.
+    biblioteca = crear_biblioteca()
+    motor = MotorPrestamos(biblioteca)
+    errores = []
+    hilos = [threading.Thread(target=trabajador, args=(motor, [f"Título {i}" for i in range(TITULOS)],
+                                                       h, [], errores))
+             for h in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    biblioteca.verificar = True
+    while any(hilo.is_alive() for hilo in hilos):
+        biblioteca.totalCopias()
+        biblioteca.copiasPorAutor()
+    for hilo in hilos:
+        hilo.join()
+    assert not errores
+
+
+def test_resultados_de_procesar():
+    biblioteca = Biblioteca()
+    biblioteca.agregarLibro(Libro("Uno", "Autor", "01-01-2000", 1))
+    motor = MotorPrestamos(biblioteca)
+    resultados = motor.procesar([(MotorPrestamos.PRESTAR, "Uno"), (MotorPrestamos.PRESTAR, "Uno"),
+                                 (MotorPrestamos.DEVOLVER, "Uno"), (MotorPrestamos.PRESTAR, "Otro")])
+    assert [r['motivo'] for r in resultados] == [MotorPrestamos.PRESTADO, MotorPrestamos.SIN_COPIAS,
+                                                 MotorPrestamos.DEVUELTO, MotorPrestamos.NO_ENCONTRADO]
+    assert [r['ok'] for r in resultados] == [True, False, True, False]
+    with pytest.raises(ValueError):
+        motor.procesar([("vender", "Uno")])
+    assert biblioteca.totalCopias() == 1
+
+
+def test_procesar_toma_cada_franja_una_vez_por_lote(monkeypatch):
+    biblioteca = crear_biblioteca()
+    motor = MotorPrestamos(biblioteca)
+    bloqueos = []
+    bloquear = biblioteca.bloquearFranja
+    monkeypatch.setattr(biblioteca, 'bloquearFranja', lambda franja: bloqueos.append(franja) or bloquear(franja))
+
+    titulos = [f"Título {i}" for i in range(40)]
+    # Cada título se presta hasta quedarse sin copias y se devuelve una vez, en el orden del lote.
+    solicitudes = [(MotorPrestamos.PRESTAR, t) for t in titulos] * (COPIAS + 1)
+    solicitudes += [(MotorPrestamos.DEVOLVER, t) for t in titulos]
+    resultados = motor.procesar(solicitudes)
+
+    assert sorted(bloqueos) == sorted({biblioteca.franjaDe(t) for t in titulos})
+    assert [r['titulo'] for r in resultados] == [t for _, t in solicitudes]
+    motivos = [r['motivo'] for r in resultados]
+    n = len(titulos)
+    assert motivos[:COPIAS * n] == [MotorPrestamos.PRESTADO] * (COPIAS * n)
+    assert motivos[COPIAS * n:(COPIAS + 1) * n] == [MotorPrestamos.SIN_COPIAS] * n
+    assert motivos[(COPIAS + 1) * n:] == [MotorPrestamos.DEVUELTO] * n
+    assert biblioteca.totalCopias() == biblioteca.recalcularCopias() == (TITULOS - n) * COPIAS + n
+
+
+def test_prueba_de_carga_por_lotes_conserva_las_copias(cambios_de_hilo_frecuentes, capsys):
+    # Lo mismo que benchmarks/prestamos_concurrentes.py, por lotes y solicitud a solicitud.
+    from benchmarks.prestamos_concurrentes import ejecutar
+    argumentos = argparse.Namespace(libros=300, copias=2, lotes=40, tamano_lote=25, franjas=8,
+                                    populares=5, contencion=30, semilla=3)
+    for sin_lotes in (False, True):
+        assert ejecutar(argumentos, 4, sin_lotes)
+
+
+def test_franja_bloqueada():
+    biblioteca = crear_biblioteca()
+    titulo = "Título 1"
+    otro = next(t for t in (f"Título {i}" for i in range(TITULOS))
+                if biblioteca.franjaDe(t) != biblioteca.franjaDe(titulo))
+    with biblioteca.bloquearFranja(biblioteca.franjaDe(titulo)) as franja:
+        assert franja.prestar(titulo) and franja.devolver(titulo)
+        with pytest.raises(ValueError):
+            franja.prestar(otro)  # De otra franja: su cerrojo no está tomado.
+    with pytest.raises(RuntimeError):
+        franja.prestar(titulo)  # Fuera del bloque.
+
+
+class CerrojoRegistrado:
+    """Cerrojo que anota su número cada vez que se toma."""
+    def __init__(self, numero, registro):
+        self._cerrojo = threading.Lock()
+        self._numero = numero
+        self._registro = registro
+
+    def __enter__(self):
+        self._cerrojo.acquire()
+        self._registro.append(self._numero)
+        return self
+
+    def __exit__(self, *excepcion):
+        self._cerrojo.release()
+
+
+def test_todas_las_franjas_se_bloquean_en_orden(cambios_de_hilo_frecuentes):
+    biblioteca = crear_biblioteca()
+    registro = []
+    biblioteca._cerrojos = [CerrojoRegistrado(i, registro) for i in range(len(biblioteca._cerrojos))]
+    biblioteca.recalcularCopias()
+    biblioteca.verificar = True
+    biblioteca.totalCopias()
+    biblioteca.copiasPorAutor()
+    franjas = list(range(len(biblioteca._cerrojos)))
+    assert registro == franjas * 3
+
+    # Varios hilos que bloquean todas las franjas mientras otros procesan lotes: sin interbloqueos.
+    motor = MotorPrestamos(biblioteca)
+    errores = []
+    titulos = [f"Título {i}" for i in range(TITULOS)]
+    hilos = [threading.Thread(target=trabajador, args=(motor, titulos, h, [], errores)) for h in range(4)]
+    hilos += [threading.Thread(target=lambda: [biblioteca.recalcularCopias() for _ in range(200)]) for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(timeout=60)
+    assert not any(hilo.is_alive() for hilo in hilos)
+    assert not errores
+
+
+def test_totales_tras_prestamos_y_bajas_concurrentes(cambios_de_hilo_frecuentes):
+    biblioteca = crear_biblioteca()
+    motor = MotorPrestamos(biblioteca)
+    titulos = [f"Título {i}" for i in range(TITULOS)]
+    errores = []
+
+    def prestar_y_devolver(semilla):
+        azar = random.Random(semilla)
+        try:
+            for _ in range(RONDAS):
+                solicitudes = [(azar.choice((MotorPrestamos.PRESTAR, MotorPrestamos.DEVOLVER)), azar.choice(titulos))
+                               for _ in range(10)]
+                motor.procesar(solicitudes)
+                motor.prestarLibro(azar.choice(titulos))
+        except Exception as e:
+            errores.append(e)
+
+    def dar_de_baja_y_de_alta(semilla):
+        azar = random.Random(semilla)
+        try:
+            for _ in range(RONDAS):
+                i = azar.randrange(TITULOS)
+                try:
+                    biblioteca.eliminarLibro(f"Título {i}")
+                except ValueError:
+                    pass  # La ha dado de baja el otro hilo.
+                biblioteca.agregarLibro(Libro(f"Título {i}", f"Autor {i % 7}", "01-01-2000", azar.randrange(4)))
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=prestar_y_devolver, args=(h,)) for h in range(6)]
+    hilos += [threading.Thread(target=dar_de_baja_y_de_alta, args=(100 + h,)) for h in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert not errores
+
+    total = biblioteca.totalCopias()
+    por_autor = {autor: biblioteca.totalCopiasAutor(autor) for autor in (f"Autor {i}" for i in range(7))}
+    assert por_autor == biblioteca.copiasPorAutor()
+    # recalcularCopias recuenta libro a libro: debe dar lo mismo que los totales mantenidos.
+    assert biblioteca.recalcularCopias() == total
+    assert {autor: biblioteca.totalCopiasAutor(autor) for autor in por_autor} == por_autor
+    assert total == sum(libro.num_cop for libro in biblioteca.biblioteca)
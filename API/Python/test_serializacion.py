@@ -0,0 +1,80 @@
+# file: test_serializacion.py
+# ProveedorJSON (serializacion.py) debe dar los mismos bytes que DefaultJSONProvider de Flask,
+# con orjson y con el módulo json, y respetar sort_keys, ensure_ascii y compact.
+#
+#   python -m pytest test_serializacion.py
+import dataclasses
+import datetime
+import decimal
+import uuid
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import serializacion
+from serializacion import ProveedorJSON
+
+
+@dataclasses.dataclass
+class Punto:
+    y: int
+    x: int
+
+
+VALORES = [
+    None, True, 0, -3, 0.1, -0.0, 4321.75, "", "texto", "Año ñandú €", "emoji 😀   \x7f",
+    "control \x00\x1f\b\f\n\r\t \" \\ /", [], {}, [1, "a", None, [2.5]],
+    {'z': 1, 'a': {'y': [], 'b': 'María'}, 'M': None, 'á': 2, '10': 3, '9': 4},
+    {'saldo': decimal.Decimal('10.50'), 'id': uuid.UUID(int=7)},
+    {'fecha': datetime.date(2024, 2, 29), 'hora': datetime.datetime(2024, 2, 29, 13, 5)},
+    Punto(2, 1), (1, 2),
+]
+
+
+@pytest.fixture(params=['json'] + (['orjson'] if serializacion.orjson is not None else []))
+def motor(request, monkeypatch):
+    monkeypatch.setattr(serializacion, 'serializador', serializacion.Serializador(request.param))
+    return request.param
+
+
+def respuesta(aplicacion, *args, **kwargs):
+    with aplicacion.app_context():
+        return aplicacion.json.response(*args, **kwargs).get_data()
+
+
+def aplicaciones(**opciones):
+    """Una aplicación con ProveedorJSON y otra con DefaultJSONProvider, con las mismas opciones."""
+    pareja = []
+    for clase in (ProveedorJSON, DefaultJSONProvider):
+        aplicacion = Flask(__name__)
+        aplicacion.json = clase(aplicacion)
+        for nombre, valor in opciones.items():
+            setattr(aplicacion.json, nombre, valor)
+        pareja.append(aplicacion)
+    return pareja
+
+
+@pytest.mark.parametrize('valor', VALORES, ids=repr)
+@pytest.mark.parametrize('opciones', [{}, {'sort_keys': False}, {'ensure_ascii': False},
+                                      {'sort_keys': False, 'ensure_ascii': False}, {'compact': False}],
+                         ids=repr)
+def test_mismos_bytes_que_flask(motor, valor, opciones):
+    nuestro, de_flask = aplicaciones(**opciones)
+    assert respuesta(nuestro, valor) == respuesta(de_flask, valor)
+
+
+def test_argumentos_de_response(motor):
+    nuestro, de_flask = aplicaciones()
+    assert respuesta(nuestro) == respuesta(de_flask) == b'null\n'
+    assert respuesta(nuestro, 1, 'b') == respuesta(de_flask, 1, 'b')
+    assert respuesta(nuestro, b=1, a=2) == respuesta(de_flask, b=1, a=2)
+    with pytest.raises(TypeError):
+        respuesta(nuestro, 1, a=2)
+
+
+def test_loads(motor):
+    nuestro, de_flask = aplicaciones()
+    texto = '{"a": [1, 2.5, "ñ"], "b": null}'
+    assert nuestro.json.loads(texto) == de_flask.json.loads(texto)
+    assert nuestro.json.loads(texto.encode('utf-8')) == de_flask.json.loads(texto)